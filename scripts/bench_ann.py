@@ -0,0 +1,84 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from conversational_agent.infrastructure.local_vector_store import LocalVectorIndex
+
+
+def _clustered(
+    rng: np.random.Generator, count: int, clusters: int, dimension: int, spread: float
+) -> np.ndarray:
+    # Real embeddings are clustered by topic; uniform noise would understate IVF recall.
+    centers = rng.normal(size=(clusters, dimension))
+    labels = rng.integers(0, clusters, size=count)
+    return (centers[labels] + spread * rng.normal(size=(count, dimension))).astype(np.float32)
+
+
+def _load(index: LocalVectorIndex, vectors: np.ndarray) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), 5000):
+        index.upsert(
+            [
+                {"id": str(offset + idx), "values": vector.tolist()}
+                for idx, vector in enumerate(vectors[offset : offset + 5000])
+            ]
+        )
+    return time.perf_counter() - start
+
+
+def _run(
+    index: LocalVectorIndex, queries: np.ndarray, top_k: int, nprobe: int | None
+) -> tuple[list[set[str]], float]:
+    results: list[set[str]] = []
+    start = time.perf_counter()
+    for query in queries:
+        hits = index.query(query.tolist(), top_k=top_k, nprobe=nprobe)
+        results.append({vector_id for vector_id, _, _ in hits})
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recall@k vs QPS of the IVF local index against exact search"
+    )
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--spread", type=float, default=1.5, help="Noise around each center")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = _clustered(rng, args.vectors, args.clusters, args.dimension, args.spread)
+    queries = vectors[rng.choice(args.vectors, args.queries, replace=False)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as flat_dir, tempfile.TemporaryDirectory() as ivf_dir:
+        flat = LocalVectorIndex(flat_dir, args.dimension)
+        ivf = LocalVectorIndex(
+            ivf_dir, args.dimension, index_type="ivf", ivf_nlist=args.nlist, ivf_nprobe=1
+        )
+        print(f"flat  load={_load(flat, vectors):.2f}s")
+        print(f"ivf   load={_load(ivf, vectors):.2f}s (includes k-means training)")
+
+        exact, exact_qps = _run(flat, queries, args.top_k, None)
+        print(f"exact           recall@{args.top_k}=1.000 qps={exact_qps:.1f}")
+        for nprobe in args.nprobe:
+            approx, qps = _run(ivf, queries, args.top_k, nprobe)
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+            print(
+                f"ivf nprobe={nprobe:<4} recall@{args.top_k}={recall:.3f} qps={qps:.1f} "
+                f"speedup={qps / exact_qps:.1f}x"
+            )
+        flat.close()
+        ivf.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+
+from conversational_agent.utils.text import chunk_text
+
+WORDS = (
+    "model evaluation precision recall gradient descent feature engineering "
+    "cross validation regularization embedding vector retrieval latency throughput"
+).split()
+
+
+def _document(size_mb: float, seed: int) -> str:
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts: list[str] = []
+    length = 0
+    while length < target:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))) + ".\n"
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)
+
+
+def _bench(text: str, mode: str, chunk_size: int, chunk_overlap: int, repeat: int) -> None:
+    best = float("inf")
+    chunks: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = chunk_text(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap, mode=mode)
+        best = min(best, time.perf_counter() - start)
+    megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+    print(
+        f"mode={mode:<6} size={megabytes:.1f}MB chunks={len(chunks)} "
+        f"best={best * 1000:.1f}ms throughput={megabytes / best:.1f}MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark utils.text.chunk_text")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--modes", default="chars,tokens")
+    args = parser.parse_args()
+
+    text = _document(args.size_mb, args.seed)
+    for mode in args.modes.split(","):
+        if mode == "tokens":
+            _bench(text, mode, chunk_size=256, chunk_overlap=32, repeat=args.repeat)
+        else:
+            _bench(text, mode, chunk_size=1000, chunk_overlap=120, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import time
+from time import perf_counter
+
+import numpy as np
+from fastapi import FastAPI, Request
+
+from conversational_agent.observability.metrics import (
+    REQUEST_COUNT,
+    REQUEST_LATENCY,
+    MetricsMiddleware,
+)
+
+
+def _app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/items/{item_id}")
+    async def item(item_id: str) -> dict[str, str]:
+        return {"id": item_id}
+
+    if variant == "asgi":
+        app.add_middleware(MetricsMiddleware)
+    elif variant == "http":
+        # The decorator-based middleware this module used before, labelled by raw path.
+        @app.middleware("http")
+        async def metrics_middleware(request: Request, call_next):
+            start = perf_counter()
+            response = await call_next(request)
+            path = request.url.path
+            REQUEST_COUNT.labels(
+                method=request.method, path=path, status_code=str(response.status_code)
+            ).inc()
+            REQUEST_LATENCY.labels(method=request.method, path=path).observe(
+                perf_counter() - start
+            )
+            return response
+
+    return app
+
+
+async def _request(app: FastAPI, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        return None
+
+    await app(scope, receive, send)
+
+
+async def _bench(variant: str, requests: int, distinct: int) -> list[float]:
+    app = _app(variant)
+    # Warm up routing and the metric label children.
+    for idx in range(min(distinct, 100)):
+        await _request(app, f"/api/v1/items/{idx}")
+    latencies: list[float] = []
+    for idx in range(requests):
+        began = time.perf_counter()
+        await _request(app, f"/api/v1/items/{idx % distinct}")
+        latencies.append(time.perf_counter() - began)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Per-request cost of the HTTP metrics middleware, measured in process by "
+            "calling the ASGI app directly (no sockets)"
+        )
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=1000,
+        help="Distinct item ids; the raw-path middleware creates one label set per id",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=3,
+        help="Variants are interleaved over several rounds so drift does not favour one",
+    )
+    args = parser.parse_args()
+
+    variants = ("none", "http", "asgi")
+    samples: dict[str, list[float]] = {variant: [] for variant in variants}
+    for _ in range(args.rounds):
+        for variant in variants:
+            samples[variant] += asyncio.run(_bench(variant, args.requests, args.distinct))
+    results = {variant: np.asarray(values) * 1e6 for variant, values in samples.items()}
+    baseline = float(results["none"].mean())
+    for variant, latencies in results.items():
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(
+            f"{variant:<5} mean={latencies.mean():.1f}us p50={p50:.1f}us p99={p99:.1f}us "
+            f"overhead={latencies.mean() - baseline:+.1f}us/request"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from conversational_agent.core.config import get_settings
+from conversational_agent.infrastructure.vector_store import VectorStore
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    return float(np.percentile(np.asarray(samples), percentile)) * 1000
+
+
+def _bench(name: str, store: VectorStore, queries: np.ndarray, top_k: int) -> None:
+    latencies: list[float] = []
+    start = time.perf_counter()
+    for query in queries:
+        began = time.perf_counter()
+        store.query(query.tolist(), top_k=top_k)
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<10} queries={len(queries)} qps={len(queries) / elapsed:.1f} "
+        f"p50={_percentile(latencies, 50):.2f}ms p99={_percentile(latencies, 99):.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare query latency of the local vector store with the configured backend"
+    )
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--remote",
+        action="store_true",
+        help="Also load the same vectors into BACKEND_PROVIDER (pinecone or aws) and query it",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.normal(size=(args.vectors, settings.embedding_dimension)).astype(np.float32)
+    queries = rng.normal(size=(args.queries, settings.embedding_dimension)).astype(np.float32)
+    records = [
+        {"id": f"bench-{idx}", "values": vector.tolist(), "metadata": {"source_id": "bench"}}
+        for idx, vector in enumerate(vectors)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        local_settings = settings.model_copy(
+            update={"backend_provider": "local", "local_vector_store_path": directory}
+        )
+        local = VectorStore(local_settings)
+        start = time.perf_counter()
+        for offset in range(0, len(records), 1000):
+            local.upsert(records[offset : offset + 1000])
+        print(f"local      upsert={len(records)} in {time.perf_counter() - start:.2f}s")
+        _bench("local", local, queries, args.top_k)
+
+    if args.remote:
+        if settings.backend_provider.lower() == "local":
+            raise SystemExit("--remote needs BACKEND_PROVIDER=pinecone or aws")
+        remote = VectorStore(settings)
+        for offset in range(0, len(records), 100):
+            remote.upsert(records[offset : offset + 100])
+        _bench(settings.backend_provider.lower(), remote, queries, args.top_k)
+        remote.delete([record["id"] for record in records])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+
+import conversational_agent.api.routes as routes
+from conversational_agent.agent.graph import SYSTEM_PROMPT, AgentService
+from conversational_agent.agent.tools import TOOL_NAME
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure import redis_client
+from conversational_agent.infrastructure.vector_store import VectorStore
+from conversational_agent.observability.instrumentation import configure_instrumentation
+from conversational_agent.observability.metrics import register_metrics
+from conversational_agent.services.chat_service import (
+    ChatService,
+    InMemoryResponseCache,
+    InMemorySessionStore,
+    RedisResponseCache,
+    RedisSessionStore,
+    ResponseCache,
+    SessionStore,
+)
+from conversational_agent.services.conversation_memory import (
+    ConversationMemory,
+    ConversationSummarizer,
+)
+from conversational_agent.services.ingestion_manifest import ChunkManifestStore
+from conversational_agent.services.ingestion_service import IngestionService
+from conversational_agent.services.retrieval_service import RetrievalService
+from conversational_agent.services.semantic_cache import (
+    InMemorySemanticCache,
+    RedisSemanticCache,
+    SemanticCache,
+)
+from conversational_agent.services.single_flight import build_single_flight
+from conversational_agent.utils.text import count_tokens
+
+_WORDS = (
+    "access account agent audit backup budget cache cluster compliance contract cost "
+    "customer dashboard data deploy device document embedding employee encryption "
+    "escalation expense firewall gateway guide incident index invoice latency laptop "
+    "license login metric migration model network onboarding outage password payroll "
+    "policy portal privacy quota release report request retention review role router "
+    "schedule security server service session storage support ticket token training "
+    "travel upgrade vendor vpn warranty workflow"
+).split()
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic stand-in for the chat LLM with a fixed per-call latency.
+
+    Agent turns first call the retrieval tool with the user's question, then
+    answer from the tool result; any other prompt (the summarizer's) gets a
+    short digest of its last message.
+    """
+
+    latency_seconds: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_seconds)
+        return self._reply(messages)
+
+    @staticmethod
+    def _reply(messages: list[BaseMessage]) -> ChatResult:
+        last = messages[-1]
+        prompt_tokens = sum(len(str(message.content).split()) for message in messages)
+        if messages[0].content == SYSTEM_PROMPT and not isinstance(last, ToolMessage):
+            call_id = hashlib.blake2b(str(last.content).encode(), digest_size=6).hexdigest()
+            tool_call = {"name": TOOL_NAME, "args": {"query": last.content}, "id": call_id}
+            message = AIMessage(content="", tool_calls=[tool_call])
+        else:
+            message = AIMessage(content=" ".join(str(last.content).split()[:60]))
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(str(message.content).split()),
+            "total_tokens": prompt_tokens + len(str(message.content).split()),
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class HashEmbeddings:
+    """Unit vectors derived from a hash of the text: same text, same vector.
+
+    Texts sharing words do not land close together, so the semantic cache only
+    hits on repeated questions; ``latency_seconds`` is paid once per model call.
+    """
+
+    def __init__(self, dimension: int, latency_seconds: float = 0.0) -> None:
+        self._dimension = dimension
+        self._latency = latency_seconds
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self._latency)
+        return self._vector(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self._latency)
+        return self._vector(text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    def close(self) -> None:
+        return None
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())
+        vector = np.random.default_rng(seed).standard_normal(self._dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+class StageRecorder(SpanProcessor):
+    """Collects the duration of every finished instrumentation span by name."""
+
+    def __init__(self) -> None:
+        self.durations: dict[str, list[float]] = defaultdict(list)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.start_time is not None and span.end_time is not None:
+            self.durations[span.name].append((span.end_time - span.start_time) / 1e9)
+
+
+def _use_fakeredis() -> None:
+    """Back every Redis client the app builds with one in-process fakeredis server."""
+    try:
+        import fakeredis
+        import redis
+        import redis.asyncio as aioredis
+    except ImportError as exc:
+        raise SystemExit("--redis fake needs fakeredis: pip install 'fakeredis[lua]'") from exc
+
+    server = fakeredis.FakeServer()
+
+    def sync_pool(url: str, decode_responses: bool, max_connections: int) -> Any:
+        return redis.ConnectionPool(
+            connection_class=fakeredis.FakeConnection,
+            server=server,
+            decode_responses=decode_responses,
+            max_connections=max_connections,
+        )
+
+    def async_pool(url: str, decode_responses: bool, max_connections: int) -> Any:
+        return aioredis.ConnectionPool(
+            connection_class=fakeredis.FakeAsyncRedisConnection,
+            server=server,
+            decode_responses=decode_responses,
+            max_connections=max_connections,
+        )
+
+    # sync_redis/async_redis look the pool factories up at call time.
+    redis_client._sync_pool = sync_pool  # type: ignore[assignment]
+    redis_client._async_pool = async_pool  # type: ignore[assignment]
+
+
+class Harness:
+    def __init__(self, args: argparse.Namespace, workdir: str) -> None:
+        overrides: dict[str, Any] = {
+            "BACKEND_PROVIDER": "local",
+            "LOCAL_VECTOR_STORE_PATH": os.path.join(workdir, "vectors"),
+            "INGEST_MANIFEST_DIR": os.path.join(workdir, "manifests"),
+            "EMBEDDING_CACHE_ENABLED": False,
+            "SEMANTIC_CACHE_ENABLED": args.semantic_cache,
+            "OTEL_ENABLED": True,
+            "STAGE_SPANS_ENABLED": True,
+        }
+        if args.redis == "fake":
+            _use_fakeredis()
+            overrides["REDIS_URL"] = "redis://offline-benchmark"
+        self.settings = Settings(GROQ_API_KEY="offline", PINECONE_API_KEY="offline", **overrides)
+        # Loads the tiktoken encoding (or settles on the character estimate
+        # when it cannot be downloaded) before anything is timed.
+        count_tokens("warm up", encoding_name=self.settings.chunk_encoding)
+        self.llm = FakeChatModel(latency_seconds=args.llm_latency_ms / 1000)
+        embeddings = HashEmbeddings(
+            self.settings.embedding_dimension, args.embed_latency_ms / 1000
+        )
+        vector_store = VectorStore(self.settings)
+        self.ingestion = IngestionService(
+            self.settings,
+            embeddings,  # type: ignore[arg-type]
+            vector_store,
+            manifests=ChunkManifestStore(self.settings.ingest_manifest_dir),
+        )
+        retrieval = RetrievalService(
+            self.settings, embeddings, vector_store  # type: ignore[arg-type]
+        )
+        self.chat = ChatService(
+            AgentService(self.settings, retrieval, llm=self.llm),
+            retrieval,
+            self._session_store(),
+            self._response_cache(),
+            self._semantic_cache(),
+            build_single_flight(self.settings),
+        )
+        self.recorder = StageRecorder()
+        provider = TracerProvider()
+        provider.add_span_processor(self.recorder)
+        configure_instrumentation(self.settings, tracer_provider=provider)
+
+    def app(self) -> FastAPI:
+        # Same wiring as main.py minus exporters and the startup warm-up.
+        app = FastAPI(title="offline-benchmark")
+        register_metrics(app)
+        app.include_router(routes.router)
+        app.dependency_overrides[routes.get_chat_service] = lambda: self.chat
+        return app
+
+    def _session_store(self) -> SessionStore:
+        store: SessionStore
+        if self.settings.redis_url:
+            store = RedisSessionStore(self.settings)
+        else:
+            store = InMemorySessionStore(
+                max_messages=max(2, self.settings.session_max_turns * 2),
+                max_sessions=self.settings.memory_session_max_entries,
+                max_bytes=self.settings.memory_session_max_bytes,
+                ttl_seconds=self.settings.session_ttl_seconds,
+            )
+        summarizer = ConversationSummarizer(self.settings, llm=self.llm)
+        return ConversationMemory(self.settings, store, summarizer)
+
+    def _response_cache(self) -> ResponseCache:
+        if self.settings.redis_url:
+            return RedisResponseCache(self.settings)
+        return InMemoryResponseCache(
+            max_entries=self.settings.memory_response_cache_max_entries,
+            max_bytes=self.settings.memory_response_cache_max_bytes,
+            ttl_seconds=self.settings.response_cache_ttl_seconds,
+        )
+
+    def _semantic_cache(self) -> SemanticCache | None:
+        if not self.settings.semantic_cache_enabled:
+            return None
+        if self.settings.redis_url:
+            cache = RedisSemanticCache(self.settings)
+            cache.warm()
+            return cache
+        return InMemorySemanticCache(
+            threshold=self.settings.semantic_cache_threshold,
+            max_entries=self.settings.semantic_cache_max_entries,
+            ttl_seconds=self.settings.response_cache_ttl_seconds,
+            near_miss_margin=self.settings.semantic_cache_near_miss_margin,
+        )
+
+
+def _document(rng: random.Random, pages: int, words_per_page: int) -> list[str]:
+    return [" ".join(rng.choices(_WORDS, k=words_per_page)) for _ in range(pages)]
+
+
+def _queries(rng: random.Random, count: int) -> list[str]:
+    return [
+        f"What does the {' '.join(rng.choices(_WORDS, k=3))} policy say?" for _ in range(count)
+    ]
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(samples),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def _max_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _report(
+    name: str,
+    harness: Harness,
+    latencies: list[float],
+    errors: int,
+    elapsed: float,
+    units: str,
+) -> dict[str, Any]:
+    result = {
+        "completed": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "throughput_units": units,
+        "latency": _percentiles(latencies),
+        "stages": {
+            stage: _percentiles(durations)
+            for stage, durations in sorted(harness.recorder.durations.items())
+        },
+        "memory": {"rss_mb": _rss_mb(), "max_rss_mb": round(_max_rss_mb(), 1)},
+    }
+    if tracemalloc.is_tracing():
+        result["memory"]["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    latency = result["latency"]
+    print(
+        f"{name:<7} ok={len(latencies)} errors={errors} elapsed={elapsed:.2f}s "
+        f"{units}/s={result['throughput_per_s']} p50={latency.get('p50_ms', 0):.1f}ms "
+        f"p95={latency.get('p95_ms', 0):.1f}ms p99={latency.get('p99_ms', 0):.1f}ms "
+        f"rss={result['memory']['rss_mb'] or 0:.0f}MB"
+    )
+    for stage, stats in result["stages"].items():
+        print(
+            f"  {stage:<22} n={stats['count']:<6} p50={stats['p50_ms']:.2f}ms "
+            f"p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+        )
+    return result
+
+
+def _reset(harness: Harness) -> None:
+    harness.recorder.durations.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+def _bench_ingest(harness: Harness, args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    documents = [
+        _document(rng, args.pages, args.words_per_page) for _ in range(args.documents)
+    ]
+    latencies: list[float] = []
+    errors = 0
+
+    def ingest(index: int) -> float:
+        began = time.perf_counter()
+        harness.ingestion.ingest_pages(documents[index], f"doc-{index}", f"doc-{index}.pdf")
+        return time.perf_counter() - began
+
+    _reset(harness)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.ingest_workers) as pool:
+        for future in [pool.submit(ingest, index) for index in range(len(documents))]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    return _report("ingest", harness, latencies, errors, time.perf_counter() - start, "docs")
+
+
+async def _drive(
+    concurrency: int, requests: int, call: Callable[[int], Awaitable[None]]
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_request
+        while next_request < requests:
+            index = next_request
+            next_request += 1
+            began = time.perf_counter()
+            try:
+                await call(index)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - began)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _bench_service(harness: Harness, args: argparse.Namespace) -> dict[str, Any]:
+    queries = _queries(random.Random(args.seed + 1), args.distinct)
+
+    async def call(index: int) -> None:
+        await harness.chat.achat(f"service-{index % args.sessions}", queries[index % len(queries)])
+
+    _reset(harness)
+    latencies, errors, elapsed = asyncio.run(_drive(args.concurrency, args.requests, call))
+    return _report("service", harness, latencies, errors, elapsed, "requests")
+
+
+def _bench_api(harness: Harness, args: argparse.Namespace) -> dict[str, Any]:
+    queries = _queries(random.Random(args.seed + 2), args.distinct)
+    app = harness.app()
+
+    async def run() -> tuple[list[float], int, float]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://offline") as client:
+
+            async def call(index: int) -> None:
+                payload = {
+                    "session_id": f"api-{index % args.sessions}",
+                    "query": queries[index % len(queries)],
+                }
+                response = await client.post("/api/v1/chat", json=payload)
+                response.raise_for_status()
+
+            return await _drive(args.concurrency, args.requests, call)
+
+    _reset(harness)
+    latencies, errors, elapsed = asyncio.run(run())
+    return _report("api", harness, latencies, errors, elapsed, "requests")
+
+
+_WORKLOADS = {"ingest": _bench_ingest, "service": _bench_service, "api": _bench_api}
+
+
+def _regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    found: list[str] = []
+    for name, current in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if previous is None:
+            continue
+        before, after = previous["throughput_per_s"], current["throughput_per_s"]
+        if before and after < before * (1 - tolerance):
+            found.append(f"{name}: throughput {before} -> {after}/s")
+        before, after = previous["latency"].get("p99_ms"), current["latency"].get("p99_ms")
+        if before and after and after > before * (1 + tolerance):
+            found.append(f"{name}: p99 {before} -> {after} ms")
+    return found
+
+
+def _git_revision() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Offline throughput and latency benchmark. The LLM, embeddings and Redis are "
+            "replaced by deterministic local stand-ins and the vector store is the local "
+            "backend, so runs are comparable across releases without any credentials."
+        )
+    )
+    parser.add_argument(
+        "--workloads", default="ingest,service,api", help="Comma-separated subset to run"
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=200,
+        help="Distinct questions; fewer means more response and semantic cache hits",
+    )
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--ingest-workers", type=int, default=4)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=2.0)
+    parser.add_argument("--redis", choices=("memory", "fake"), default="memory")
+    parser.add_argument(
+        "--semantic-cache",
+        action="store_true",
+        help="Enable the semantic response cache (off by default, as in the app)",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Also report the peak of Python allocations per workload (slows the run)",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Relative throughput drop or p99 increase reported as a regression",
+    )
+    args = parser.parse_args()
+
+    workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = set(workloads) - set(_WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+    if ("service" in workloads or "api" in workloads) and "ingest" not in workloads:
+        # Chat turns need something to retrieve.
+        workloads.insert(0, "ingest")
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    results: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+        },
+        "workloads": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="offline-benchmark-") as workdir:
+        harness = Harness(args, workdir)
+        for name in workloads:
+            results["workloads"][name] = _WORKLOADS[name](harness, args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = _regressions(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,62 @@
 import argparse
 
-from conversational_agent.core.config import get_settings
+from conversational_agent.core.config import Settings, get_settings
 from conversational_agent.infrastructure.embeddings import EmbeddingClient
+from conversational_agent.infrastructure.lexical_index import build_lexical_index
 from conversational_agent.infrastructure.vector_store import VectorStore
+from conversational_agent.services.bulk_ingestion_service import (
+    BulkIngestionService,
+    ingest_root,
+    resolve_pdf_paths,
+)
 from conversational_agent.services.ingestion_service import IngestionService
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Ingest a PDF into vector store")
-    parser.add_argument("--path", required=True, help="Path to PDF file")
-    parser.add_argument("--source-id", required=True, help = "Optional source id override" )
+    parser = argparse.ArgumentParser(description="Ingest PDFs into vector store")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--path", help="Path to a single PDF file")
+    source.add_argument("--dir", help="Directory to scan recursively for PDFs")
+    source.add_argument("--glob", help="Glob pattern matching PDFs (supports **)")
+    source.add_argument("--manifest", help="Text file listing one PDF path per line")
+    parser.add_argument("--source-id", help = "Optional source id override (single PDF only)" )
+    parser.add_argument("--workers", type=int, help="Extraction processes for bulk ingestion")
+    parser.add_argument("--journal", help="Progress journal used to resume bulk ingestion")
     args = parser.parse_args()
 
     settings = get_settings()
+    vector_store = VectorStore(settings)
+    embeddings = EmbeddingClient(settings)
     service = IngestionService(
         settings=settings,
-        embeddings=EmbeddingClient(settings),
-        vector_store=VectorStore(settings),
+        embeddings=embeddings,
+        vector_store=vector_store,
+        lexical_index=build_lexical_index(settings, vector_store),
     )
-    source_id, count = service.ingest_pdf(args.path,source_id=args.source_id)
-    print(f"Ingested source id={source_id} chunks={count}")
+    try:
+        _ingest(args, settings, service)
+    finally:
+        # Writes out the embedding cache's buffered rows.
+        embeddings.close()
+
+
+def _ingest(args: argparse.Namespace, settings: Settings, service: IngestionService) -> None:
+    if args.path:
+        source_id, count = service.ingest_pdf(args.path,source_id=args.source_id)
+        print(f"Ingested source id={source_id} chunks={count}")
+        return
+
+    paths = resolve_pdf_paths(directory=args.dir, pattern=args.glob, manifest=args.manifest)
+    root = ingest_root(directory=args.dir, pattern=args.glob, manifest=args.manifest)
+    bulk = BulkIngestionService(service, workers=args.workers or settings.ingest_workers)
+    result = bulk.ingest(paths, journal_path=args.journal, root=root)
+    print(
+        f"Ingested docs={result.documents} chunks={result.chunks} "
+        f"skipped={result.skipped} failed={len(result.failed)} "
+        f"elapsed={result.elapsed_seconds:.1f}s "
+        f"docs/sec={result.docs_per_second:.2f} chunks/sec={result.chunks_per_second:.1f}"
+    )
+    for path, error in result.failed.items():
+        print(f"FAILED {path}: {error}")
 
 if __name__ == "__main__":
-    main()    
\ No newline at end of file
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+import numpy as np
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    path: str,
+    queries: list[str],
+    remaining: list[int],
+    latencies: list[float],
+    errors: list[int],
+) -> None:
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        payload = {
+            "session_id": uuid.uuid4().hex,
+            "query": queries[remaining[0] % len(queries)],
+        }
+        began = time.perf_counter()
+        try:
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors[0] += 1
+            continue
+        latencies.append(time.perf_counter() - began)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    queries = [f"{args.query} ({idx})" for idx in range(args.distinct)]
+    remaining = [args.requests]
+    latencies: list[float] = []
+    errors = [0]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _worker(client, args.path, queries, remaining, latencies, errors)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    samples = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    print(
+        f"concurrency={args.concurrency} requests={args.requests} ok={len(latencies)} "
+        f"errors={errors[0]} elapsed={elapsed:.2f}s rps={len(latencies) / elapsed:.1f} "
+        f"p50={p50:.0f}ms p95={p95:.0f}ms p99={p99:.0f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Concurrent load against the chat endpoint. Run it against the sync and "
+            "the async build with the same backends to compare throughput."
+        )
+    )
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/v1/chat")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--query", default="What does the onboarding guide say about VPN access?")
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=1000,
+        help="Distinct query variants, so response caches do not serve every request",
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
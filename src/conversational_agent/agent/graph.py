@@ -1,28 +1,131 @@
+from collections.abc import AsyncIterator, Iterator
 from typing import Any
+from uuid import UUID
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import LLMResult
 from langgraph.prebuilt import create_react_agent
 
-from conversational_agent.agent.tools import build_retrieve_tool
+from conversational_agent.agent.tools import RETRIEVAL_CONTEXT_KEY, build_retrieve_tool
 from conversational_agent.core.config import Settings
 from conversational_agent.infrastructure.llm import build_chat_model
-from conversational_agent.services.retrieval_service import RetrievalService
+from conversational_agent.observability.instrumentation import (
+    Stage,
+    instrument,
+    instrumentation_enabled,
+)
+from conversational_agent.services.context_assembler import ContextAssembler
+from conversational_agent.services.retrieval_service import RetrievalContext, RetrievalService
 
 
 SYSTEM_PROMPT = (
     "You are an enterprise conversational assistant. "
-    "Use tools whenever retrieval is needed. build_chat_model"
+    "Use tools whenever retrieval is needed. "
     "Ground answers in retrieved context and clearly state when context is insufficient."
 )
 
 class AgentService:
-    def __init__(self,settings: Settings, retrieval_service:RetrievalService) -> None:
-        self._llm = build_chat_model(settings)
-        self._tool = build_retrieval_tool(retrieval_service)
+    def __init__(
+        self,
+        settings: Settings,
+        retrieval_service: RetrievalService,
+        llm: BaseChatModel | None = None,
+    ) -> None:
+        self._llm = llm or build_chat_model(settings)
+        self._tool = build_retrieve_tool(retrieval_service, ContextAssembler(settings))
         self._graph = create_react_agent(self._llm, tools=[self._tool])
+        self._callbacks = _LLMStageCallbacks()
 
-    def run(self, query:str, history:list[dict[str, str]]) -> str:
-        messages: list[Any] = [SystemMessage(content=SYSTEM_PROMPT)]    
+    def run(
+        self,
+        query: str,
+        history: list[dict[str, str]],
+        retrieval_context: RetrievalContext | None = None,
+    ) -> str:
+        with instrument("agent.run", {"agent.history_messages": len(history)}):
+            result = self._graph.invoke(
+                {"messages": self._messages(query, history)},
+                config=self._config(retrieval_context),
+            )
+        final_messages = result.get("messages",[])
+        if not final_messages:
+            return "I could not generatea response"
+
+        return str(final_messages[-1].content)
+
+    async def arun(
+        self,
+        query: str,
+        history: list[dict[str, str]],
+        retrieval_context: RetrievalContext | None = None,
+    ) -> str:
+        with instrument("agent.run", {"agent.history_messages": len(history)}):
+            result = await self._graph.ainvoke(
+                {"messages": self._messages(query, history)},
+                config=self._config(retrieval_context),
+            )
+        final_messages = result.get("messages",[])
+        if not final_messages:
+            return "I could not generatea response"
+
+        return str(final_messages[-1].content)
+
+    def stream(
+        self,
+        query: str,
+        history: list[dict[str, str]],
+        retrieval_context: RetrievalContext | None = None,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yields ``(event, data)`` pairs while the agent runs.
+
+        ``token`` carries answer text as the model produces it, ``tool_call`` and
+        ``tool_result`` report retrieval progress, and the last event is ``answer``
+        with the complete final message. ``reset`` precedes the ``tool_call`` of a
+        step that had already streamed tokens: that text was not the answer.
+        """
+        events = _StreamEvents()
+        for mode, chunk in self._graph.stream(
+            {"messages": self._messages(query, history)},
+            config=self._config(retrieval_context),
+            stream_mode=["messages", "updates"],
+        ):
+            yield from events.translate(mode, chunk)
+        yield "answer", {"text": events.answer or "I could not generatea response"}
+
+    async def astream(
+        self,
+        query: str,
+        history: list[dict[str, str]],
+        retrieval_context: RetrievalContext | None = None,
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Async ``stream``; yields the same events."""
+        events = _StreamEvents()
+        async for mode, chunk in self._graph.astream(
+            {"messages": self._messages(query, history)},
+            config=self._config(retrieval_context),
+            stream_mode=["messages", "updates"],
+        ):
+            for item in events.translate(mode, chunk):
+                yield item
+        yield "answer", {"text": events.answer or "I could not generatea response"}
+
+    def _config(self, retrieval_context: RetrievalContext | None) -> dict[str, Any]:
+        config: dict[str, Any] = {"configurable": {RETRIEVAL_CONTEXT_KEY: retrieval_context}}
+        if instrumentation_enabled():
+            config["callbacks"] = [self._callbacks]
+        return config
+
+    @staticmethod
+    def _messages(query: str, history: list[dict[str, str]]) -> list[Any]:
+        messages: list[Any] = [SystemMessage(content=SYSTEM_PROMPT)]
 
         for item in history:
             role = item.get("role","")
@@ -31,11 +134,98 @@ class AgentService:
                 messages.append(HumanMessage(content=content))
             elif role == "assistant":
                 messages.append(AIMessage(content=content))
+            elif role == "summary":
+                messages.append(
+                    SystemMessage(content=f"Summary of the earlier conversation:\n{content}")
+                )
 
-        message.append(HumanMessage(content=query))
-        result = self._graph.invoke({"messages":messages})
-        final_messages = result.get("messages",[])
-        if not final_messages:
-            return "I could not generatea response"
+        messages.append(HumanMessage(content=query))
+        return messages
+
+
+class _StreamEvents:
+    """Translates one run's LangGraph stream items into ``(event, data)`` pairs.
+
+    Whether a step is final is only known once it ends, so its tokens go out as
+    they arrive and a step that ends in a tool call is followed by ``reset``.
+    """
+
+    def __init__(self) -> None:
+        self.answer = ""
+        self._step_streamed = False
+
+    def translate(self, mode: str, chunk: Any) -> Iterator[tuple[str, dict[str, Any]]]:
+        if mode == "messages":
+            message, metadata = chunk
+            from_agent = metadata.get("langgraph_node") == "agent"
+            if isinstance(message, AIMessageChunk) and from_agent:
+                text = _text(message.content)
+                if text:
+                    self._step_streamed = True
+                    yield "token", {"text": text}
+            return
+        for update in chunk.values():
+            for message in (update or {}).get("messages", []):
+                if isinstance(message, ToolMessage):
+                    yield "tool_result", {
+                        "name": message.name,
+                        "characters": len(_text(message.content)),
+                    }
+                elif isinstance(message, AIMessage) and message.tool_calls:
+                    if self._step_streamed:
+                        yield "reset", {}
+                    self._step_streamed = False
+                    for call in message.tool_calls:
+                        yield "tool_call", {"name": call["name"], "args": call["args"]}
+                elif isinstance(message, AIMessage):
+                    self._step_streamed = False
+                    self.answer = _text(message.content)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    # Some providers stream a list of content blocks instead of a string.
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+    )
+
+
+class _LLMStageCallbacks(BaseCallbackHandler):
+    """Times every model call the agent graph makes as an ``agent.llm`` stage.
+
+    The calls happen inside LangGraph, so they are observed through callbacks;
+    their spans hang off the current ``agent.run`` span.
+    """
+
+    # Only bookkeeping happens here; running inline avoids an executor hop per
+    # callback on the async path.
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._stages: dict[UUID, Stage] = {}
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        attributes = {"llm.prompt_messages": sum(len(batch) for batch in messages)}
+        stage = instrument("agent.llm", attributes, current=False).start()
+        if isinstance(stage, Stage):
+            self._stages[run_id] = stage
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        stage = self._stages.pop(run_id, None)
+        if stage is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    stage.set("llm.input_tokens", usage.get("input_tokens", 0))
+                    stage.set("llm.output_tokens", usage.get("output_tokens", 0))
+        stage.finish()
 
-        return str(final_messages[-1].content)             
\ No newline at end of file
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        stage = self._stages.pop(run_id, None)
+        if stage is not None:
+            stage.finish(error)
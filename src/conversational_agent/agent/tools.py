@@ -1,30 +1,60 @@
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
-from conversational_agent.services.retrieval_service import RetrievalService
+from conversational_agent.domain.schemas import SourceSnippet
+from conversational_agent.observability.instrumentation import instrument
+from conversational_agent.services.context_assembler import ContextAssembler, format_snippet
+from conversational_agent.services.retrieval_service import RetrievalContext, RetrievalService
 
-class RetrievealInput(BaseModel):
-    query: str = Field(..., description="User question to search in knowledge base")
+RETRIEVAL_CONTEXT_KEY = "retrieval_context"
+TOOL_NAME = "search_knowledge_base"
 
-def build_retrieve_tool(retrieval_service:RetrievalService) -> StructuredTool:
-    def _retrieve(query:str) -> str:
-        docs = retrieval_service.search(query)
-        if not docs:
-            return "No relevant context found."
+class RetrieveInput(BaseModel):
+    query: str = Field(..., description="User question to search in knowledge base")
 
-        lines: list[str] = []
-        for doc in docs:
-            source = doc.metadata.get("source_id","unknown")
-            lines.append(f"[source={source} score={doc.score:.4f}] {doc.text}")
+def build_retrieve_tool(
+    retrieval_service:RetrievalService, assembler: ContextAssembler | None = None
+) -> StructuredTool:
+    def _retrieve(query:str, config: RunnableConfig) -> str:
+        with instrument("agent.tool", {"tool.name": TOOL_NAME}) as span:
+            context = _context(config)
+            filters = context.filters if context is not None else None
+            docs = retrieval_service.search(query, context=context, stage="tool", filters=filters)
+            span.set("tool.results", len(docs))
+            return _render(docs, assembler)
 
-        return "\n\n".join(lines)
+    async def _aretrieve(query: str, config: RunnableConfig) -> str:
+        with instrument("agent.tool", {"tool.name": TOOL_NAME}) as span:
+            context = _context(config)
+            filters = context.filters if context is not None else None
+            docs = await retrieval_service.asearch(
+                query, context=context, stage="tool", filters=filters
+            )
+            span.set("tool.results", len(docs))
+            return _render(docs, assembler)
 
     return StructuredTool.from_function(
-        name="search_knowledge_base",
+        name=TOOL_NAME,
         description=(
             "Searches the internal Pinecone knowledge base and returns relevant snippets. "
             "Use this before drafting a final answer for factual questions."
         ),
         func=_retrieve,
+        coroutine=_aretrieve,
         args_schema=RetrieveInput,
-    )        
\ No newline at end of file
+    )
+
+
+def _context(config: RunnableConfig) -> RetrievalContext | None:
+    context = config.get("configurable", {}).get(RETRIEVAL_CONTEXT_KEY)
+    return context if isinstance(context, RetrievalContext) else None
+
+
+def _render(docs: list[SourceSnippet], assembler: ContextAssembler | None) -> str:
+    if not docs:
+        return "No relevant context found."
+    if assembler is not None:
+        return assembler.assemble(docs).text
+
+    return "\n\n".join(format_snippet(doc) for doc in docs)
@@ -3,7 +3,10 @@ from functools import lru_cache
 from conversational_agent.agent.graph import AgentService
 from conversational_agent.core.config import get_settings
 from conversational_agent.infrastructure.embeddings import EmbeddingClient
+from conversational_agent.infrastructure.lexical_index import LexicalIndex, build_lexical_index
 from conversational_agent.infrastructure.vector_store import VectorStore
+from conversational_agent.services.auth_service import AuthService
+from conversational_agent.services.bulk_ingestion_service import BulkIngestionService
 from conversational_agent.services.chat_service import (
     ChatService,
     InMemoryResponseCache,
@@ -13,25 +16,66 @@ from conversational_agent.services.chat_service import (
     ResponseCache,
     SessionStore,
 )
+from conversational_agent.services.conversation_memory import (
+    ConversationMemory,
+    ConversationSummarizer,
+)
 from conversational_agent.services.ingestion_service import IngestionService
+from conversational_agent.services.reranker import Reranker
 from conversational_agent.services.retrieval_service import RetrievalService
+from conversational_agent.services.semantic_cache import (
+    InMemorySemanticCache,
+    RedisSemanticCache,
+    SemanticCache,
+)
+from conversational_agent.services.single_flight import SingleFlight, build_single_flight
 
 @lru_cache(maxsize=1)
-def get_embeddings_client() -> EmbeddingClient:
+def get_embedding_client() -> EmbeddingClient:
     return EmbeddingClient(get_settings())
 
-@lru_cache(max_size=1)
+@lru_cache(maxsize=1)
 def get_vector_store() -> VectorStore:
     return VectorStore(get_settings())
 
+@lru_cache(maxsize=1)
+def get_lexical_index() -> LexicalIndex | None:
+    return build_lexical_index(get_settings(), get_vector_store())
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Reranker | None:
+    settings = get_settings()
+    return Reranker(settings) if settings.rerank_enabled else None
+
 @lru_cache(maxsize=1)
 def get_retrieval_service() -> RetrievalService:
-    return RetrievalService(get_settings(), get_embedding_client(), get_vector_store())
+    return RetrievalService(
+        get_settings(),
+        get_embedding_client(),
+        get_vector_store(),
+        get_lexical_index(),
+        get_reranker(),
+    )
 
 
 @lru_cache(maxsize=1)
 def get_ingestion_service() -> IngestionService:
-    return IngestionService(get_settings(), get_embedding_client(), get_vector_store())
+    return IngestionService(
+        get_settings(),
+        get_embedding_client(),
+        get_vector_store(),
+        lexical_index=get_lexical_index(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_bulk_ingestion_service() -> BulkIngestionService:
+    return BulkIngestionService(get_ingestion_service(), workers=get_settings().ingest_workers)
+
+
+@lru_cache(maxsize=1)
+def get_auth_service() -> AuthService:
+    return AuthService(get_settings())
 
 
 @lru_cache(maxsize=1)
@@ -41,21 +85,67 @@ def get_agent_service() -> AgentService:
 @lru_cache(maxsize=1)
 def get_session_store() -> SessionStore:
     settings = get_settings()
+    store: SessionStore
     if settings.redis_url:
-        return ReddisSessionStore(settings)
-    return InMemorySessionStore()
+        store = RedisSessionStore(settings)
+    else:
+        store = InMemorySessionStore(
+            max_messages=max(2, settings.session_max_turns * 2),
+            max_sessions=settings.memory_session_max_entries,
+            max_bytes=settings.memory_session_max_bytes,
+            ttl_seconds=settings.session_ttl_seconds,
+        )
+    summarizer = ConversationSummarizer(settings) if settings.session_summary_enabled else None
+    return ConversationMemory(settings, store, summarizer)
 
 @lru_cache(maxsize=1)
 def get_response_cache() -> ResponseCache:
     settings = get_settings()
-    if settings.redis.url:
+    if settings.redis_url:
         return RedisResponseCache(settings)
-    return InMemoryResponseCache()
+    return InMemoryResponseCache(
+        max_entries=settings.memory_response_cache_max_entries,
+        max_bytes=settings.memory_response_cache_max_bytes,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
 
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache | None:
+    settings = get_settings()
+    if not settings.semantic_cache_enabled:
+        return None
+    if settings.redis_url:
+        cache = RedisSemanticCache(settings)
+        # Built during startup, so loading the shared entries here keeps it off requests.
+        cache.warm()
+        return cache
+    return InMemorySemanticCache(
+        threshold=settings.semantic_cache_threshold,
+        max_entries=settings.semantic_cache_max_entries,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+        near_miss_margin=settings.semantic_cache_near_miss_margin,
+    )
+
+@lru_cache(maxsize=1)
+def get_single_flight() -> SingleFlight | None:
+    return build_single_flight(get_settings())
+
+@lru_cache(maxsize=1)
 def get_chat_service() -> ChatService:
     return ChatService(
         get_agent_service(),
         get_retrieval_service(),
         get_session_store(),
         get_response_cache(),
-    )
\ No newline at end of file
+        get_semantic_cache(),
+        get_single_flight(),
+    )
+
+def close_services() -> None:
+    """Releases what the cached services hold open; called on app shutdown."""
+    if get_session_store.cache_info().currsize:
+        store = get_session_store()
+        if isinstance(store, ConversationMemory):
+            store.close()
+    if get_embedding_client.cache_info().currsize:
+        get_embedding_client().close()
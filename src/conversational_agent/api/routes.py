@@ -1,19 +1,41 @@
-from fastapi import APIRouter, HTTPException
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
 
-from conversational_agent.api.deps import get_chat_service, get_ingestion_service
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from conversational_agent.api.deps import (
+    get_bulk_ingestion_service,
+    get_chat_service,
+    get_ingestion_service,
+)
 from conversational_agent.domain.schemas import (
+    BulkIngestJobResponse,
+    BulkIngestRequest,
+    BulkIngestResponse,
     ChatRequest,
     ChatResponse,
     HealthResponse,
     IngestPDFRequest,
     IngestResponse,
 )
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+from conversational_agent.services.bulk_ingestion_service import (
+    BulkIngestJob,
+    ingest_root,
+    resolve_pdf_paths,
+)
+from conversational_agent.services.chat_service import ChatService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1",tags=["api"])
 
 
 @router.get("/health", response_model=HealthResponse)
-def health() -> HealthResponse:
+async def health() -> HealthResponse:
     return HealthResponse (status="ok")
 
 
@@ -28,7 +50,104 @@ def ingest_pdf(payload: IngestPDFRequest)-> IngestResponse:
     return IngestResponse(source_id=source_id, chunks_ingested=count)
 
 
+@router.post("/ingest/bulk", response_model=BulkIngestJobResponse, status_code=202)
+def ingest_bulk(payload: BulkIngestRequest) -> BulkIngestJobResponse:
+    # Ingesting a large corpus takes minutes, so it runs as a background job and
+    # the caller polls GET /ingest/bulk/{job_id} for the result.
+    service = get_bulk_ingestion_service()
+    try:
+        paths = resolve_pdf_paths(
+            directory=payload.directory, pattern=payload.glob, manifest=payload.manifest
+        )
+        root = ingest_root(
+            directory=payload.directory, pattern=payload.glob, manifest=payload.manifest
+        )
+        job = service.submit(paths, journal_path=payload.journal_path, root=root)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _job_response(job)
+
+
+@router.get("/ingest/bulk/{job_id}", response_model=BulkIngestJobResponse)
+async def ingest_bulk_status(job_id: str) -> BulkIngestJobResponse:
+    job = get_bulk_ingestion_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown bulk ingestion job: {job_id}")
+    return _job_response(job)
+
+
+def _job_response(job: BulkIngestJob) -> BulkIngestJobResponse:
+    result = job.result
+    return BulkIngestJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        documents_total=job.documents_total,
+        error=job.error,
+        result=None
+        if result is None
+        else BulkIngestResponse(
+            documents_ingested=result.documents,
+            chunks_ingested=result.chunks,
+            skipped=result.skipped,
+            failed=result.failed,
+            elapsed_seconds=result.elapsed_seconds,
+            docs_per_second=result.docs_per_second,
+            chunks_per_second=result.chunks_per_second,
+        ),
+    )
+
+
 @router.post("/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest) -> ChatResponse:
-    service = get_chat_service()
-    return service.chat(session_id=payload.session_id, query=payload.query)
\ No newline at end of file
+async def chat(
+    payload: ChatRequest, service: ChatService = Depends(get_chat_service)
+) -> ChatResponse:
+    # Async all the way down, so a turn waiting on Redis, the vector store or the
+    # LLM does not hold one of the threadpool workers sync routes run on. The
+    # service comes through Depends, which resolves the sync factory in the
+    # threadpool: the cold first build never runs on the event loop.
+    try:
+        filters = MetadataFilter.parse(payload.filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return await service.achat(
+        session_id=payload.session_id, query=payload.query, filters=filters
+    )
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    payload: ChatRequest, service: ChatService = Depends(get_chat_service)
+) -> StreamingResponse:
+    """Server-Sent Events variant of ``/chat``.
+
+    Events: ``sources``, ``tool_call``, ``tool_result``, ``token`` (answer text
+    deltas), ``reset`` (discard the tokens so far: the model went on to call a
+    tool), then ``done`` with the full answer, or ``error`` if the turn failed.
+    Like ``/chat`` it runs on the event loop, so an open stream holds no thread.
+    """
+    try:
+        filters = MetadataFilter.parse(payload.filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    events = service.achat_stream(
+        session_id=payload.session_id, query=payload.query, filters=filters
+    )
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_stream(events: AsyncIterator[tuple[str, dict[str, Any]]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield _sse(event, data)
+    except Exception:
+        # Headers are already sent, so the failure can only be reported in-band.
+        logger.exception("streaming chat turn failed")
+        yield _sse("error", {"detail": "Chat turn failed"})
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -36,14 +36,54 @@ class Settings(BaseSettings):
         default="amazon.titan-embed-text-v2:0",
         alias="AWS_BEDROCK_EMBEDDING_MODEL_ID",
     )
+    embedding_max_concurrency: int = Field(default=8, alias="EMBEDDING_MAX_CONCURRENCY")
+    embedding_max_retries: int = Field(default=5, alias="EMBEDDING_MAX_RETRIES")
+    embedding_retry_base_seconds: float = Field(
+        default=0.2, alias="EMBEDDING_RETRY_BASE_SECONDS"
+    )
+    embedding_cache_enabled: bool = Field(default=True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_max_entries: int = Field(default=50000, alias="EMBEDDING_CACHE_MAX_ENTRIES")
+    embedding_cache_path: str | None = Field(default=None, alias="EMBEDDING_CACHE_PATH")
+    local_vector_store_path: str = Field(default=".vector_store", alias="LOCAL_VECTOR_STORE_PATH")
+    local_index_type: str = Field(default="flat", alias="LOCAL_INDEX_TYPE")
+    ivf_nlist: int = Field(default=256, alias="IVF_NLIST")
+    ivf_nprobe: int = Field(default=8, alias="IVF_NPROBE")
+    vector_query_max_concurrency: int = Field(default=8, alias="VECTOR_QUERY_MAX_CONCURRENCY")
     aws_opensearch_endpoint: str | None = Field(default=None, alias="AWS_OPENSEARCH_ENDPOINT")
     aws_opensearch_index_name: str = Field(
         default="conversation-rag-index", alias="AWS_OPENSEARCH_INDEX_NAME"
     )
 
     top_k: int = Field(default=5, alias="TOP_K")
+    retrieval_mode: str = Field(default="vector", alias="RETRIEVAL_MODE")
+    # Unset follows RETRIEVAL_MODE (on for hybrid); set it explicitly to build the
+    # index during ingestion ahead of switching to hybrid.
+    lexical_index_enabled: bool | None = Field(default=None, alias="LEXICAL_INDEX_ENABLED")
+    lexical_index_path: str = Field(default=".lexical_index.sqlite", alias="LEXICAL_INDEX_PATH")
+    hybrid_candidates: int = Field(default=20, alias="HYBRID_CANDIDATES")
+    hybrid_rrf_k: int = Field(default=60, alias="HYBRID_RRF_K")
+    lexical_max_concurrency: int = Field(default=8, alias="LEXICAL_MAX_CONCURRENCY")
+    rerank_enabled: bool = Field(default=False, alias="RERANK_ENABLED")
+    rerank_model: str = Field(
+        default="cross-encoder/ms-marco-MiniLM-L-6-v2", alias="RERANK_MODEL"
+    )
+    rerank_max_candidates: int = Field(default=30, alias="RERANK_MAX_CANDIDATES")
+    rerank_score_window: float = Field(default=0.35, alias="RERANK_SCORE_WINDOW")
+    rerank_batch_size: int = Field(default=32, alias="RERANK_BATCH_SIZE")
+    rerank_cache_max_entries: int = Field(default=20000, alias="RERANK_CACHE_MAX_ENTRIES")
+    context_token_budget: int = Field(default=1500, alias="CONTEXT_TOKEN_BUDGET")
+    context_dedup_threshold: float = Field(default=0.8, alias="CONTEXT_DEDUP_THRESHOLD")
+    context_shingle_size: int = Field(default=3, alias="CONTEXT_SHINGLE_SIZE")
+    context_minhash_permutations: int = Field(default=64, alias="CONTEXT_MINHASH_PERMUTATIONS")
     chunk_size: int = Field(default=1000, alias="CHUNK_SIZE")
     chunk_overlap: int = Field(default=120, alias="CHUNK_OVERLAP")
+    chunk_mode: str = Field(default="chars", alias="CHUNK_MODE")
+    chunk_encoding: str = Field(default="cl100k_base", alias="CHUNK_ENCODING")
+    ingest_embed_batch_size: int = Field(default=64, alias="INGEST_EMBED_BATCH_SIZE")
+    ingest_upsert_batch_size: int = Field(default=100, alias="INGEST_UPSERT_BATCH_SIZE")
+    ingest_queue_size: int = Field(default=4, alias="INGEST_QUEUE_SIZE")
+    ingest_workers: int = Field(default=4, alias="INGEST_WORKERS")
+    ingest_manifest_dir: str = Field(default=".ingest_manifests", alias="INGEST_MANIFEST_DIR")
     semantic_similarity_threshold: float = Field(
         default=0.72, alias="SEMANTIC_SIMILARITY_THRESHOLD"
     )
@@ -51,10 +91,43 @@ class Settings(BaseSettings):
     semantic_max_sentences_per_chunk: int = Field(
         default=8, alias="SEMANTIC_MAX_SENTENCES_PER_CHUNK"
     )
+    semantic_embed_batch_size: int = Field(default=256, alias="SEMANTIC_EMBED_BATCH_SIZE")
 
     redis_url: str | None = Field(default=None, alias="REDIS_URL")
+    redis_max_connections: int = Field(default=64, alias="REDIS_MAX_CONNECTIONS")
     session_ttl_seconds: int = Field(default=86400, alias="SESSION_TTL_SECONDS")
+    memory_session_max_entries: int = Field(default=10000, alias="MEMORY_SESSION_MAX_ENTRIES")
+    memory_session_max_bytes: int = Field(
+        default=64 * 1024 * 1024, alias="MEMORY_SESSION_MAX_BYTES"
+    )
+    memory_response_cache_max_entries: int = Field(
+        default=10000, alias="MEMORY_RESPONSE_CACHE_MAX_ENTRIES"
+    )
+    memory_response_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, alias="MEMORY_RESPONSE_CACHE_MAX_BYTES"
+    )
+    session_max_turns: int = Field(default=10, alias="SESSION_MAX_TURNS")
+    session_history_token_budget: int = Field(
+        default=2000, alias="SESSION_HISTORY_TOKEN_BUDGET"
+    )
+    session_summary_enabled: bool = Field(default=True, alias="SESSION_SUMMARY_ENABLED")
+    session_summary_max_words: int = Field(default=200, alias="SESSION_SUMMARY_MAX_WORDS")
+    session_summary_workers: int = Field(default=2, alias="SESSION_SUMMARY_WORKERS")
     response_cache_ttl_seconds: int = Field(default=1800, alias="RESPONSE_CACHE_TTL_SECONDS")
+    # Off until calibrated for the embedding model in use: a loose threshold
+    # serves one question's answer to a different question on the same topic.
+    semantic_cache_enabled: bool = Field(default=False, alias="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(default=0.95, alias="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_max_entries: int = Field(default=10000, alias="SEMANTIC_CACHE_MAX_ENTRIES")
+    semantic_cache_near_miss_margin: float = Field(
+        default=0.05, alias="SEMANTIC_CACHE_NEAR_MISS_MARGIN"
+    )
+    coalesce_enabled: bool = Field(default=True, alias="COALESCE_ENABLED")
+    coalesce_lock_ttl_seconds: float = Field(default=60.0, alias="COALESCE_LOCK_TTL_SECONDS")
+    coalesce_wait_seconds: float = Field(default=30.0, alias="COALESCE_WAIT_SECONDS")
+    coalesce_poll_interval_seconds: float = Field(
+        default=0.05, alias="COALESCE_POLL_INTERVAL_SECONDS"
+    )
 
     auth_secret_key: str = Field(default="change_this_to_a_long_random_secret", alias="AUTH_SECRET_KEY")
     auth_algorithm: str = Field(default="HS256", alias="AUTH_ALGORITHM")
@@ -67,6 +140,8 @@ class Settings(BaseSettings):
     otel_enabled: bool = Field(default=True, alias="OTEL_ENABLED")
     otel_service_name: str = Field(default="conversational-agentic-genai", alias="OTEL_SERVICE_NAME")
     otel_exporter_otlp_endpoint: str | None = Field(default=None, alias="OTEL_EXPORTER_OTLP_ENDPOINT")
+    stage_metrics_enabled: bool = Field(default=True, alias="STAGE_METRICS_ENABLED")
+    stage_spans_enabled: bool = Field(default=True, alias="STAGE_SPANS_ENABLED")
 
 
 @lru_cache(maxsize=1)
@@ -2,7 +2,7 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
-class Healthresponse(BaseModel):
+class HealthResponse(BaseModel):
     status: str = "ok"
 
 class IngestPDFRequest(BaseModel):
@@ -15,9 +15,44 @@ class IngestResponse(BaseModel):
     chunks_ingested: int
 
 
+class BulkIngestRequest(BaseModel):
+    directory: str | None = Field(default=None, description="Directory to scan recursively")
+    glob: str | None = Field(default=None, description="Glob pattern matching PDF files")
+    manifest: str | None = Field(default=None, description="File listing one PDF path per line")
+    journal_path: str | None = Field(
+        default=None, description="Progress journal used to resume an interrupted run"
+    )
+
+
+class BulkIngestResponse(BaseModel):
+    documents_ingested: int
+    chunks_ingested: int
+    skipped: int
+    failed: dict[str, str]
+    elapsed_seconds: float
+    docs_per_second: float
+    chunks_per_second: float
+
+
+class BulkIngestJobResponse(BaseModel):
+    job_id: str
+    status: str
+    documents_total: int
+    result: BulkIngestResponse | None = None
+    error: str | None = None
+
+
 class ChatRequest(BaseModel):
     session_id: str = Field(..., min_length=1)
     query: str = Field(..., min_length=1)
+    filters: dict[str, Any] | None = Field(
+        default=None,
+        description=(
+            "Metadata filter restricting retrieval, e.g. "
+            '{"source_id": "manual", "chunk_index": {"$gte": 10}}; '
+            "supports equality, $in, $gt, $gte, $lt and $lte"
+        ),
+    )
 
 
 class SourceSnippet(BaseModel):
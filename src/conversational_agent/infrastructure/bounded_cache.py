@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from conversational_agent.observability.metrics import (
+    MEMORY_STORE_BYTES,
+    MEMORY_STORE_ENTRIES,
+    MEMORY_STORE_EVICTIONS,
+    MEMORY_STORE_LOOKUPS,
+)
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class BoundedCacheStats:
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _Entry(Generic[V]):
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: V, size: int, expires_at: float) -> None:
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class BoundedCache(Generic[V]):
+    """Thread-safe LRU map bounded by entry count and estimated bytes, with a TTL.
+
+    Entries expire ``ttl_seconds`` after they were last written; reads refresh
+    recency but not expiry, like a Redis key whose ``EXPIRE`` is reset on write.
+    Expired entries are dropped when read and by a full sweep that runs at most
+    every ``sweep_interval_seconds`` during writes, so idle keys cannot pin
+    memory until the LRU limit pushes them out. ``sizer`` estimates the bytes an
+    entry holds; the key is counted on top of it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float | None,
+        sizer: Callable[[V], int],
+        sweep_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError(f"{name} limits must be positive")
+        self._name = name
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds if ttl_seconds and ttl_seconds > 0 else float("inf")
+        self._sizer = sizer
+        self._sweep_interval = sweep_interval_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry[V]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._next_sweep = clock() + sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._lookups = {
+            result: MEMORY_STORE_LOOKUPS.labels(store=name, result=result)
+            for result in ("hit", "miss")
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                self._drop(key, "expired")
+                entry = None
+            if entry is None:
+                self._misses += 1
+                self._lookups["miss"].inc()
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._lookups["hit"].inc()
+            return entry.value
+
+    def peek(self, key: str) -> V | None:
+        """``get`` without touching recency or hit statistics, for read-modify-write."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= self._clock():
+                return None
+            return entry.value
+
+    def set(self, key: str, value: V) -> None:
+        size = len(key) + self._sizer(value)
+        with self._lock:
+            now = self._clock()
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            if size > self._max_bytes:
+                # Storing it would evict everything else and still not fit.
+                self._evictions += 1
+                MEMORY_STORE_EVICTIONS.labels(store=self._name, reason="oversized").inc()
+                self._publish()
+                return
+            self._entries[key] = _Entry(value, size, now + self._ttl)
+            self._bytes += size
+            if now >= self._next_sweep:
+                self._sweep(now)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._drop(next(iter(self._entries)), "lru")
+            self._publish()
+
+    def pop(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry.size
+            self._publish()
+            return entry.value
+
+    def stats(self) -> BoundedCacheStats:
+        with self._lock:
+            return BoundedCacheStats(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+            )
+
+    def _sweep(self, now: float) -> None:
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            self._drop(key, "expired")
+        self._next_sweep = now + self._sweep_interval
+
+    def _drop(self, key: str, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if reason == "expired":
+            self._expirations += 1
+        else:
+            self._evictions += 1
+        MEMORY_STORE_EVICTIONS.labels(store=self._name, reason=reason).inc()
+
+    def _publish(self) -> None:
+        MEMORY_STORE_ENTRIES.labels(store=self._name).set(len(self._entries))
+        MEMORY_STORE_BYTES.labels(store=self._name).set(self._bytes)
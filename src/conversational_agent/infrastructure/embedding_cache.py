@@ -0,0 +1,242 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from conversational_agent.observability.metrics import (
+    EMBEDDING_CACHE_BYTES,
+    EMBEDDING_CACHE_LOOKUPS,
+)
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheStats:
+    hits: int
+    misses: int
+    memory_entries: int
+    memory_bytes: int
+    disk_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache keyed by (model id, normalized text hash).
+
+    Vectors are kept as float32 in an in-process LRU tier and, when ``path`` is set,
+    in a SQLite file so they survive restarts and are shared by ingestion workers.
+    Disk writes are buffered and written in one transaction per ``commit_every``
+    rows or ``commit_interval`` seconds, so no write lock is held between
+    batches; each batch trims the file to the ``max_disk_entries`` most recently
+    used vectors.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_memory_entries: int,
+        path: str | None = None,
+        max_disk_entries: int | None = None,
+        commit_every: int = 256,
+        commit_interval: float = 1.0,
+    ) -> None:
+        self._model_id = model_id
+        self._max_memory_entries = max_memory_entries
+        self._max_disk_entries = max_disk_entries
+        self._commit_every = max(1, commit_every)
+        self._commit_interval = commit_interval
+        self._pending_rows: dict[str, tuple[bytes, int]] = {}
+        self._pending_touches: dict[str, int] = {}
+        self._last_commit = time.monotonic()
+        self._clock = 0
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._memory_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._path = path
+        self._db: sqlite3.Connection | None = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "used" not in columns:
+                self._db.execute(
+                    "ALTER TABLE embeddings ADD COLUMN used INTEGER NOT NULL DEFAULT 0"
+                )
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+            self._db.commit()
+            self._clock = self._db.execute(
+                "SELECT COALESCE(MAX(used), 0) FROM embeddings"
+            ).fetchone()[0]
+
+    def key(self, text: str) -> str:
+        normalized = " ".join(text.split())
+        payload = f"{self._model_id}\0{normalized}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        keys = [self.key(text) for text in texts]
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            memory_hits = sum(1 for key in keys if key in found)
+            if found and self._db is not None:
+                # Hot vectors are served from memory; keep them recent on disk too.
+                self._touch(list(found))
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self._db is not None:
+                loaded = self._load(missing)
+                for key, vector in loaded.items():
+                    found[key] = vector
+                    self._remember(key, vector)
+                if loaded:
+                    self._touch(list(loaded))
+            if self._db is not None:
+                self._maybe_commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for vector in results if vector is not None)
+            self._hits += hits
+            self._misses += len(keys) - hits
+
+        EMBEDDING_CACHE_LOOKUPS.labels(result="memory_hit").inc(memory_hits)
+        EMBEDDING_CACHE_LOOKUPS.labels(result="disk_hit").inc(hits - memory_hits)
+        EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(len(keys) - hits)
+        return [vector.tolist() if vector is not None else None for vector in results]
+
+    def put_many(self, texts: list[str], vectors: list[list[float]]) -> None:
+        rows = [
+            (self.key(text), np.asarray(vector, dtype=np.float32))
+            for text, vector in zip(texts, vectors, strict=True)
+        ]
+        with self._lock:
+            for key, vector in rows:
+                self._remember(key, vector)
+            if self._db is not None:
+                self._clock += 1
+                for key, vector in rows:
+                    self._pending_rows[key] = (vector.tobytes(), self._clock)
+                self._maybe_commit()
+        self._publish_sizes()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+
+    def stats(self) -> EmbeddingCacheStats:
+        with self._lock:
+            return EmbeddingCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                memory_entries=len(self._memory),
+                memory_bytes=self._memory_bytes,
+                disk_bytes=self._disk_bytes(),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+                self._db.close()
+                self._db = None
+
+    def _load(self, keys: list[str]) -> dict[str, np.ndarray]:
+        assert self._db is not None
+        loaded = {
+            key: np.frombuffer(self._pending_rows[key][0], dtype=np.float32)
+            for key in keys
+            if key in self._pending_rows
+        }
+        keys = [key for key in keys if key not in loaded]
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            for key, blob in rows:
+                loaded[key] = np.frombuffer(blob, dtype=np.float32)
+        return loaded
+
+    def _touch(self, keys: list[str]) -> None:
+        self._clock += 1
+        for key in keys:
+            self._pending_touches[key] = self._clock
+
+    def _maybe_commit(self) -> None:
+        pending = len(self._pending_rows) + len(self._pending_touches)
+        if pending >= self._commit_every or (
+            pending and time.monotonic() - self._last_commit >= self._commit_interval
+        ):
+            self._commit()
+
+    def _commit(self) -> None:
+        assert self._db is not None
+        if not self._pending_rows and not self._pending_touches:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, used) VALUES (?, ?, ?)",
+            [(key, blob, used) for key, (blob, used) in self._pending_rows.items()],
+        )
+        self._db.executemany(
+            "UPDATE embeddings SET used = ? WHERE key = ?",
+            [(used, key) for key, used in self._pending_touches.items()],
+        )
+        if self._max_disk_entries is not None:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self._max_disk_entries:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+                    (count - self._max_disk_entries,),
+                )
+        self._db.commit()
+        self._pending_rows.clear()
+        self._pending_touches.clear()
+        self._last_commit = time.monotonic()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while len(self._memory) > self._max_memory_entries:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _disk_bytes(self) -> int:
+        if not self._path or not os.path.exists(self._path):
+            return 0
+        return sum(
+            os.path.getsize(path)
+            for path in (self._path, f"{self._path}-wal")
+            if os.path.exists(path)
+        )
+
+    def _publish_sizes(self) -> None:
+        stats = self.stats()
+        EMBEDDING_CACHE_BYTES.labels(tier="memory").set(stats.memory_bytes)
+        EMBEDDING_CACHE_BYTES.labels(tier="disk").set(stats.disk_bytes)
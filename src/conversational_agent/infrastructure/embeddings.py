@@ -1,47 +1,204 @@
+from __future__ import annotations
+
+import asyncio
 import json
+import logging
 import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
 import boto3
-from sentence_transfomers import SentneceTrasformer
+from botocore.exceptions import ClientError
 
 from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.embedding_cache import EmbeddingCache
+from conversational_agent.observability.instrumentation import instrument
+from conversational_agent.observability.metrics import (
+    EMBEDDED_TEXTS,
+    EMBEDDING_BATCH_LATENCY,
+    EMBEDDING_RETRIES,
+)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+_THROTTLING_ERROR_CODES = frozenset(
+    {
+        "ThrottlingException",
+        "TooManyRequestsException",
+        "ServiceUnavailableException",
+        "ModelNotReadyException",
+    }
+)
 
 class EmbeddingClient:
-    def __init__(self, settings: Settings)-> None:
+    def __init__(self, settings: Settings, bedrock_client: Any | None = None)-> None:
         self._settings = settings
         self._provider = settings.backend_provider.lower()
-        self._local_model = SentenceTransformer | None = None
+        self._local_model: SentenceTransformer | None = None
         self._bedrock_client = None
+        self._bedrock_executor: ThreadPoolExecutor | None = None
+        self._cache: EmbeddingCache | None = None
 
         if self._provider == "aws":
-            self._bedrock_client = boto3.client("bedrock-runtime", region_name=settings.aws_region)
+            self._bedrock_client = bedrock_client or boto3.client(
+                "bedrock-runtime", region_name=settings.aws_region
+            )
+            self._bedrock_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.embedding_max_concurrency),
+                thread_name_prefix="bedrock-embed",
+            )
         else:
+            from sentence_transformers import SentenceTransformer
+
             self._local_model = SentenceTransformer(settings.embedding_model)
 
-    def embed_documents(self, documents: list[str]) -> list[list[float]]:
+        if settings.embedding_cache_enabled:
+            model_id = (
+                settings.aws_bedrock_embedding_model_id
+                if self._provider == "aws"
+                else settings.embedding_model
+            )
+            self._cache = EmbeddingCache(
+                model_id=model_id,
+                max_memory_entries=settings.embedding_cache_max_entries,
+                path=settings.embedding_cache_path,
+                max_disk_entries=settings.embedding_cache_max_entries,
+            )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        attributes = {"embedding.provider": self._provider, "embedding.batch_size": len(texts)}
+        with instrument("embedding.documents", attributes) as span:
+            if self._cache is None:
+                return self._embed_uncached(texts)
+
+            vectors = self._cache.get_many(texts)
+            missing = list(
+                dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None)
+            )
+            span.set("embedding.cache_misses", len(missing))
+            if missing:
+                computed = dict(zip(missing, self._embed_uncached(missing), strict=True))
+                self._cache.put_many(missing, list(computed.values()))
+                # Document batches are few and large: persist each one rather
+                # than leave the last rows of a run in the write buffer.
+                self._cache.flush()
+                vectors = [
+                    vector if vector is not None else computed[text]
+                    for text, vector in zip(texts, vectors)
+                ]
+            return vectors  # type: ignore[return-value]
+
+    def embed_query(self, text:str) -> list[float]:
+        with instrument("embedding.query", {"embedding.provider": self._provider}) as span:
+            cached = self._cached_query(text)
+            span.set("cache.hit", cached is not None)
+            return cached if cached is not None else self._embed_query_uncached(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        with instrument("embedding.query", {"embedding.provider": self._provider}) as span:
+            cached = self._cached_query(text)
+            span.set("cache.hit", cached is not None)
+            if cached is not None:
+                return cached
+            # Neither boto3 nor sentence-transformers has an async API; misses run
+            # on the Bedrock pool (or a worker thread for the local model) so the
+            # event loop keeps serving other requests.
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._bedrock_executor, self._embed_query_uncached, text
+            )
+
+    def _cached_query(self, text: str) -> list[float] | None:
+        if self._cache is None:
+            return None
+        return self._cache.get_many([text])[0]
+
+    def _embed_query_uncached(self, text: str) -> list[float]:
         if self._provider == "aws":
-            return [self._normalize(self.embed_bedrock(text)) for text in texts]
-        if self._local_model is None:
-            raise ValueError("Local embedding model is not intialized")
-        vectors = self._local_model.encode(texts, normalize_embeddings=True)
-        return vectors.tolist()
+            vector = self._normalize(self._embed_bedrock_with_retry(text))
+        else:
+            if self._local_model is None:
+                raise ValueError("Local Embedding is not intialized")
+            vector = self._local_model.encode([text], normalize_embeddings=True)[0].tolist()
+        if self._cache is not None:
+            self._cache.put_many([text], [vector])
+        return vector
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # Queries and documents share one embedding space and cache here, so a
+        # batch of queries costs one cache lookup and one model call for misses.
+        return self.embed_documents(texts)
+
+    @property
+    def cache(self) -> EmbeddingCache | None:
+        return self._cache
 
-    def _embed_query(self, text:str) -> list[float]:
+    def close(self) -> None:
+        if self._bedrock_executor is not None:
+            self._bedrock_executor.shutdown(wait=True)
+        if self._cache is not None:
+            self._cache.close()
+
+    def _embed_uncached(self, texts: list[str]) -> list[list[float]]:
+        start = time.perf_counter()
         if self._provider == "aws":
-            return self._normalize(self._embed_bedrock(text))
-        if self._local_model is None:
-            raise ValueError("Local Embedding is not intialized")
-        vector = self._local_model.encode([text], normalize_embeddings=True)
-        return vector[0].tolist()
+            vectors = self._embed_bedrock_many(texts)
+        else:
+            if self._local_model is None:
+                raise ValueError("Local embedding model is not intialized")
+            vectors = self._local_model.encode(texts, normalize_embeddings=True).tolist()
+
+        elapsed = time.perf_counter() - start
+        EMBEDDED_TEXTS.labels(provider=self._provider).inc(len(texts))
+        EMBEDDING_BATCH_LATENCY.labels(provider=self._provider).observe(elapsed)
+        logger.info(
+            "embedded %d texts in %.2fs (%.1f texts/s)",
+            len(texts),
+            elapsed,
+            len(texts) / elapsed if elapsed > 0 else float("inf"),
+        )
+        return vectors
+
+    def _embed_bedrock_many(self, texts: list[str]) -> list[list[float]]:
+        if self._bedrock_executor is None or len(texts) == 1:
+            return [self._normalize(self._embed_bedrock_with_retry(text)) for text in texts]
+        # Executor.map yields results in input order regardless of completion order.
+        results = self._bedrock_executor.map(self._embed_bedrock_with_retry, texts)
+        return [self._normalize(vector) for vector in results]
+
+    def _embed_bedrock_with_retry(self, text: str) -> list[float]:
+        attempt = 0
+        while True:
+            try:
+                return self._embed_bedrock(text)
+            except ClientError as exc:
+                code = exc.response.get("Error", {}).get("Code", "")
+                if code not in _THROTTLING_ERROR_CODES:
+                    raise
+                if attempt >= self._settings.embedding_max_retries:
+                    raise
+            # Full jitter keeps concurrent workers from retrying in lockstep.
+            ceiling = self._settings.embedding_retry_base_seconds * (2**attempt)
+            time.sleep(random.uniform(0, min(ceiling, 20.0)))
+            attempt += 1
+            EMBEDDING_RETRIES.labels(provider=self._provider).inc()
+
     def _embed_bedrock(self, text: str) -> list[float]:
-        if self_bedrock_client is None:
+        if self._bedrock_client is None:
             raise ValueError("Bedrock runtime client is not intialized")
         body = json.dumps({"inputText": text})
         response = self._bedrock_client.invoke_model(
             modelId=self._settings.aws_bedrock_embedding_model_id,
             body=body,
             accept="application/json",
-            contentType="applicaton/json", 
+            contentType="application/json", 
         )
         payload = json.loads(response["body"].read())
         vector = payload.get("embedding")
@@ -55,4 +212,3 @@ class EmbeddingClient:
         if norm == 0:
             return vector
         return [x / norm for x in vector]
-    
\ No newline at end of file
@@ -0,0 +1,197 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+class IVFIndex:
+    """IVF-flat candidate index over the rows of a LocalVectorIndex matrix.
+
+    Rows are assigned to the nearest of ``nlist`` spherical k-means centroids; a
+    query only scores the rows of its ``nprobe`` closest lists. ``nprobe`` is the
+    recall/latency knob: ``nprobe == nlist`` is exact search.
+
+    Until enough rows exist to train (``train_factor * nlist``) the index reports
+    itself untrained and callers fall back to brute force. Centroids are retrained
+    when the data has grown ``retrain_growth`` times past the training size.
+    Assignments live in a memory-mapped int32 file next to the vectors.
+
+    ``train`` runs in one step; ``sample``, ``fit``, ``assign`` and ``install``
+    split it so the expensive middle can run without the owner's lock.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        dimension: int,
+        nlist: int,
+        nprobe: int,
+        capacity: int,
+        train_factor: int = 30,
+        retrain_growth: float = 4.0,
+        seed: int = 0,
+    ) -> None:
+        if nlist <= 0:
+            raise ValueError("IVF nlist must be positive")
+        self.nprobe = max(1, nprobe)
+        self._directory = directory
+        self._dimension = dimension
+        self._nlist = nlist
+        self._train_factor = train_factor
+        self._retrain_growth = retrain_growth
+        self._rng = np.random.default_rng(seed)
+        self._assign_path = directory / "ivf_assign.i32"
+        self._centroids_path = directory / "ivf_centroids.npy"
+        self._meta_path = directory / "ivf_meta.json"
+
+        self._assignment = self._open_assignment(capacity)
+        self._centroids: np.ndarray | None = None
+        self._trained_size = 0
+        self._lists: list[list[int]] = [[] for _ in range(nlist)]
+        self._list_arrays: list[np.ndarray | None] = [None] * nlist
+        if self._centroids_path.exists() and self._meta_path.exists():
+            centroids = np.load(self._centroids_path)
+            if centroids.shape == (nlist, dimension):
+                self._centroids = centroids.astype(np.float32)
+                meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+                self._trained_size = int(meta.get("trained_size", 0))
+                self._rebuild_lists()
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def grow(self, capacity: int) -> None:
+        self._assignment.flush()
+        del self._assignment
+        self._assignment = self._open_assignment(capacity)
+
+    def close(self) -> None:
+        self._assignment.flush()
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self._centroids is None or rows.size == 0:
+            return
+        lists = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+        for previous in np.unique(self._assignment[rows]).tolist():
+            if previous >= 0:
+                self._list_arrays[previous] = None
+        self._assignment[rows] = lists
+        for row, list_id in zip(rows.tolist(), lists.tolist()):
+            self._lists[list_id].append(row)
+            self._list_arrays[list_id] = None
+        self._assignment.flush()
+
+    def needs_training(self, live: int) -> bool:
+        if self._centroids is None:
+            return live >= self._train_factor * self._nlist
+        return live >= self._retrain_growth * self._trained_size
+
+    def maybe_train(self, matrix: np.ndarray, alive: np.ndarray, size: int, live: int) -> None:
+        if self.needs_training(live):
+            self.train(matrix, alive, size, live)
+
+    def train(self, matrix: np.ndarray, alive: np.ndarray, size: int, live: int) -> None:
+        live_rows = np.flatnonzero(alive[:size])
+        centroids = self.fit(self.sample(matrix, live_rows))
+        self.install(centroids, live, live_rows, self.assign(centroids, matrix, live_rows))
+
+    def sample(self, matrix: np.ndarray, live_rows: np.ndarray) -> np.ndarray:
+        sample_size = min(live_rows.size, 256 * self._nlist)
+        rows = np.sort(self._rng.choice(live_rows, sample_size, replace=False))
+        return np.asarray(matrix[rows], dtype=np.float32)
+
+    def fit(self, sample: np.ndarray) -> np.ndarray:
+        return self._kmeans(sample)
+
+    @staticmethod
+    def assign(centroids: np.ndarray, matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        lists = np.empty(rows.size, dtype=np.int32)
+        for start in range(0, rows.size, 65536):
+            chunk = rows[start : start + 65536]
+            lists[start : start + chunk.size] = np.argmax(
+                np.asarray(matrix[chunk]) @ centroids.T, axis=1
+            )
+        return lists
+
+    def install(
+        self, centroids: np.ndarray, live: int, rows: np.ndarray, lists: np.ndarray
+    ) -> None:
+        """Swaps in new centroids with ``lists`` as the assignment of ``rows``."""
+        np.save(self._centroids_path, centroids)
+        self._meta_path.write_text(json.dumps({"trained_size": live}), encoding="utf-8")
+        self._assignment[:] = -1
+        self._assignment[rows] = lists
+        self._assignment.flush()
+        self._centroids = centroids
+        self._trained_size = live
+        self._rebuild_lists()
+
+    def candidates(self, query: np.ndarray, nprobe: int | None = None) -> np.ndarray:
+        if self._centroids is None:
+            raise ValueError("IVF index is not trained")
+        probes = min(nprobe or self.nprobe, self._nlist)
+        centroid_scores = self._centroids @ query
+        if probes < self._nlist:
+            nearest = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        else:
+            nearest = np.arange(self._nlist)
+        return np.concatenate([self._list_array(int(list_id)) for list_id in nearest])
+
+    def _list_array(self, list_id: int) -> np.ndarray:
+        array = self._list_arrays[list_id]
+        if array is None:
+            rows = np.asarray(self._lists[list_id], dtype=np.int64)
+            # Rows reassigned to another list since they were appended are stale.
+            rows = np.unique(rows[self._assignment[rows] == list_id])
+            self._lists[list_id] = rows.tolist()
+            self._list_arrays[list_id] = array = rows
+        return array
+
+    def _rebuild_lists(self) -> None:
+        assigned = np.flatnonzero(self._assignment >= 0)
+        lists = np.asarray(self._assignment[assigned])
+        order = np.argsort(lists, kind="stable")
+        bounds = np.searchsorted(lists[order], np.arange(self._nlist + 1))
+        self._lists = [
+            assigned[order[bounds[i] : bounds[i + 1]]].tolist() for i in range(self._nlist)
+        ]
+        self._list_arrays = [None] * self._nlist
+
+    def _kmeans(self, sample: np.ndarray, iterations: int = 12) -> np.ndarray:
+        count = min(self._nlist, sample.shape[0])
+        centroids = sample[self._rng.choice(sample.shape[0], count, replace=False)].copy()
+        if count < self._nlist:
+            extra = self._rng.normal(size=(self._nlist - count, self._dimension))
+            centroids = np.vstack([centroids, extra.astype(np.float32)])
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=self._nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty lists so every centroid keeps carrying load.
+                sums[empty] = sample[self._rng.choice(sample.shape[0], int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms == 0, 1.0, norms)
+        return centroids.astype(np.float32)
+
+    def _open_assignment(self, capacity: int) -> np.memmap:
+        if not self._assign_path.exists():
+            assignment = np.memmap(
+                self._assign_path, dtype=np.int32, mode="w+", shape=(capacity,)
+            )
+            assignment[:] = -1
+            return assignment
+        current = os.path.getsize(self._assign_path) // 4
+        if current < capacity:
+            with open(self._assign_path, "r+b") as handle:
+                handle.truncate(capacity * 4)
+            assignment = np.memmap(
+                self._assign_path, dtype=np.int32, mode="r+", shape=(capacity,)
+            )
+            assignment[current:] = -1
+            return assignment
+        return np.memmap(self._assign_path, dtype=np.int32, mode="r+", shape=(current,))
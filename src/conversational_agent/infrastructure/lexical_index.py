@@ -0,0 +1,317 @@
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+from conversational_agent.infrastructure.vector_store import VectorMatch, VectorStore
+
+# Keeps part numbers, error codes and versions ("ab-1234", "e1001", "v2.3.1")
+# as single terms; their alphanumeric pieces are indexed as well.
+_TERM = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+_PIECE = re.compile(r"[a-z0-9]+")
+# Ids per ``IN (...)`` query, well under SQLite's bound-variable limit.
+_ID_BATCH = 500
+
+
+class LexicalIndex(Protocol):
+    def add(self, records: list[dict[str, Any]]) -> None:
+        ...
+
+    def delete(self, ids: list[str]) -> None:
+        ...
+
+    def update_metadata(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        ...
+
+    def search(
+        self, query: str, top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        ...
+
+
+class BM25Index:
+    """Okapi BM25 inverted index over chunk text, stored in one SQLite file.
+
+    Postings are a ``(term, doc, tf)`` table clustered by term, so a query reads
+    only the posting lists of its own terms. Records use the same shape as
+    ``VectorStore.upsert`` (``id`` plus ``metadata`` holding ``text``) and
+    re-adding an id replaces its postings. Only the scalar metadata fields that
+    filters can match are kept, not the text: ``metadata_source`` (the vector
+    store's ``fetch_metadata``) fills in the full metadata of the results.
+
+    Writers share one connection under a lock. Searches run on a per-thread
+    read connection inside their own transaction: in WAL mode that is a
+    consistent snapshot that neither blocks nor waits for writers.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+        metadata_source: Callable[[list[str]], dict[str, dict[str, Any]]] | None = None,
+    ) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._path = path
+        self._k1 = k1
+        self._b = b
+        self._metadata_source = metadata_source
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents (doc INTEGER PRIMARY KEY, "
+            "id TEXT NOT NULL UNIQUE, length INTEGER NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, doc INTEGER NOT NULL, "
+            "tf INTEGER NOT NULL, PRIMARY KEY (term, doc)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc)")
+        # Corpus totals BM25 needs, kept in the same transaction as the postings
+        # so a reader's snapshot always sees matching numbers.
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 0), "
+            "documents INTEGER NOT NULL, total_length INTEGER NOT NULL)"
+        )
+        count, total = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+        ).fetchone()
+        self._documents = int(count)
+        self._total_length = int(total)
+        self._save_stats()
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._documents
+
+    def add(self, records: list[dict[str, Any]]) -> None:
+        if not records:
+            return
+        with self._lock:
+            self._remove([str(record["id"]) for record in records])
+            for record in records:
+                metadata = record.get("metadata", {})
+                terms = Counter(tokenize(str(metadata.get("text", ""))))
+                length = sum(terms.values())
+                cursor = self._db.execute(
+                    "INSERT INTO documents (id, length, metadata) VALUES (?, ?, ?)",
+                    (str(record["id"]), length, json.dumps(_filterable(metadata))),
+                )
+                self._db.executemany(
+                    "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                    [(term, cursor.lastrowid, tf) for term, tf in terms.items()],
+                )
+                self._documents += 1
+                self._total_length += length
+            self._save_stats()
+            self._db.commit()
+
+    def delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            self._remove(ids)
+            self._save_stats()
+            self._db.commit()
+
+    def update_metadata(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        with self._lock:
+            for vector_id, metadata in updates:
+                row = self._db.execute(
+                    "SELECT metadata FROM documents WHERE id = ?", (vector_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                merged = {**json.loads(row[0]), **_filterable(metadata)}
+                self._db.execute(
+                    "UPDATE documents SET metadata = ? WHERE id = ?",
+                    (json.dumps(merged), vector_id),
+                )
+            self._db.commit()
+
+    def search(
+        self, query: str, top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        terms = set(tokenize(query))
+        if top_k <= 0 or not terms:
+            return []
+        db = self._reader()
+        db.execute("BEGIN")
+        try:
+            matches = self._search(db, terms, top_k, filters)
+        finally:
+            db.execute("COMMIT")
+        if self._metadata_source is None or not matches:
+            return matches
+        stored = self._metadata_source([match.id for match in matches])
+        return [
+            VectorMatch(match.id, match.score, {**match.metadata, **stored.get(match.id, {})})
+            for match in matches
+        ]
+
+    def close(self) -> None:
+        with self._lock, self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+            self._db.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit mode, so ``search`` controls the snapshot transaction.
+            db = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA query_only=ON")
+            self._local.db = db
+            with self._readers_lock:
+                self._readers.append(db)
+        return db
+
+    def _search(
+        self,
+        db: sqlite3.Connection,
+        terms: set[str],
+        top_k: int,
+        filters: MetadataFilter | None,
+    ) -> list[VectorMatch]:
+        documents, total_length = db.execute(
+            "SELECT documents, total_length FROM stats"
+        ).fetchone()
+        if not documents:
+            return []
+        average_length = total_length / documents
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = db.execute(
+                "SELECT p.doc, p.tf, d.length FROM postings p "
+                "JOIN documents d ON d.doc = p.doc WHERE p.term = ?",
+                (term,),
+            ).fetchall()
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (documents - df + 0.5) / (df + 0.5))
+            for doc, tf, length in postings:
+                norm = self._k1 * (1 - self._b + self._b * length / average_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self._k1 + 1) / (tf + norm)
+
+        if filters is None:
+            ranked = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return self._matches(db, ranked)
+        # Walk the ranking in pages, keeping documents whose metadata passes.
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        matches: list[VectorMatch] = []
+        for start in range(0, len(ranked), top_k * 4):
+            for match in self._matches(db, ranked[start : start + top_k * 4]):
+                if filters.matches(match.metadata):
+                    matches.append(match)
+                    if len(matches) == top_k:
+                        return matches
+        return matches
+
+    @staticmethod
+    def _matches(db: sqlite3.Connection, ranked: list[tuple[int, float]]) -> list[VectorMatch]:
+        if not ranked:
+            return []
+        placeholders = ",".join("?" * len(ranked))
+        rows = db.execute(
+            f"SELECT doc, id, metadata FROM documents WHERE doc IN ({placeholders})",
+            [doc for doc, _ in ranked],
+        )
+        documents = {doc: (vector_id, metadata) for doc, vector_id, metadata in rows}
+        return [
+            VectorMatch(id=documents[doc][0], score=score, metadata=json.loads(documents[doc][1]))
+            for doc, score in ranked
+        ]
+
+    def _save_stats(self) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO stats (id, documents, total_length) VALUES (0, ?, ?)",
+            (self._documents, self._total_length),
+        )
+
+    def _remove(self, ids: list[str]) -> None:
+        rows: list[tuple[int, int]] = []
+        for start in range(0, len(ids), _ID_BATCH):
+            batch = ids[start : start + _ID_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(
+                self._db.execute(
+                    f"SELECT doc, length FROM documents WHERE id IN ({placeholders})", batch
+                )
+            )
+        if not rows:
+            return
+        self._db.executemany("DELETE FROM postings WHERE doc = ?", [(doc,) for doc, _ in rows])
+        self._db.executemany("DELETE FROM documents WHERE doc = ?", [(doc,) for doc, _ in rows])
+        self._documents -= len(rows)
+        self._total_length -= sum(length for _, length in rows)
+
+
+class OpenSearchLexicalIndex:
+    """Lexical leg served by an OpenSearch ``match`` query on the chunk text.
+
+    The vector documents already carry their text, which OpenSearch indexes for
+    full-text search, so ingestion has nothing extra to write.
+    """
+
+    def __init__(self, vector_store: VectorStore) -> None:
+        self._vector_store = vector_store
+
+    def add(self, records: list[dict[str, Any]]) -> None:
+        return None
+
+    def delete(self, ids: list[str]) -> None:
+        return None
+
+    def update_metadata(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        return None
+
+    def search(
+        self, query: str, top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        return self._vector_store.text_query(query, top_k, filters)
+
+
+def build_lexical_index(settings: Settings, vector_store: VectorStore) -> LexicalIndex | None:
+    enabled = settings.lexical_index_enabled
+    if enabled is None:
+        # Unset means "only when something reads it": hybrid retrieval.
+        enabled = settings.retrieval_mode == "hybrid"
+    if not enabled:
+        return None
+    if settings.backend_provider.lower() == "aws":
+        return OpenSearchLexicalIndex(vector_store)
+    return BM25Index(settings.lexical_index_path, metadata_source=vector_store.fetch_metadata)
+
+
+def _filterable(metadata: dict[str, Any]) -> dict[str, Any]:
+    return {
+        field: value
+        for field, value in metadata.items()
+        if field != "text" and isinstance(value, (str, int, float, bool))
+    }
+
+
+def tokenize(text: str) -> list[str]:
+    terms: list[str] = []
+    for match in _TERM.finditer(text.lower()):
+        term = match.group()
+        terms.append(term)
+        if not term.isalnum():
+            terms.extend(_PIECE.findall(term))
+    return terms
@@ -0,0 +1,505 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from conversational_agent.infrastructure.ivf_index import IVFIndex
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+
+logger = logging.getLogger(__name__)
+
+# Ids per ``IN (...)`` query, well under SQLite's bound-variable limit.
+_ID_BATCH = 500
+
+
+class LocalVectorIndex:
+    """In-process vector index persisted as a memory-mapped float32 matrix.
+
+    Row ``i`` of ``vectors.f32`` holds the unit-normalized vector of one chunk; ids
+    and metadata live in ``metadata.sqlite`` and are only read back for the rows a
+    query returns. Deleted rows are masked out and reused by later upserts.
+    Queries score every live row with one matrix-vector product and select the
+    top-k with ``argpartition``; with ``index_type="ivf"`` only the rows of the
+    closest IVF lists are scored once enough data exists to train it. Metadata
+    filters are resolved to a row mask through an in-memory inverted index, so a
+    selective filter only scores the rows it admits.
+
+    Queries share a read lock and run concurrently, each thread reading metadata
+    through its own SQLite connection; writes are exclusive. IVF retraining
+    after startup happens on a background thread outside the lock, and the new
+    centroids are swapped in under the write lock once ready.
+    """
+
+    _INITIAL_CAPACITY = 1024
+
+    def __init__(
+        self,
+        directory: str,
+        dimension: int,
+        index_type: str = "flat",
+        ivf_nlist: int = 256,
+        ivf_nprobe: int = 8,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._dimension = dimension
+        self._lock = _ReadWriteLock()
+        self._training: threading.Thread | None = None
+        # Rows written while a background training runs; reassigned at install.
+        self._dirty_rows: set[int] = set()
+        self._vectors_path = self._directory / "vectors.f32"
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self._db = sqlite3.connect(
+            str(self._directory / "metadata.sqlite"), check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS vectors "
+            "(id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE, metadata TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+        self._row_of: dict[str, int] = {}
+        self._id_of: list[str | None] = []
+        stored = self._db.execute("SELECT id, row, metadata FROM vectors ORDER BY row").fetchall()
+        for vector_id, row, _ in stored:
+            self._row_of[vector_id] = row
+        size = max(self._row_of.values(), default=-1) + 1
+        self._id_of = [None] * size
+        for vector_id, row in self._row_of.items():
+            self._id_of[row] = vector_id
+        self._free_rows = [row for row, vector_id in enumerate(self._id_of) if vector_id is None]
+        self._matrix = self._open_matrix(max(size, self._INITIAL_CAPACITY))
+        self._alive = np.zeros(self._matrix.shape[0], dtype=bool)
+        self._alive[:size] = [vector_id is not None for vector_id in self._id_of]
+        self._metadata = _MetadataIndex(self._matrix.shape[0])
+        for _, row, metadata in stored:
+            self._metadata.add(row, json.loads(metadata))
+
+        self._ivf: IVFIndex | None = None
+        if index_type == "ivf":
+            self._ivf = IVFIndex(
+                self._directory,
+                dimension,
+                nlist=ivf_nlist,
+                nprobe=ivf_nprobe,
+                capacity=self._matrix.shape[0],
+            )
+            self._ivf.maybe_train(self._matrix, self._alive, size, len(self._row_of))
+        elif index_type != "flat":
+            raise ValueError(f"Unknown local index type: {index_type!r}")
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def upsert(self, vectors: list[dict[str, Any]]) -> None:
+        if not vectors:
+            return
+        with self._lock.write():
+            replaced = [str(item["id"]) for item in vectors if str(item["id"]) in self._row_of]
+            for vector_id, metadata in self._stored_metadata(self._db, replaced).items():
+                self._metadata.remove(self._row_of[vector_id], metadata)
+            rows = []
+            for item in vectors:
+                vector_id = str(item["id"])
+                row = self._row_of.get(vector_id)
+                if row is None:
+                    row = self._allocate_row()
+                    self._row_of[vector_id] = row
+                    self._id_of[row] = vector_id
+                metadata = item.get("metadata", {})
+                self._matrix[row] = _unit(item["values"], self._dimension)
+                self._alive[row] = True
+                self._metadata.add(row, metadata)
+                rows.append((vector_id, row, json.dumps(metadata)))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO vectors (id, row, metadata) VALUES (?, ?, ?)", rows
+            )
+            self._db.commit()
+            self._matrix.flush()
+
+            if self._ivf is not None:
+                written = np.fromiter((row for _, row, _ in rows), dtype=np.int64)
+                self._ivf.add(written, np.asarray(self._matrix[written]))
+                if self._training is not None:
+                    self._dirty_rows.update(written.tolist())
+                elif self._ivf.needs_training(len(self._row_of)):
+                    self._start_training(self._ivf)
+
+    def wait_for_training(self, timeout: float | None = None) -> None:
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        nprobe: int | None = None,
+        filters: MetadataFilter | None = None,
+    ) -> list[tuple[str, float, dict[str, Any]]]:
+        with self._lock.read():
+            return self._query(vector, top_k, nprobe, filters)
+
+    def _query(
+        self,
+        vector: list[float],
+        top_k: int,
+        nprobe: int | None,
+        filters: MetadataFilter | None,
+    ) -> list[tuple[str, float, dict[str, Any]]]:
+        size = len(self._id_of)
+        if top_k <= 0 or not self._row_of:
+            return []
+        query = _unit(vector, self._dimension)
+        allowed = self._allowed_rows(size, filters)
+        if self._ivf is not None and self._ivf.trained:
+            candidates = self._ivf.candidates(query, nprobe)
+            candidates = candidates[allowed[candidates]]
+            # A selective filter can leave the probed lists short of top_k;
+            # the rows it admits are then few enough to score exactly.
+            if filters is None or candidates.size >= top_k:
+                scores = self._matrix[candidates] @ query
+                best = _top_k_rows(scores, min(top_k, candidates.size))
+                return self._resolve(candidates[best], scores[best])
+
+        if filters is not None:
+            rows = np.flatnonzero(allowed)
+            if rows.size < size // 2:
+                scores = self._matrix[rows] @ query
+                best = _top_k_rows(scores, min(top_k, rows.size))
+                return self._resolve(rows[best], scores[best])
+
+        scores = self._matrix[:size] @ query
+        scores[~allowed] = -np.inf
+        rows = _top_k_rows(scores, min(top_k, len(self._row_of)))
+        return self._resolve(rows, scores[rows])
+
+    def query_many(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        nprobe: int | None = None,
+        filters: MetadataFilter | None = None,
+    ) -> list[list[tuple[str, float, dict[str, Any]]]]:
+        """Answer several queries in input order with one matrix product over all rows."""
+        with self._lock.read():
+            if not vectors:
+                return []
+            if self._ivf is not None and self._ivf.trained:
+                # Each query probes its own lists, so IVF queries stay independent.
+                return [self._query(vector, top_k, nprobe, filters) for vector in vectors]
+            size = len(self._id_of)
+            if top_k <= 0 or not self._row_of:
+                return [[] for _ in vectors]
+            queries = np.stack([_unit(vector, self._dimension) for vector in vectors])
+            scores = queries @ self._matrix[:size].T
+            scores[:, ~self._allowed_rows(size, filters)] = -np.inf
+            k = min(top_k, len(self._row_of))
+            results = []
+            for row_scores in scores:
+                rows = _top_k_rows(row_scores, k)
+                results.append(self._resolve(rows, row_scores[rows]))
+            return results
+
+    def fetch_metadata(self, ids: list[str]) -> dict[str, dict[str, Any]]:
+        with self._lock.read():
+            return self._stored_metadata(self._reader(), ids)
+
+    def delete(self, ids: list[str]) -> None:
+        with self._lock.write():
+            for vector_id, metadata in self._stored_metadata(self._db, ids).items():
+                self._metadata.remove(self._row_of[vector_id], metadata)
+            removed = []
+            for vector_id in ids:
+                row = self._row_of.pop(vector_id, None)
+                if row is None:
+                    continue
+                self._id_of[row] = None
+                self._alive[row] = False
+                self._free_rows.append(row)
+                removed.append((vector_id,))
+            if removed:
+                self._db.executemany("DELETE FROM vectors WHERE id = ?", removed)
+                self._db.commit()
+
+    def update_metadata(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        with self._lock.write():
+            for vector_id, metadata in updates:
+                row = self._db.execute(
+                    "SELECT metadata FROM vectors WHERE id = ?", (vector_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                previous = json.loads(row[0])
+                merged = {**previous, **metadata}
+                self._metadata.remove(self._row_of[vector_id], previous)
+                self._metadata.add(self._row_of[vector_id], merged)
+                self._db.execute(
+                    "UPDATE vectors SET metadata = ? WHERE id = ?", (json.dumps(merged), vector_id)
+                )
+            self._db.commit()
+
+    def close(self) -> None:
+        self.wait_for_training()
+        with self._lock.write():
+            self._matrix.flush()
+            if self._ivf is not None:
+                self._ivf.close()
+            with self._readers_lock:
+                for reader in self._readers:
+                    reader.close()
+                self._readers.clear()
+            self._db.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        # Readers only run under the read lock, so they never see a write in progress.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(
+                str(self._directory / "metadata.sqlite"),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            db.execute("PRAGMA query_only=ON")
+            self._local.db = db
+            with self._readers_lock:
+                self._readers.append(db)
+        return db
+
+    def _start_training(self, ivf: IVFIndex) -> None:
+        live_rows = np.flatnonzero(self._alive[: len(self._id_of)])
+        sample = ivf.sample(self._matrix, live_rows)
+        self._dirty_rows = set()
+        self._training = threading.Thread(
+            target=self._train,
+            args=(ivf, self._matrix, sample, live_rows),
+            name="ivf-train",
+            daemon=True,
+        )
+        self._training.start()
+
+    def _train(
+        self, ivf: IVFIndex, matrix: np.ndarray, sample: np.ndarray, live_rows: np.ndarray
+    ) -> None:
+        try:
+            # k-means and the bulk assignment read a snapshot of rows without the
+            # lock; rows rewritten meanwhile are in ``_dirty_rows`` and redone below.
+            centroids = ivf.fit(sample)
+            lists = ivf.assign(centroids, matrix, live_rows)
+            with self._lock.write():
+                ivf.install(centroids, live_rows.size, live_rows, lists)
+                dirty = np.fromiter(sorted(self._dirty_rows), dtype=np.int64)
+                dirty = dirty[self._alive[dirty]]
+                ivf.add(dirty, np.asarray(self._matrix[dirty]))
+        except Exception:
+            logger.exception("IVF training failed")
+        finally:
+            with self._lock.write():
+                self._dirty_rows = set()
+                self._training = None
+
+    def _resolve(
+        self, rows: np.ndarray, scores: np.ndarray
+    ) -> list[tuple[str, float, dict[str, Any]]]:
+        if rows.size == 0:
+            return []
+        ids = [str(self._id_of[int(row)]) for row in rows]
+        metadata = self._stored_metadata(self._reader(), ids)
+        return [
+            (vector_id, float(score), metadata.get(vector_id, {}))
+            for vector_id, score in zip(ids, scores)
+        ]
+
+    def _allowed_rows(self, size: int, filters: MetadataFilter | None) -> np.ndarray:
+        if filters is None:
+            return self._alive[:size]
+        return self._alive[:size] & self._metadata.mask(filters, size)
+
+    @staticmethod
+    def _stored_metadata(db: sqlite3.Connection, ids: list[str]) -> dict[str, dict[str, Any]]:
+        metadata: dict[str, dict[str, Any]] = {}
+        for start in range(0, len(ids), _ID_BATCH):
+            batch = ids[start : start + _ID_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = db.execute(
+                f"SELECT id, metadata FROM vectors WHERE id IN ({placeholders})", batch
+            )
+            metadata.update((vector_id, json.loads(value)) for vector_id, value in rows)
+        return metadata
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        row = len(self._id_of)
+        self._id_of.append(None)
+        if row >= self._matrix.shape[0]:
+            self._grow(self._matrix.shape[0] * 2)
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        self._matrix.flush()
+        del self._matrix
+        self._matrix = self._open_matrix(capacity)
+        alive = np.zeros(self._matrix.shape[0], dtype=bool)
+        alive[: self._alive.shape[0]] = self._alive
+        self._alive = alive
+        self._metadata.grow(self._matrix.shape[0])
+        if self._ivf is not None:
+            self._ivf.grow(self._matrix.shape[0])
+
+    def _open_matrix(self, capacity: int) -> np.memmap:
+        required = capacity * self._dimension * 4
+        mode = "r+" if self._vectors_path.exists() else "w+"
+        if mode == "r+" and os.path.getsize(self._vectors_path) < required:
+            with open(self._vectors_path, "r+b") as handle:
+                handle.truncate(required)
+        elif mode == "r+":
+            capacity = os.path.getsize(self._vectors_path) // (self._dimension * 4)
+        return np.memmap(
+            self._vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self._dimension)
+        )
+
+
+class _ReadWriteLock:
+    """Shared lock for readers, exclusive for writers; waiting writers go first."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class _MetadataIndex:
+    """Row sets per scalar metadata value, plus one float column per numeric field.
+
+    Equality and ``$in`` conditions become unions of row sets and range conditions
+    compare a column, so a filter resolves to a boolean row mask without reading
+    metadata from SQLite. Chunk text is never indexed.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._rows: dict[str, dict[Any, set[int]]] = {}
+        self._numbers: dict[str, np.ndarray] = {}
+
+    def add(self, row: int, metadata: dict[str, Any]) -> None:
+        for field, value in metadata.items():
+            if not _indexable(field, value):
+                continue
+            self._rows.setdefault(field, {}).setdefault(value, set()).add(row)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                column = self._numbers.get(field)
+                if column is None:
+                    column = self._numbers[field] = np.full(self._capacity, np.nan)
+                column[row] = value
+
+    def remove(self, row: int, metadata: dict[str, Any]) -> None:
+        for field, value in metadata.items():
+            rows = self._rows.get(field, {}).get(value) if _indexable(field, value) else None
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._rows[field][value]
+            if field in self._numbers:
+                self._numbers[field][row] = np.nan
+
+    def grow(self, capacity: int) -> None:
+        for field, column in self._numbers.items():
+            grown = np.full(capacity, np.nan)
+            grown[: column.shape[0]] = column
+            self._numbers[field] = grown
+        self._capacity = capacity
+
+    def mask(self, filters: MetadataFilter, size: int) -> np.ndarray:
+        mask = np.ones(size, dtype=bool)
+        for condition in filters.conditions:
+            if condition.op in ("$eq", "$in"):
+                values = condition.value if condition.op == "$in" else [condition.value]
+                postings = self._rows.get(condition.field, {})
+                matched = np.zeros(size, dtype=bool)
+                for value in values:
+                    rows = postings.get(value)
+                    if rows:
+                        matched[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+                mask &= matched
+                continue
+            column = self._numbers.get(condition.field)
+            if column is None:
+                return np.zeros(size, dtype=bool)
+            with np.errstate(invalid="ignore"):
+                mask &= _RANGE_COMPARISONS[condition.op](column[:size], condition.value)
+        return mask
+
+
+_RANGE_COMPARISONS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def _indexable(field: str, value: Any) -> bool:
+    return field != "text" and isinstance(value, (str, int, float, bool))
+
+
+def _unit(vector: list[float], dimension: int) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    if array.shape != (dimension,):
+        raise ValueError(f"Expected a {dimension}-dimensional vector, got shape {array.shape}")
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= scores.shape[0]:
+        candidates = np.arange(scores.shape[0])
+    else:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return ordered[np.isfinite(scores[ordered])]
@@ -0,0 +1,123 @@
+import json
+from dataclasses import dataclass
+from typing import Any
+
+_RANGE_OPERATORS = frozenset({"$gt", "$gte", "$lt", "$lte"})
+_OPERATORS = frozenset({"$eq", "$in"}) | _RANGE_OPERATORS
+
+
+@dataclass(frozen=True)
+class FilterCondition:
+    field: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """Conjunction of conditions on chunk metadata.
+
+    Expressions use Pinecone's operator syntax, e.g.
+    ``{"source_id": "manual", "path": {"$in": ["a.pdf", "b.pdf"]},
+    "chunk_index": {"$gte": 10, "$lt": 20}}``; a bare value means ``$eq``.
+    Each backend gets the expression in its native form so filtering happens
+    inside the search rather than on an over-fetched result list.
+    """
+
+    conditions: tuple[FilterCondition, ...]
+
+    @classmethod
+    def parse(cls, expression: dict[str, Any] | None) -> "MetadataFilter | None":
+        if not expression:
+            return None
+        if not isinstance(expression, dict):
+            raise ValueError("Filter must be an object mapping metadata fields to conditions")
+        conditions: list[FilterCondition] = []
+        for field, spec in expression.items():
+            if not isinstance(field, str) or not field or field.startswith("$"):
+                raise ValueError(f"Invalid filter field: {field!r}")
+            if field == "text":
+                raise ValueError("Chunk text cannot be filtered on")
+            operators = spec if isinstance(spec, dict) else {"$eq": spec}
+            if not operators:
+                raise ValueError(f"Empty condition for filter field {field!r}")
+            for op, value in operators.items():
+                conditions.append(FilterCondition(field, op, _validated(field, op, value)))
+        return cls(tuple(conditions))
+
+    def key(self) -> str:
+        """Canonical form used to tell cached results of different filters apart."""
+        conditions = [[item.field, item.op, item.value] for item in self.conditions]
+        return json.dumps(sorted(conditions, key=json.dumps))
+
+    def matches(self, metadata: dict[str, Any]) -> bool:
+        for condition in self.conditions:
+            value = metadata.get(condition.field)
+            if condition.op == "$eq":
+                if value != condition.value:
+                    return False
+            elif condition.op == "$in":
+                if value not in condition.value:
+                    return False
+            elif not _is_number(value) or not _compare(value, condition.op, condition.value):
+                return False
+        return True
+
+    def to_pinecone(self) -> dict[str, Any]:
+        clauses = [
+            {condition.field: {condition.op: condition.value}} for condition in self.conditions
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def to_opensearch(self) -> list[dict[str, Any]]:
+        """``bool.filter`` clauses over the ``metadata`` object of each document."""
+        clauses: list[dict[str, Any]] = []
+        for condition in self.conditions:
+            field = f"metadata.{condition.field}"
+            if condition.op in _RANGE_OPERATORS:
+                clauses.append({"range": {field: {condition.op[1:]: condition.value}}})
+                continue
+            values = condition.value if condition.op == "$in" else [condition.value]
+            # Dynamically mapped strings are analyzed text; exact matches need the
+            # keyword sub-field.
+            if all(isinstance(value, str) for value in values):
+                field = f"{field}.keyword"
+            if condition.op == "$in":
+                clauses.append({"terms": {field: values}})
+            else:
+                clauses.append({"term": {field: condition.value}})
+        return clauses
+
+
+def _validated(field: str, op: str, value: Any) -> Any:
+    if op not in _OPERATORS:
+        raise ValueError(f"Unsupported filter operator {op!r} for field {field!r}")
+    if op == "$in":
+        if not isinstance(value, list) or not value or not all(map(_is_scalar, value)):
+            raise ValueError(f"$in on {field!r} needs a non-empty list of scalar values")
+        return list(value)
+    if op in _RANGE_OPERATORS:
+        if not _is_number(value):
+            raise ValueError(f"{op} on {field!r} needs a number")
+        return value
+    if not _is_scalar(value):
+        raise ValueError(f"Equality filter on {field!r} needs a scalar value")
+    return value
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _compare(value: float, op: str, bound: float) -> bool:
+    if op == "$gt":
+        return value > bound
+    if op == "$gte":
+        return value >= bound
+    if op == "$lt":
+        return value < bound
+    return value <= bound
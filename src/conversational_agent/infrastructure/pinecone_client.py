@@ -0,0 +1,7 @@
+from pinecone import Pinecone
+
+from conversational_agent.core.config import Settings
+
+
+def build_pinecone_client(settings: Settings) -> Pinecone:
+    return Pinecone(api_key=settings.pinecone_api_key)
@@ -0,0 +1,41 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+
+from conversational_agent.core.config import Settings
+
+
+def sync_redis(settings: Settings, decode_responses: bool = True) -> redis.Redis:
+    """Client on the process-wide pool for ``REDIS_URL``.
+
+    Sessions, caches and locks share one pool per decoding mode instead of each
+    opening its own connections.
+    """
+    if not settings.redis_url:
+        raise ValueError("REDIS_URL is required for Redis-backed stores")
+    pool = _sync_pool(settings.redis_url, decode_responses, settings.redis_max_connections)
+    return redis.Redis(connection_pool=pool)
+
+
+def async_redis(settings: Settings, decode_responses: bool = True) -> aioredis.Redis:
+    if not settings.redis_url:
+        raise ValueError("REDIS_URL is required for Redis-backed stores")
+    pool = _async_pool(settings.redis_url, decode_responses, settings.redis_max_connections)
+    return aioredis.Redis(connection_pool=pool)
+
+
+@lru_cache(maxsize=8)
+def _sync_pool(url: str, decode_responses: bool, max_connections: int) -> redis.ConnectionPool:
+    return redis.ConnectionPool.from_url(
+        url, decode_responses=decode_responses, max_connections=max_connections
+    )
+
+
+@lru_cache(maxsize=8)
+def _async_pool(
+    url: str, decode_responses: bool, max_connections: int
+) -> aioredis.ConnectionPool:
+    return aioredis.ConnectionPool.from_url(
+        url, decode_responses=decode_responses, max_connections=max_connections
+    )
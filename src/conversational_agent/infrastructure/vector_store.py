@@ -1,16 +1,27 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import boto3
-from opensearchpy import OpenSearch , RequestHttpConnection
+from opensearchpy import OpenSearch, RequestsHttpConnection
 from opensearchpy.helpers import bulk
 from opensearchpy.helpers.signer import AWSV4SignerAuth
 
 from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.local_vector_store import LocalVectorIndex
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
 from conversational_agent.infrastructure.pinecone_client import build_pinecone_client
+from conversational_agent.observability.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from opensearchpy import AsyncOpenSearch
+
+# Queries per OpenSearch _msearch request; keeps request bodies to a few MB.
+_MSEARCH_BATCH_SIZE = 100
 
 @dataclass
-class VectorMath:
+class VectorMatch:
     id: str
     score: float
     metadata: dict[str, Any]
@@ -24,16 +35,34 @@ class VectorStore:
         self._pc = None
         self._pinecone_index = None
         self._opensearch = None
+        self._async_opensearch: AsyncOpenSearch | None = None
+        self._local_index: LocalVectorIndex | None = None
+        self._query_executor: ThreadPoolExecutor | None = None
 
-        if self._provider == "aws":
+        if self._provider == "local":
+            self._local_index = LocalVectorIndex(
+                settings.local_vector_store_path,
+                settings.embedding_dimension,
+                index_type=settings.local_index_type,
+                ivf_nlist=settings.ivf_nlist,
+                ivf_nprobe=settings.ivf_nprobe,
+            )
+        elif self._provider == "aws":
             self._opensearch = self._build_opensearch_client()
         else:
             self._pc = build_pinecone_client(settings)
             self._pinecone_index = self._pc.Index(settings.pinecone_index_name)
+            self._query_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.vector_query_max_concurrency),
+                thread_name_prefix="pinecone-query",
+            )
 
     def upsert(self,vectors: list[dict[str, Any]]) -> None:
         if not vectors:
             return
+        if self._provider == "local":
+            self._require_local().upsert(vectors)
+            return
         if self._provider == "aws":
             if self._opensearch is None:
                 raise ValueError("OpenSearch client is not intialized")
@@ -49,32 +78,220 @@ class VectorStore:
                 }
                 for item in vectors
             ]
-            bulk(self._opensearch, action, refresh=True)
+            bulk(self._opensearch, actions, refresh=True)
             return 
 
         if self._pinecone_index is None:
-            raise ValueEror("Pinecone index is not intialized")
-        self._pinecone_index_upsert(vectors=vectors,namepspace = self._settings.pinecone_namespace)
+            raise ValueError("Pinecone index is not intialized")
+        self._pinecone_index.upsert(vectors=vectors, namespace=self._settings.pinecone_namespace)
 
-    def query(self, vector:list[float]) -> list[VectorMath]:
+    def delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        if self._provider == "local":
+            self._require_local().delete(ids)
+            return
         if self._provider == "aws":
             if self._opensearch is None:
-                rasie ValueError("OpenSearch client is not initialized")
-            body = {
-                "size": top_k,
-                "query":{"knn":{"vector":{"vector":vector,"k":top_k}}},
-                "_source":["metadata"],
-            }
+                raise ValueError("OpenSearch client is not intialized")
+            actions = [
+                {"_op_type": "delete", "_index": self._index_name, "_id": vector_id}
+                for vector_id in ids
+            ]
+            bulk(self._opensearch, actions, refresh=True, raise_on_error=False)
+            return
+
+        if self._pinecone_index is None:
+            raise ValueError("Pinecone index is not intialized")
+        # Pinecone caps delete-by-id requests at 1000 ids.
+        for start in range(0, len(ids), 1000):
+            self._pinecone_index.delete(
+                ids=ids[start : start + 1000], namespace=self._settings.pinecone_namespace
+            )
+
+    def update_metadata(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        """Merge ``metadata`` into existing vectors without re-sending their values."""
+        if not updates:
+            return
+        if self._provider == "local":
+            self._require_local().update_metadata(updates)
+            return
+        if self._provider == "aws":
+            if self._opensearch is None:
+                raise ValueError("OpenSearch client is not intialized")
+            actions = [
+                {
+                    "_op_type": "update",
+                    "_index": self._index_name,
+                    "_id": vector_id,
+                    "doc": {"metadata": metadata},
+                }
+                for vector_id, metadata in updates
+            ]
+            bulk(self._opensearch, actions, refresh=True)
+            return
+
+        if self._pinecone_index is None:
+            raise ValueError("Pinecone index is not intialized")
+        for vector_id, metadata in updates:
+            self._pinecone_index.update(
+                id=vector_id,
+                set_metadata=metadata,
+                namespace=self._settings.pinecone_namespace,
+            )
+
+    def query(
+        self, vector: list[float], top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        """Nearest neighbours of ``vector``, restricted to chunks matching ``filters``.
+
+        Filters are applied inside the backend search (Pinecone metadata filter,
+        OpenSearch k-NN ``filter``, the local metadata index) so ``top_k`` results
+        come back without over-fetching.
+        """
+        with instrument("vector.query", self._span_attributes(top_k, filters)) as span:
+            matches = self._query(vector, top_k, filters)
+            span.set("vector.matches", len(matches))
+            return matches
+
+    def _query(
+        self, vector: list[float], top_k: int, filters: MetadataFilter | None
+    ) -> list[VectorMatch]:
+        if self._provider == "local":
+            return _local_matches(self._require_local().query(vector, top_k, filters=filters))
+        if self._provider == "aws":
+            if self._opensearch is None:
+                raise ValueError("OpenSearch client is not initialized")
+            body = self._knn_body(vector, top_k, filters)
             result = self._opensearch.search(index=self._index_name,body=body)
-            hits = result.get("hits",{}).get("hits",[])
-            return [
-                VectorMatch(
-                    id=str(hit.get("_id","")),
-                    score=float(hit.get("_score",0.0)),
-                    metadata=dict(hit.get("_source",{}).get("metadata",{})),
+            return _opensearch_matches(result)
+        return self._query_pinecone(vector, top_k, filters)
+
+    async def aquery(
+        self, vector: list[float], top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        """Async ``query`` for the request path.
+
+        OpenSearch goes through ``AsyncOpenSearch``. Pinecone's client is sync-only,
+        so its HTTP call runs on the query pool, and the local index scores on a
+        worker thread.
+        """
+        with instrument("vector.query", self._span_attributes(top_k, filters)) as span:
+            if self._provider == "aws":
+                client = self._require_async_opensearch()
+                body = self._knn_body(vector, top_k, filters)
+                result = await client.search(index=self._index_name, body=body)
+                matches = _opensearch_matches(result)
+            elif self._provider == "local":
+                matches = await asyncio.to_thread(self._query, vector, top_k, filters)
+            else:
+                loop = asyncio.get_running_loop()
+                matches = await loop.run_in_executor(
+                    self._query_executor, self._query_pinecone, vector, top_k, filters
                 )
-                for hit in hits
-            ]                
+            span.set("vector.matches", len(matches))
+            return matches
+
+    async def aclose(self) -> None:
+        if self._async_opensearch is not None:
+            await self._async_opensearch.close()
+            self._async_opensearch = None
+
+    def query_many(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        filters: MetadataFilter | None = None,
+    ) -> list[list[VectorMatch]]:
+        """Run several queries in as few round trips as the backend allows.
+
+        Results are returned in the order of ``vectors``: the local index scores
+        all queries with one matrix product, OpenSearch gets ``_msearch`` requests
+        and Pinecone queries are issued concurrently.
+        """
+        if not vectors:
+            return []
+        attributes = self._span_attributes(top_k, filters)
+        attributes["vector.batch_size"] = len(vectors)
+        with instrument("vector.query_many", attributes):
+            return self._query_many(vectors, top_k, filters)
+
+    def _query_many(
+        self, vectors: list[list[float]], top_k: int, filters: MetadataFilter | None
+    ) -> list[list[VectorMatch]]:
+        if self._provider == "local":
+            results = self._require_local().query_many(vectors, top_k, filters=filters)
+            return [_local_matches(matches) for matches in results]
+        if self._provider == "aws":
+            if self._opensearch is None:
+                raise ValueError("OpenSearch client is not initialized")
+            matches: list[list[VectorMatch]] = []
+            for start in range(0, len(vectors), _MSEARCH_BATCH_SIZE):
+                body: list[dict[str, Any]] = []
+                for vector in vectors[start : start + _MSEARCH_BATCH_SIZE]:
+                    body.append({"index": self._index_name})
+                    body.append(self._knn_body(vector, top_k, filters))
+                result = self._opensearch.msearch(body=body)
+                for response in result.get("responses", []):
+                    if "error" in response:
+                        raise ValueError(f"OpenSearch msearch failed: {response['error']}")
+                    matches.append(_opensearch_matches(response))
+            return matches
+        if self._query_executor is None or len(vectors) == 1:
+            return [self._query_pinecone(vector, top_k, filters) for vector in vectors]
+        # Executor.map yields results in input order regardless of completion order.
+        return list(
+            self._query_executor.map(
+                lambda vector: self._query_pinecone(vector, top_k, filters), vectors
+            )
+        )
+
+    def fetch_metadata(self, ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Stored metadata by id; ids the store does not hold are left out."""
+        if not ids:
+            return {}
+        if self._provider == "local":
+            return self._require_local().fetch_metadata(ids)
+        if self._provider == "aws":
+            if self._opensearch is None:
+                raise ValueError("OpenSearch client is not initialized")
+            result = self._opensearch.mget(
+                index=self._index_name, body={"ids": ids}, _source=["metadata"]
+            )
+            return {
+                doc["_id"]: doc["_source"].get("metadata", {})
+                for doc in result.get("docs", [])
+                if doc.get("found")
+            }
+        if self._pinecone_index is None:
+            raise ValueError("Pinecone index is not intialized")
+        metadata: dict[str, dict[str, Any]] = {}
+        # Pinecone caps fetch requests at 1000 ids.
+        for start in range(0, len(ids), 1000):
+            response = self._pinecone_index.fetch(
+                ids=ids[start : start + 1000], namespace=self._settings.pinecone_namespace
+            )
+            for vector_id, vector in response.vectors.items():
+                metadata[vector_id] = dict(vector.metadata or {})
+        return metadata
+
+    def text_query(
+        self, text: str, top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        """Full-text ``match`` over the stored chunk text (OpenSearch only)."""
+        if self._provider != "aws":
+            raise ValueError("Full-text queries need BACKEND_PROVIDER=aws")
+        if self._opensearch is None:
+            raise ValueError("OpenSearch client is not initialized")
+        query: dict[str, Any] = {"match": {"metadata.text": text}}
+        if filters is not None:
+            query = {"bool": {"must": [query], "filter": filters.to_opensearch()}}
+        body = {"size": top_k, "query": query, "_source": ["metadata"]}
+        return _opensearch_matches(self._opensearch.search(index=self._index_name, body=body))
+
+    def _query_pinecone(
+        self, vector: list[float], top_k: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
         if self._pinecone_index is None:
             raise ValueError("Pineconeindex is not intialized")
         result = self._pinecone_index.query(
@@ -82,6 +299,7 @@ class VectorStore:
             vector=vector,
             top_k=top_k,
             include_metadata=True,
+            filter=filters.to_pinecone() if filters is not None else None,
         )
         matches=result.matches or []
         return [
@@ -92,17 +310,63 @@ class VectorStore:
             )
             for match in matches
         ]
-    
-    def _build_opensearch_client(self) -> OpenSearch:
+
+    def _span_attributes(self, top_k: int, filters: MetadataFilter | None) -> dict[str, Any]:
+        return {
+            "vector.provider": self._provider,
+            "vector.top_k": top_k,
+            "vector.filtered": filters is not None,
+        }
+
+    @staticmethod
+    def _knn_body(
+        vector: list[float], top_k: int, filters: MetadataFilter | None = None
+    ) -> dict[str, Any]:
+        knn: dict[str, Any] = {"vector":vector,"k":top_k}
+        if filters is not None:
+            knn["filter"] = {"bool": {"filter": filters.to_opensearch()}}
+        return {
+            "size": top_k,
+            "query":{"knn":{"vector":knn}},
+            "_source":["metadata"],
+        }
+
+    def _require_local(self) -> LocalVectorIndex:
+        if self._local_index is None:
+            raise ValueError("Local vector index is not initialized")
+        return self._local_index
+
+    def _require_async_opensearch(self) -> "AsyncOpenSearch":
+        # Built on first use: the async client needs aiohttp, which the ingestion
+        # scripts never load.
+        if self._async_opensearch is None:
+            from opensearchpy import AsyncHttpConnection, AsyncOpenSearch, AWSV4SignerAsyncAuth
+
+            host, credentials = self._opensearch_host_and_credentials()
+            self._async_opensearch = AsyncOpenSearch(
+                hosts=[{"host": host, "port": 443}],
+                http_auth=AWSV4SignerAsyncAuth(credentials, self._settings.aws_region, "aoss"),
+                use_ssl=True,
+                verify_certs=True,
+                connection_class=AsyncHttpConnection,
+                timeout=30,
+            )
+        return self._async_opensearch
+
+    def _opensearch_host_and_credentials(self) -> tuple[str, Any]:
         endpoint = self._settings.aws_opensearch_endpoint
         if not endpoint:
             raise ValueError("AWS_OPENSEARCH_ENDPOINT is required when BACKEND_PROVIDER=aws")
-        
+
         host = endpoint.replace("https://","").replace("http://","").strip("/")
-        sesion = boto3.Session(region_name=self._settings.aws_region)
+        session = boto3.Session(region_name=self._settings.aws_region)
         credentials = session.get_credentials()
         if credentials is None:
             raise ValueError("AWS credentials not found for OpenSearch auth")
+        return host, credentials
+
+    def _build_opensearch_client(self) -> OpenSearch:
+        host, credentials = self._opensearch_host_and_credentials()
         auth = AWSV4SignerAuth(credentials, self._settings.aws_region, "aoss")
         return OpenSearch(
             hosts=[{"host": host, "port": 443}],
@@ -113,10 +377,33 @@ class VectorStore:
             timeout=30,
         )
     
+def _local_matches(results: list[tuple[str, float, dict[str, Any]]]) -> list[VectorMatch]:
+    return [
+        VectorMatch(id=vector_id, score=score, metadata=metadata)
+        for vector_id, score, metadata in results
+    ]
+
+
+def _opensearch_matches(result: dict[str, Any]) -> list[VectorMatch]:
+    hits = result.get("hits",{}).get("hits",[])
+    return [
+        VectorMatch(
+            id=str(hit.get("_id","")),
+            score=float(hit.get("_score",0.0)),
+            metadata=dict(hit.get("_source",{}).get("metadata",{})),
+        )
+        for hit in hits
+    ]
+
+
 def ensure_vector_index(settings: Settings) -> None:
+    if settings.backend_provider.lower() == "local":
+        # The local index creates its files on first use.
+        VectorStore(settings)
+        return
     if settings.backend_provider.lower() != "aws":
         pc = build_pinecone_client(settings)
-        existing = {index_name for index in pc.list_indexes()}
+        existing = {index.name for index in pc.list_indexes()}
         if settings.pinecone_index_name in existing:
             return
         from pinecone import ServerlessSpec
@@ -134,20 +421,34 @@ def ensure_vector_index(settings: Settings) -> None:
     if store._opensearch.indices.exists(index=settings.aws_opensearch_index_name):
         return
     
-    body = {
+    store._opensearch.indices.create(
+        index=settings.aws_opensearch_index_name, body=opensearch_index_body(settings)
+    )
+
+
+def opensearch_index_body(settings: Settings) -> dict[str, Any]:
+    """Index settings and mapping for the OpenSearch vector index.
+
+    faiss applies k-NN ``filter`` clauses during the graph search (OpenSearch
+    2.9+; older domains create the index fine and only filtered queries fail),
+    where nmslib can only post-filter. faiss rejects ``cosinesimil`` before
+    2.19, so the space is ``innerproduct``: every embedding is unit-normalized,
+    which makes it the same ranking with the same ``1 + cos`` score.
+    """
+    return {
         "settings": {"index.knn": True},
         "mappings": {
             "properties": {
                 "vector": {
                     "type":"knn_vector",
-                    "dimesion":{
+                    "dimension": settings.embedding_dimension,
+                    "method": {
                         "name":"hnsw",
-                        "space_type":"cosinesimil",
-                        "engine":"nmslib",
+                        "space_type":"innerproduct",
+                        "engine":"faiss",
                     },
                 },
                 "metadata": {"type":"object","enabled":True},
             }
         }
     }
-    store._opensearch.indices.create(index=settings.aws_opensearch_index_name,body=body)
\ No newline at end of file
@@ -1,11 +1,35 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 
+from conversational_agent.api.deps import close_services, get_chat_service
 from conversational_agent.api.routes import router
 from conversational_agent.core.config import get_settings
 from conversational_agent.core.logging import configure_logging
+from conversational_agent.observability.instrumentation import configure_instrumentation
+from conversational_agent.observability.metrics import register_metrics
+from conversational_agent.observability.tracing import configure_tracing, instrument_fastapi
 
 settings = get_settings()
 configure_logging(settings.log_level)
+configure_tracing(settings)
+configure_instrumentation(settings)
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Loads the embedding model and opens the stores and Redis before traffic.
+    await run_in_threadpool(get_chat_service)
+    yield
+    # Draining the summarizer can wait on the LLM, so it also stays off the loop.
+    await run_in_threadpool(close_services)
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+register_metrics(app)
+if settings.otel_enabled:
+    instrument_fastapi(app)
 app.include_router(router)
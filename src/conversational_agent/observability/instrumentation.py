@@ -0,0 +1,119 @@
+from time import perf_counter
+from typing import Any
+
+from opentelemetry import context, trace
+from opentelemetry.trace import Span, Status, StatusCode, Tracer, TracerProvider
+
+from conversational_agent.core.config import Settings
+from conversational_agent.observability.metrics import STAGE_LATENCY
+
+# Set by ``configure_instrumentation``; until then every stage is the no-op below,
+# so scripts and tests that never configure it pay nothing.
+_metrics_enabled = False
+_tracer: Tracer | None = None
+_histograms: dict[str, Any] = {}
+
+
+class Stage:
+    """One timed hot-path stage: a ``STAGE_LATENCY`` sample and an OpenTelemetry span.
+
+    Use it as a context manager, which also makes the span current so nested
+    stages become its children. ``start``/``finish`` serve callers that open and
+    close a stage from different callbacks; those spans are not made current.
+    """
+
+    __slots__ = ("_name", "_attributes", "_current", "_span", "_token", "_started")
+
+    def __init__(self, name: str, attributes: dict[str, Any] | None, current: bool) -> None:
+        self._name = name
+        self._attributes = attributes
+        self._current = current
+        self._span: Span | None = None
+        self._token: object | None = None
+        self._started = 0.0
+
+    def __enter__(self) -> "Stage":
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, traceback: Any) -> None:
+        self.finish(exc)
+
+    def start(self) -> "Stage":
+        if _tracer is not None:
+            self._span = _tracer.start_span(self._name, attributes=self._attributes)
+            if self._current:
+                self._token = context.attach(trace.set_span_in_context(self._span))
+        self._started = perf_counter()
+        return self
+
+    def set(self, key: str, value: Any) -> None:
+        if self._span is not None:
+            self._span.set_attribute(key, value)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        if _metrics_enabled:
+            histogram = _histograms.get(self._name)
+            if histogram is None:
+                histogram = _histograms.setdefault(
+                    self._name, STAGE_LATENCY.labels(stage=self._name)
+                )
+            histogram.observe(perf_counter() - self._started)
+        if self._span is None:
+            return
+        if error is not None:
+            self._span.record_exception(error)
+            self._span.set_status(Status(StatusCode.ERROR, type(error).__name__))
+        if self._token is not None:
+            context.detach(self._token)
+        self._span.end()
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopStage":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, traceback: Any) -> None:
+        return None
+
+    def start(self) -> "_NoopStage":
+        return self
+
+    def set(self, key: str, value: Any) -> None:
+        return None
+
+    def finish(self, error: BaseException | None = None) -> None:
+        return None
+
+
+_NOOP = _NoopStage()
+
+
+def instrument(
+    name: str, attributes: dict[str, Any] | None = None, current: bool = True
+) -> Stage | _NoopStage:
+    """Instrument one stage; with metrics and spans off this is a shared no-op."""
+    if not _metrics_enabled and _tracer is None:
+        return _NOOP
+    return Stage(name, attributes, current)
+
+
+def instrumentation_enabled() -> bool:
+    return _metrics_enabled or _tracer is not None
+
+
+def configure_instrumentation(
+    settings: Settings, tracer_provider: TracerProvider | None = None
+) -> None:
+    """Turn stage metrics and spans on or off.
+
+    Spans go to ``tracer_provider`` (the global one by default) and are only
+    created when ``OTEL_ENABLED`` and ``STAGE_SPANS_ENABLED`` are both set.
+    """
+    global _metrics_enabled, _tracer
+    _metrics_enabled = settings.stage_metrics_enabled
+    _tracer = None
+    if settings.otel_enabled and settings.stage_spans_enabled:
+        provider = tracer_provider or trace.get_tracer_provider()
+        _tracer = provider.get_tracer(__name__)
@@ -1,8 +1,10 @@
 from time import perf_counter
+from typing import Any
 
-from fastapi import FastAPI, Request, Response
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
-from starlette.response import PlainTextResponse
+from fastapi import FastAPI
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 REQUEST_COUNT = Counter(
     "http_requests_total",
@@ -17,19 +19,280 @@ REQUEST_LATENCY = Histogram(
     buckets=(0.01,0.05,0.1,0.5,1,2,5),
 )
 
-def register_metrics(app:FastAPI) -> None:
-    @app.middleware("http")
-    async def metrics_middleware(request: Request, call_next) -> Response:
-        method = request.method
-        path = request.url.path
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"],
+)
+
+REQUEST_BODY_SIZE = Histogram(
+    "http_request_body_bytes",
+    "HTTP request body size in bytes",
+    ["method","path"],
+    buckets=(0,256,1024,4096,16384,65536,262144,1048576),
+)
+
+RESPONSE_BODY_SIZE = Histogram(
+    "http_response_body_bytes",
+    "HTTP response body size in bytes",
+    ["method","path"],
+    buckets=(0,256,1024,4096,16384,65536,262144,1048576),
+)
+
+RETRIEVAL_REQUESTS = Counter(
+    "retrieval_requests_total",
+    "Knowledge base retrievals by calling stage and outcome (executed or reused)",
+    ["stage","outcome"],
+)
+
+RETRIEVALS_PER_TURN = Histogram(
+    "retrieval_searches_per_turn",
+    "Vector searches actually executed while serving one chat turn",
+    buckets=(0,1,2,3,4,6,8),
+)
+
+RETRIEVAL_LEG_LATENCY = Histogram(
+    "retrieval_leg_duration_seconds",
+    "Latency of one hybrid retrieval leg (vector or lexical)",
+    ["leg"],
+    buckets=(0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2),
+)
+
+HYBRID_RESULTS = Counter(
+    "hybrid_retrieval_results_total",
+    "Fused hybrid results by the leg that retrieved them (vector, lexical, both)",
+    ["leg"],
+)
+
+RERANK_LATENCY = Histogram(
+    "rerank_duration_seconds",
+    "Cross-encoder re-rank latency for one query (p50/p99 via histogram_quantile)",
+    buckets=(0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2),
+)
+
+RERANK_CANDIDATES = Histogram(
+    "rerank_candidates",
+    "Adaptive re-rank candidate depth chosen per query",
+    buckets=(1,3,5,8,10,15,20,30,50),
+)
+
+RERANK_DECISIONS = Counter(
+    "rerank_decisions_total",
+    "Queries re-ranked or skipped as confident",
+    ["outcome"],
+)
+
+RERANK_CACHE_LOOKUPS = Counter(
+    "rerank_cache_lookups_total",
+    "Cross-encoder score cache lookups per (query, chunk) pair by result (hit, miss)",
+    ["result"],
+)
+
+CONTEXT_TOKENS = Histogram(
+    "retrieval_context_tokens",
+    "Tokens of assembled retrieval context handed to the LLM per tool call",
+    buckets=(100,250,500,750,1000,1500,2000,3000,4000),
+)
+
+CONTEXT_TOKENS_SAVED = Counter(
+    "retrieval_context_tokens_saved_total",
+    "Prompt tokens saved by merging, deduplicating and budgeting retrieved snippets",
+)
+
+CHAT_TIME_TO_FIRST_TOKEN = Histogram(
+    "chat_time_to_first_token_seconds",
+    "Time from a streaming chat request to its first answer token, by answer source",
+    ["source"],
+    buckets=(0.05,0.1,0.25,0.5,1,2,5,10),
+)
+
+COALESCED_REQUESTS = Counter(
+    "chat_coalesced_requests_total",
+    "Chat turns served by another in-flight turn with the same response-cache key, "
+    "by scope (process, replica) or fallback when the leader gave no result",
+    ["scope"],
+)
+
+STAGE_LATENCY = Histogram(
+    "chat_stage_duration_seconds",
+    "Latency of one hot-path stage (embedding, vector query, retrieval, LLM call, tool "
+    "call, cache lookup, session read or write)",
+    ["stage"],
+    buckets=(0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2,5,10),
+)
+
+REDIS_LATENCY = Histogram(
+    "redis_operation_duration_seconds",
+    "Round-trip latency of Redis session, cache and semantic cache operations",
+    ["operation"],
+    buckets=(0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25),
+)
+
+MEMORY_STORE_ENTRIES = Gauge(
+    "memory_store_entries",
+    "Entries held by an in-process session store or response cache",
+    ["store"],
+)
+
+MEMORY_STORE_BYTES = Gauge(
+    "memory_store_bytes",
+    "Estimated bytes held by an in-process session store or response cache",
+    ["store"],
+)
+
+MEMORY_STORE_EVICTIONS = Counter(
+    "memory_store_evictions_total",
+    "In-process store entries removed by reason (lru, expired, oversized)",
+    ["store","reason"],
+)
+
+MEMORY_STORE_LOOKUPS = Counter(
+    "memory_store_lookups_total",
+    "In-process store lookups by result (hit, miss)",
+    ["store","result"],
+)
+
+SEMANTIC_CACHE_LOOKUPS = Counter(
+    "semantic_cache_lookups_total",
+    "Semantic response cache lookups by result (hit, near_miss, miss)",
+    ["result"],
+)
+
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    "semantic_cache_best_similarity",
+    "Cosine similarity of the closest cached query at lookup time",
+    buckets=(0.5,0.6,0.7,0.75,0.8,0.85,0.9,0.95,0.98,1.0),
+)
+
+EMBEDDED_TEXTS = Counter(
+    "embedding_texts_total",
+    "Texts embedded by provider",
+    ["provider"],
+)
+
+EMBEDDING_BATCH_LATENCY = Histogram(
+    "embedding_batch_duration_seconds",
+    "Wall-clock time to embed one embed_documents batch",
+    ["provider"],
+    buckets=(0.05,0.1,0.5,1,2,5,10,30,60),
+)
+
+EMBEDDING_RETRIES = Counter(
+    "embedding_retries_total",
+    "Embedding requests retried after throttling",
+    ["provider"],
+)
+
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "embedding_cache_lookups_total",
+    "Embedding cache lookups by result (memory_hit, disk_hit, miss)",
+    ["result"],
+)
+
+EMBEDDING_CACHE_BYTES = Gauge(
+    "embedding_cache_bytes",
+    "Bytes used by the embedding cache per tier",
+    ["tier"],
+)
+
+INGESTED_CHUNKS = Counter(
+    "ingestion_chunks_total",
+    "Chunks seen during ingestion by outcome (new, unchanged, moved, deleted)",
+    ["outcome"],
+)
+
+# Anything else (including junk methods) is reported as "OTHER" so clients cannot
+# mint label values.
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+# Requests that matched no route share one label instead of one per raw URL.
+UNMATCHED_PATH = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware for the HTTP request metrics.
+
+    Records request count, latency, in-flight requests and body sizes, labelled
+    by the matched route template (``/api/v1/chat``) rather than the raw URL.
+
+    Unlike ``@app.middleware("http")`` it does not wrap every request in a
+    ``Request``/``Response`` pair and an extra task, and streaming responses pass
+    through untouched. Label children are resolved once per (method, route,
+    status) and reused.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._in_flight: dict[str, Any] = {}
+        self._series: dict[tuple[str, str], tuple[Any, Any, Any]] = {}
+        self._counts: dict[tuple[str, str, int], Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+        in_flight = self._in_flight.get(method)
+        if in_flight is None:
+            in_flight = self._in_flight.setdefault(method, REQUESTS_IN_FLIGHT.labels(method))
+        request_bytes = 0
+        response_bytes = 0
+        status_code = 500
+
+        async def receive_counting() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_counting(message: Message) -> None:
+            nonlocal response_bytes, status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
         start = perf_counter()
-        response = await call_next(request)
-        duration = perf_counter() - start
+        try:
+            await self.app(scope, receive_counting, send_counting)
+        finally:
+            duration = perf_counter() - start
+            in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_PATH
+            latency, request_size, response_size = self._children(method, path)
+            latency.observe(duration)
+            request_size.observe(request_bytes)
+            response_size.observe(response_bytes)
+            self._count(method, path, status_code).inc()
+
+    def _children(self, method: str, path: str) -> tuple[Any, Any, Any]:
+        children = self._series.get((method, path))
+        if children is None:
+            children = (
+                REQUEST_LATENCY.labels(method=method, path=path),
+                REQUEST_BODY_SIZE.labels(method=method, path=path),
+                RESPONSE_BODY_SIZE.labels(method=method, path=path),
+            )
+            self._series[(method, path)] = children
+        return children
+
+    def _count(self, method: str, path: str, status_code: int) -> Any:
+        counter = self._counts.get((method, path, status_code))
+        if counter is None:
+            counter = REQUEST_COUNT.labels(
+                method=method, path=path, status_code=str(status_code)
+            )
+            self._counts[(method, path, status_code)] = counter
+        return counter
+
+
+def register_metrics(app: FastAPI) -> None:
+    app.add_middleware(MetricsMiddleware)
 
-        REQUEST_COUNT.labels(metho=method, path=path, status_code=str(response.status_code)).inc()
-        REQUEST_LATENCY.labels(method=method, path=path).observe(duration)
-        return response
-    
     @app.get("/metrics", tags=["observability"])
     def metrics() -> PlainTextResponse:
         return PlainTextResponse(generate_latest().decode("utf-8"),media_type=CONTENT_TYPE_LATEST)
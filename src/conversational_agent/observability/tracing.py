@@ -1,3 +1,4 @@
+from fastapi import FastAPI
 from opentelemetry import trace
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
@@ -7,18 +8,20 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExport
 
 from conversational_agent.core.config import Settings
 
-def confgiure_tracing(settings: Settings) -> None:
+
+def configure_tracing(settings: Settings) -> None:
     if not settings.otel_enabled:
         return
-    
-    resource = Resource(attributes = {SERVICE_NAME: settings.otel_service_name})
+
+    resource = Resource(attributes={SERVICE_NAME: settings.otel_service_name})
     provider = TracerProvider(resource=resource)
     if settings.otel_exporter_otlp_endpoint:
-        processor = BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint))
+        exporter = OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint)
     else:
-        processor = BatchSpanProcessor(ConsoleSpanExporter())
-    provider.add_span_processor(processor)
-    tracer.set_tracer_provider(provider)
+        exporter = ConsoleSpanExporter()
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
 
-def instrument_fastapi(app) -> None:
-    FASTAPIInstrumentor.instrument_app(app)            
\ No newline at end of file
+def instrument_fastapi(app: FastAPI) -> None:
+    FastAPIInstrumentor.instrument_app(app)
@@ -0,0 +1,317 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from glob import glob
+from pathlib import Path
+
+from pypdf import PdfReader
+
+from conversational_agent.services.ingestion_service import IngestionService
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status lookups before the oldest are forgotten.
+_MAX_FINISHED_JOBS = 100
+
+
+@dataclass
+class BulkIngestResult:
+    documents: int = 0
+    chunks: int = 0
+    skipped: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+@dataclass
+class BulkIngestJob:
+    job_id: str
+    documents_total: int
+    status: str = "queued"
+    result: BulkIngestResult | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+def resolve_pdf_paths(
+    directory: str | None = None,
+    pattern: str | None = None,
+    manifest: str | None = None,
+) -> list[Path]:
+    """Expand a directory, glob pattern or manifest file into a sorted list of PDFs.
+
+    A manifest is a text file with one PDF path per line; blank lines and lines
+    starting with ``#`` are ignored and relative paths resolve against the
+    manifest's directory.
+    """
+    if sum(option is not None for option in (directory, pattern, manifest)) != 1:
+        raise ValueError("Exactly one of directory, glob pattern or manifest is required")
+
+    if directory is not None:
+        root = Path(directory)
+        if not root.is_dir():
+            raise ValueError(f"Invalid directory: {directory}")
+        paths = [path for path in root.rglob("*") if path.suffix.lower() == ".pdf"]
+    elif pattern is not None:
+        paths = [Path(item) for item in glob(pattern, recursive=True)]
+    else:
+        manifest_path = Path(str(manifest))
+        if not manifest_path.is_file():
+            raise ValueError(f"Invalid manifest: {manifest}")
+        paths = []
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            path = Path(entry)
+            paths.append(path if path.is_absolute() else manifest_path.parent / path)
+
+    return sorted({path for path in paths if path.suffix.lower() == ".pdf"})
+
+
+def ingest_root(
+    directory: str | None = None,
+    pattern: str | None = None,
+    manifest: str | None = None,
+) -> Path:
+    """Directory that bulk-ingest source ids are taken relative to.
+
+    That is the scanned directory, the literal prefix of a glob pattern, or the
+    manifest's directory, matching how ``resolve_pdf_paths`` found the files.
+    """
+    if directory is not None:
+        return Path(directory)
+    if pattern is not None:
+        prefix = []
+        for part in Path(pattern).parts:
+            if any(char in part for char in "*?["):
+                break
+            prefix.append(part)
+        return Path(*prefix) if prefix else Path(".")
+    if manifest is not None:
+        return Path(manifest).parent
+    raise ValueError("Exactly one of directory, glob pattern or manifest is required")
+
+
+def assign_source_ids(paths: list[Path], root: Path | None = None) -> dict[Path, str]:
+    """Map each PDF to a source id built from its path under ``root``.
+
+    The stem alone is not unique (``a/report.pdf`` and ``b/report.pdf``), and a
+    shared id would make the second ingest delete the first file's chunks, so
+    ids keep the relative directory. Files outside ``root`` use their absolute
+    path. Two paths that still collide are rejected before anything is written.
+    """
+    if not paths:
+        return {}
+    if root is None:
+        root = Path(os.path.commonpath([path.resolve().parent for path in paths]))
+    base = root.resolve()
+    source_ids: dict[Path, str] = {}
+    owners: dict[str, Path] = {}
+    for path in paths:
+        resolved = path.resolve()
+        try:
+            source_id = resolved.relative_to(base).with_suffix("").as_posix()
+        except ValueError:
+            source_id = resolved.with_suffix("").as_posix()
+        if source_id in owners:
+            raise ValueError(
+                f"Duplicate source id {source_id!r} for {owners[source_id]} and {path}"
+            )
+        owners[source_id] = path
+        source_ids[path] = source_id
+    return source_ids
+
+
+def extract_pdf_pages(path: str) -> list[str]:
+    """Runs in a worker process, so it must stay a picklable module-level function."""
+    reader = PdfReader(path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+class IngestionJournal:
+    """Append-only JSONL record of finished documents so a crashed run can resume."""
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._completed: set[str] = set()
+        if self._path.exists():
+            for line in self._path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a partially written final line.
+                    continue
+                if isinstance(entry, dict) and "path" in entry:
+                    self._completed.add(str(entry["path"]))
+
+    def is_completed(self, path: Path) -> bool:
+        return str(path.resolve()) in self._completed
+
+    def record(self, path: Path, source_id: str, chunks: int) -> None:
+        resolved = str(path.resolve())
+        entry = json.dumps({"path": resolved, "source_id": source_id, "chunks": chunks})
+        with self._lock:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(entry + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._completed.add(resolved)
+
+
+class BulkIngestionService:
+    """Ingests many PDFs with one shared embedding model and vector store.
+
+    Text extraction is CPU bound and runs in a process pool; embedding and upserts
+    reuse the single IngestionService pipeline in this process. ``submit`` runs a
+    whole ingest as a background job, one at a time, so callers can poll for it.
+    """
+
+    def __init__(self, ingestion_service: IngestionService, workers: int) -> None:
+        self._ingestion_service = ingestion_service
+        self._workers = max(1, workers)
+        self._jobs: OrderedDict[str, BulkIngestJob] = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-ingest")
+
+    def submit(
+        self,
+        paths: list[Path],
+        journal_path: str | None = None,
+        root: Path | None = None,
+    ) -> BulkIngestJob:
+        # Validate up front so a colliding source id fails the request, not the job.
+        assign_source_ids(paths, root)
+        job = BulkIngestJob(job_id=uuid.uuid4().hex, documents_total=len(paths))
+        with self._jobs_lock:
+            self._jobs[job.job_id] = job
+            finished = [job_id for job_id, item in self._jobs.items() if item.finished]
+            for job_id in finished[: max(0, len(finished) - _MAX_FINISHED_JOBS)]:
+                del self._jobs[job_id]
+        self._runner.submit(self._run_job, job, paths, journal_path, root)
+        return job
+
+    def get_job(self, job_id: str) -> BulkIngestJob | None:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def _run_job(
+        self,
+        job: BulkIngestJob,
+        paths: list[Path],
+        journal_path: str | None,
+        root: Path | None,
+    ) -> None:
+        job.status = "running"
+        try:
+            job.result = self.ingest(paths, journal_path=journal_path, root=root)
+        except Exception as exc:  # noqa: BLE001 - surfaced through the job status
+            logger.exception("bulk ingestion job %s failed", job.job_id)
+            job.error = str(exc)
+            job.status = "failed"
+            return
+        job.status = "succeeded"
+
+    def ingest(
+        self,
+        paths: list[Path],
+        journal_path: str | None = None,
+        root: Path | None = None,
+    ) -> BulkIngestResult:
+        source_ids = assign_source_ids(paths, root)
+        journal = IngestionJournal(journal_path) if journal_path else None
+        result = BulkIngestResult()
+        pending = []
+        for path in paths:
+            if journal is not None and journal.is_completed(path):
+                result.skipped += 1
+            else:
+                pending.append(path)
+
+        start = time.perf_counter()
+        # Spawn, not fork: the parent holds threads, locks and open clients that a
+        # forked child would inherit in whatever state they happened to be in.
+        with ProcessPoolExecutor(
+            max_workers=self._workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            queue = iter(pending)
+            in_flight: dict[Future[list[str]], Path] = {}
+
+            def _submit_next() -> None:
+                path = next(queue, None)
+                if path is not None:
+                    in_flight[pool.submit(extract_pdf_pages, str(path))] = path
+
+            # Keep extraction a little ahead of ingestion without loading every
+            # document's text into memory at once.
+            for _ in range(self._workers * 2):
+                _submit_next()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = in_flight.pop(future)
+                    _submit_next()
+                    self._ingest_one(path, source_ids[path], future, journal, result)
+
+        result.elapsed_seconds = time.perf_counter() - start
+        logger.info(
+            "bulk ingestion finished docs=%d chunks=%d skipped=%d failed=%d "
+            "docs/sec=%.2f chunks/sec=%.1f",
+            result.documents,
+            result.chunks,
+            result.skipped,
+            len(result.failed),
+            result.docs_per_second,
+            result.chunks_per_second,
+        )
+        return result
+
+    def _ingest_one(
+        self,
+        path: Path,
+        source_id: str,
+        future: Future[list[str]],
+        journal: IngestionJournal | None,
+        result: BulkIngestResult,
+    ) -> None:
+        try:
+            pages = future.result()
+            count = self._ingestion_service.ingest_pages(pages, source_id, str(path))
+            if count == 0:
+                raise ValueError("PDF contains no extractable text")
+        except Exception as exc:  # noqa: BLE001 - one bad PDF must not stop the run
+            logger.warning("failed to ingest %s: %s", path, exc)
+            result.failed[str(path)] = str(exc)
+            return
+
+        result.documents += 1
+        result.chunks += count
+        if journal is not None:
+            journal.record(path, source_id, count)
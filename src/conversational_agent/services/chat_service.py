@@ -1,19 +1,68 @@
 import json
 import hashlib
-from typing import Protocol
-
-import redis
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Protocol
 
 from conversational_agent.agent.graph import AgentService
 from conversational_agent.core.config import Settings
 from conversational_agent.domain.schemas import ChatResponse
-from conversational_agent.services.retrieval_service import RetrievalService
+from conversational_agent.infrastructure.bounded_cache import BoundedCache, BoundedCacheStats
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+from conversational_agent.infrastructure.redis_client import async_redis, sync_redis
+from conversational_agent.observability.instrumentation import instrument
+from conversational_agent.observability.metrics import (
+    CHAT_TIME_TO_FIRST_TOKEN,
+    REDIS_LATENCY,
+    RETRIEVALS_PER_TURN,
+)
+from conversational_agent.services.retrieval_service import RetrievalContext, RetrievalService
+from conversational_agent.services.semantic_cache import SemanticCache
+from conversational_agent.services.single_flight import SingleFlight
 
 class SessionStore(Protocol):
+    """Conversation history per session.
+
+    ``get`` returns the stored messages oldest first, preceded by a
+    ``{"role": "summary"}`` entry when older turns have been summarized.
+    Appends return the messages they evicted to stay within the store's limit.
+    ``prefetch`` reads the history together with a response-cache entry, in one
+    round trip where the backends allow it.
+    """
+
     def get(self, session_id: str) -> list[dict[str, str]]:
         ...
 
-    def append(self, session_id: str, role: str, content: str) -> None:
+    def append(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        ...
+
+    def append_turn(self, session_id: str, user: str, assistant: str) -> list[dict[str, str]]:
+        ...
+
+    def prefetch(
+        self, session_id: str, cache: "ResponseCache", cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        ...
+
+    async def aget(self, session_id: str) -> list[dict[str, str]]:
+        ...
+
+    async def aappend(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        ...
+
+    async def aappend_turn(
+        self, session_id: str, user: str, assistant: str
+    ) -> list[dict[str, str]]:
+        ...
+
+    async def aprefetch(
+        self, session_id: str, cache: "ResponseCache", cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        ...
+
+    def set_summary(self, session_id: str, summary: str) -> None:
         ...
 
 class ResponseCache(Protocol):
@@ -23,68 +72,274 @@ class ResponseCache(Protocol):
     def set(self, key: str, value: str) -> None:
         ...
 
+    async def aget(self, key: str) -> str | None:
+        ...
+
+    async def aset(self, key: str, value: str) -> None:
+        ...
+
+class _Session:
+    """Compact session record.
+
+    Messages are ``(role, content)`` tuples in a tuple that is replaced rather
+    than mutated, so readers never need the store lock.
+    """
+
+    __slots__ = ("messages", "summary")
+
+    def __init__(self, messages: tuple[tuple[str, str], ...], summary: str | None) -> None:
+        self.messages = messages
+        self.summary = summary
+
+
 class InMemorySessionStore(SessionStore):
-    def __init__(self) -> None:
-        self._sessions: dict[str, list[dict[str, str]]] = {}
+    """Single-replica session store with the Redis store's limits.
+
+    Keeps at most ``max_messages`` per session (returning what it evicts), and
+    at most ``max_sessions`` sessions / ``max_bytes`` estimated bytes overall with
+    LRU eviction; sessions expire ``ttl_seconds`` after their last write.
+    """
+
+    def __init__(
+        self,
+        max_messages: int | None = None,
+        max_sessions: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self._sessions: BoundedCache[_Session] = BoundedCache(
+            "sessions", max_sessions, max_bytes, ttl_seconds, _session_size
+        )
+        self._max_messages = max_messages
+        self._lock = threading.Lock()
 
     def get(self, session_id: str) -> list[dict[str, str]]:
-        return self._sessions.get(session_id, [])
+        session = self._sessions.get(session_id)
+        if session is None:
+            return []
+        messages = [{"role": role, "content": content} for role, content in session.messages]
+        return _with_summary(session.summary, messages)
+
+    def append(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        return self._append(session_id, ((sys.intern(role), content),))
+
+    def append_turn(self, session_id: str, user: str, assistant: str) -> list[dict[str, str]]:
+        return self._append(session_id, (("user", user), ("assistant", assistant)))
+
+    def prefetch(
+        self, session_id: str, cache: ResponseCache, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        return self.get(session_id), cache.get(cache_key)
+
+    async def aget(self, session_id: str) -> list[dict[str, str]]:
+        return self.get(session_id)
 
-    def append(self, session_id: str, role: str, content: str) -> None:
-        self._sessions.setdefault(session_id, []).append({"role": role, "content": content})
+    async def aappend(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        return self.append(session_id, role, content)
+
+    async def aappend_turn(
+        self, session_id: str, user: str, assistant: str
+    ) -> list[dict[str, str]]:
+        return self.append_turn(session_id, user, assistant)
+
+    async def aprefetch(
+        self, session_id: str, cache: ResponseCache, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        return self.get(session_id), await cache.aget(cache_key)
+
+    def set_summary(self, session_id: str, summary: str) -> None:
+        with self._lock:
+            session = self._sessions.peek(session_id)
+            messages = session.messages if session is not None else ()
+            self._sessions.set(session_id, _Session(messages, summary))
+
+    def stats(self) -> BoundedCacheStats:
+        return self._sessions.stats()
+
+    def _append(
+        self, session_id: str, items: tuple[tuple[str, str], ...]
+    ) -> list[dict[str, str]]:
+        with self._lock:
+            session = self._sessions.peek(session_id)
+            messages = (session.messages if session is not None else ()) + items
+            evicted: tuple[tuple[str, str], ...] = ()
+            if self._max_messages is not None and len(messages) > self._max_messages:
+                overflow = len(messages) - self._max_messages
+                evicted, messages = messages[:overflow], messages[overflow:]
+            summary = session.summary if session is not None else None
+            self._sessions.set(session_id, _Session(messages, summary))
+        return [{"role": role, "content": content} for role, content in evicted]
 
 class RedisSessionStore(SessionStore):
+    """Session history as a Redis list trimmed to ``SESSION_MAX_TURNS`` turns.
+
+    A turn is appended with one MULTI (``RPUSH`` of both messages, a read of what
+    falls off the front, ``LTRIM``, ``EXPIRE``) so concurrent appends never hand
+    the same evicted message to two summarizers. ``prefetch`` reads the history,
+    its summary and a ``RedisResponseCache`` entry in one pipeline.
+    """
+
     def __init__(self,settings:Settings)-> None:
-        if not settings.redis_url:
-          raise ValueError("Redis url is required for RedisSessionStore")
-        self._redis = redis.Redis.from_url(settings.redis_url,deocde_responses=True)
+        self._redis = sync_redis(settings)
+        self._aredis = async_redis(settings)
         self._ttl_seconds = settings.session_ttl_seconds
+        self._max_messages = max(2, settings.session_max_turns * 2)
 
     def get(self, session_id: str) -> list[dict[str, str]]:
+        with REDIS_LATENCY.labels(operation="session_get").time():
+            pipe = self._redis.pipeline(transaction=False)
+            self._queue_get(pipe, session_id)
+            return self._history(*pipe.execute())
+
+    def append(self, session_id:str, role:str, content:str) -> list[dict[str, str]]:
+        return self._append(session_id, [{"role": role, "content": content}])
+
+    def append_turn(self, session_id: str, user: str, assistant: str) -> list[dict[str, str]]:
+        return self._append(session_id, _turn(user, assistant))
+
+    def prefetch(
+        self, session_id: str, cache: ResponseCache, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        if not isinstance(cache, RedisResponseCache):
+            return self.get(session_id), cache.get(cache_key)
+        with REDIS_LATENCY.labels(operation="turn_prefetch").time():
+            pipe = self._redis.pipeline(transaction=False)
+            self._queue_get(pipe, session_id)
+            cache.queue_get(pipe, cache_key)
+            items, summary, cached = pipe.execute()
+        return self._history(items, summary), cached
+
+    async def aget(self, session_id: str) -> list[dict[str, str]]:
+        with REDIS_LATENCY.labels(operation="session_get").time():
+            pipe = self._aredis.pipeline(transaction=False)
+            self._queue_get(pipe, session_id)
+            return self._history(*await pipe.execute())
+
+    async def aappend(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        return await self._aappend(session_id, [{"role": role, "content": content}])
+
+    async def aappend_turn(
+        self, session_id: str, user: str, assistant: str
+    ) -> list[dict[str, str]]:
+        return await self._aappend(session_id, _turn(user, assistant))
+
+    async def aprefetch(
+        self, session_id: str, cache: ResponseCache, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        if not isinstance(cache, RedisResponseCache):
+            return await self.aget(session_id), await cache.aget(cache_key)
+        with REDIS_LATENCY.labels(operation="turn_prefetch").time():
+            pipe = self._aredis.pipeline(transaction=False)
+            self._queue_get(pipe, session_id)
+            cache.queue_get(pipe, cache_key)
+            items, summary, cached = await pipe.execute()
+        return self._history(items, summary), cached
+
+    def set_summary(self, session_id: str, summary: str) -> None:
+        self._redis.set(self._summary_key(session_id), summary, ex=self._ttl_seconds)
+
+    def _append(self, session_id: str, items: list[dict[str, str]]) -> list[dict[str, str]]:
+        with REDIS_LATENCY.labels(operation="session_append").time():
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_append(pipe, session_id, items)
+            return self._parse(pipe.execute()[1])
+
+    async def _aappend(
+        self, session_id: str, items: list[dict[str, str]]
+    ) -> list[dict[str, str]]:
+        with REDIS_LATENCY.labels(operation="session_append").time():
+            pipe = self._aredis.pipeline(transaction=True)
+            self._queue_append(pipe, session_id, items)
+            return self._parse((await pipe.execute())[1])
+
+    def _queue_get(self, pipe: Any, session_id: str) -> None:
+        pipe.lrange(self._key(session_id), 0, -1)
+        pipe.get(self._summary_key(session_id))
+
+    def _queue_append(self, pipe: Any, session_id: str, items: list[dict[str, str]]) -> None:
         key = self._key(session_id)
-        items = self._redis.lrange(key,0,-1)
+        pipe.rpush(key, *(json.dumps(item) for item in items))
+        # Everything before the newest ``max_messages`` entries, i.e. what LTRIM drops.
+        pipe.lrange(key, 0, -(self._max_messages + 1))
+        pipe.ltrim(key, -self._max_messages, -1)
+        pipe.expire(key, self._ttl_seconds)
+        pipe.expire(self._summary_key(session_id), self._ttl_seconds)
+
+    def _history(self, items: list[str], summary: str | None) -> list[dict[str, str]]:
+        return _with_summary(summary, self._parse(items))
+
+    @staticmethod
+    def _parse(items: list[str]) -> list[dict[str, str]]:
         result: list[dict[str,str]] = []
         for item in items:
             value = json.loads(item)
             role =str(value.get("role",""))
             content = str(value.get("content",""))
             if role and content:
-                rsult.append({"role":role, "content":content})
+                result.append({"role":role, "content":content})
         return result
 
-    def append(self, session_id:str, role:str, content:str) -> None:
-        key = self._key(session_id)
-        payload = json.dumps({"role":role,"content",content})
-        self._redis.rpush(key,payload)
-        self._redis.expire(key,self._ttl_seconds)
-
     @staticmethod
     def _key(session_id:str) -> str:
         return f"chat:session:{session_id}"
 
+    @staticmethod
+    def _summary_key(session_id: str) -> str:
+        return f"chat:session:{session_id}:summary"
+
 class InMemoryResponseCache(ResponseCache):
-    def __init__(self) -> None:
-        self._cache: dict[str,str] = {}
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self._cache: BoundedCache[str] = BoundedCache(
+            "responses", max_entries, max_bytes, ttl_seconds, sys.getsizeof
+        )
 
     def get(self,key:str)-> str | None:
         return self._cache.get(key)
 
     def set(self, key: str, value: str) -> None:
-        self._cache[key] = value
+        self._cache.set(key, value)
+
+    async def aget(self, key: str) -> str | None:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str) -> None:
+        self.set(key, value)
+
+    def stats(self) -> BoundedCacheStats:
+        return self._cache.stats()
 
-class RedisResponseCache(Responsecache):
+class RedisResponseCache(ResponseCache):
     def __init__(self, settings:Settings) -> None:
-        if not settings.redis_url:
-            raise ValueError("REDIS URL is required for RedisResponseCache")   
-        self._redis = redis.Redis.from_url(settings.redis_url,decode_response=True)
+        self._redis = sync_redis(settings)
+        self._aredis = async_redis(settings)
         self._ttl_seconds = settings.response_cache_ttl_seconds
 
     def get(self, key: str) -> str | None:
-        value = self._redis.get(self._key(key))
+        with REDIS_LATENCY.labels(operation="cache_get").time():
+            value = self._redis.get(self._key(key))
         return str(value) if value is not None else None
 
     def set(self, key: str, value: str) -> None:
-        self._redis.set(self._key(key), value, ex=self._ttl_seconds)
+        with REDIS_LATENCY.labels(operation="cache_set").time():
+            self._redis.set(self._key(key), value, ex=self._ttl_seconds)
+
+    async def aget(self, key: str) -> str | None:
+        with REDIS_LATENCY.labels(operation="cache_get").time():
+            value = await self._aredis.get(self._key(key))
+        return str(value) if value is not None else None
+
+    async def aset(self, key: str, value: str) -> None:
+        with REDIS_LATENCY.labels(operation="cache_set").time():
+            await self._aredis.set(self._key(key), value, ex=self._ttl_seconds)
+
+    def queue_get(self, pipe: Any, key: str) -> None:
+        """Adds this cache's ``GET`` for ``key`` to another store's pipeline."""
+        pipe.get(self._key(key))
 
     @staticmethod
     def _key(cache_key: str) -> str:
@@ -97,33 +352,368 @@ class ChatService:
         retrieval_service: RetrievalService,
         session_store: SessionStore,
         response_cache: ResponseCache,
+        semantic_cache: SemanticCache | None = None,
+        single_flight: SingleFlight | None = None,
     ) -> None:
         self._agent_service = agent_service
         self._retrieval_service = retrieval_service
         self._session_store = session_store
         self._response_cache = response_cache
+        self._semantic_cache = semantic_cache
+        self._single_flight = single_flight
 
-    def chat(self, session_id:str, query:str) -> ChatResponse:
-        sources = self._retrieval_service.search(query)
-        cache_key = self._build_cache_key(query=query,sources=sources)
-        cached_answer = self._response_cache.get(cache_key)
+    def chat(
+        self, session_id:str, query:str, filters: MetadataFilter | None = None
+    ) -> ChatResponse:
+        retrieval_context = RetrievalContext(filters=filters)
+        # Semantic cache entries are not scoped by filter, so filtered turns skip it.
+        semantic_cache = self._semantic_cache if filters is None else None
+        query_vector: list[float] | None = None
+        try:
+            if semantic_cache is not None:
+                query_vector = self._retrieval_service.embed_query(
+                    query, context=retrieval_context
+                )
+                cached_response = self._semantic_lookup(semantic_cache, query_vector)
+                if cached_response is not None:
+                    self._remember(session_id, query, cached_response.answer)
+                    return cached_response
 
-        if cached_answer:
-            self._session_store.append(session_id, "user", query)
-            self._session_store.append(session_id, "assistant", cached_answer)
-            return ChatResponse(answer=cached_answer,sources=sources)
-        
-        history = self._session_store.get(session_id)
-        answer = self._agent_service.run(query=query,history=history)
-        self._response_cache.set(cache_key,answer)
+            sources = self._retrieval_service.search(
+                query, context=retrieval_context, stage="chat", filters=filters
+            )
+            cache_key = self._build_cache_key(query=query,sources=sources)
+            # History and the cached answer come back in one round trip; the
+            # history is simply unused on a hit.
+            history, cached_answer = self._prefetch(session_id, cache_key)
 
-        self._session_store.append(session_id, "user",query)
-        self._session_store.append(session_id, "assistant",answer)
+            if cached_answer:
+                self._remember(session_id, query, cached_answer)
+                return ChatResponse(answer=cached_answer,sources=sources)
 
-        return ChatResponse(answer=answer, sources=sources)
+            answer = self._agent_service.run(
+                query=query, history=history, retrieval_context=retrieval_context
+            )
+        finally:
+            RETRIEVALS_PER_TURN.observe(retrieval_context.searches)
+        response = ChatResponse(answer=answer, sources=sources)
+        self._store(cache_key, response, semantic_cache, query_vector)
+        self._remember(session_id, query, answer)
+        return response
     
+    async def achat(
+        self, session_id: str, query: str, filters: MetadataFilter | None = None
+    ) -> ChatResponse:
+        """Async ``chat`` used by the API; every backend call is awaited.
+
+        Concurrent turns that miss the response cache with the same cache key and
+        the same history share one agent run through ``single_flight``; only its
+        leader writes the response and semantic caches. Turns whose histories differ
+        run separately, since the answer is generated from the history. The
+        streaming variants do not coalesce: a follower would get no tokens until the
+        leader finished, and ``chat`` is synchronous while the flights are async.
+        """
+        retrieval_context = RetrievalContext(filters=filters)
+        semantic_cache = self._semantic_cache if filters is None else None
+        query_vector: list[float] | None = None
+        try:
+            if semantic_cache is not None:
+                query_vector = await self._retrieval_service.aembed_query(
+                    query, context=retrieval_context
+                )
+                cached_response = await self._asemantic_lookup(semantic_cache, query_vector)
+                if cached_response is not None:
+                    await self._aremember(session_id, query, cached_response.answer)
+                    return cached_response
+
+            sources = await self._retrieval_service.asearch(
+                query, context=retrieval_context, stage="chat", filters=filters
+            )
+            cache_key = self._build_cache_key(query=query, sources=sources)
+            history, cached_answer = await self._aprefetch(session_id, cache_key)
+            if cached_answer:
+                await self._aremember(session_id, query, cached_answer)
+                return ChatResponse(answer=cached_answer, sources=sources)
+
+            async def answer_turn() -> str:
+                answer = await self._agent_service.arun(
+                    query=query, history=history, retrieval_context=retrieval_context
+                )
+                response = ChatResponse(answer=answer, sources=sources)
+                await self._astore(cache_key, response, semantic_cache, query_vector)
+                return answer
+
+            if self._single_flight is None:
+                answer = await answer_turn()
+            else:
+                answer = await self._single_flight.run(
+                    self._flight_key(cache_key, history), answer_turn
+                )
+        finally:
+            RETRIEVALS_PER_TURN.observe(retrieval_context.searches)
+
+        await self._aremember(session_id, query, answer)
+        return ChatResponse(answer=answer, sources=sources)
+
+    def chat_stream(
+        self, session_id: str, query: str, filters: MetadataFilter | None = None
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Streaming variant of ``chat`` yielding ``(event, data)`` pairs.
+
+        Emits ``sources`` once retrieval is done, the agent's ``tool_call`` /
+        ``tool_result`` progress and answer ``token`` events, then ``done`` with the
+        full answer. On ``reset`` the client drops the tokens received so far. The
+        session and caches are only written after the answer is complete, so an
+        abandoned stream leaves no partial turn behind.
+        """
+        start = time.perf_counter()
+        retrieval_context = RetrievalContext(filters=filters)
+        semantic_cache = self._semantic_cache if filters is None else None
+        query_vector: list[float] | None = None
+        try:
+            if semantic_cache is not None:
+                query_vector = self._retrieval_service.embed_query(
+                    query, context=retrieval_context
+                )
+                cached_response = self._semantic_lookup(semantic_cache, query_vector)
+                if cached_response is not None:
+                    yield from self._replay(
+                        session_id, query, cached_response, "semantic_cache", start
+                    )
+                    return
+
+            sources = self._retrieval_service.search(
+                query, context=retrieval_context, stage="chat", filters=filters
+            )
+            cache_key = self._build_cache_key(query=query,sources=sources)
+            history, cached_answer = self._prefetch(session_id, cache_key)
+            if cached_answer:
+                response = ChatResponse(answer=cached_answer, sources=sources)
+                yield from self._replay(session_id, query, response, "response_cache", start)
+                return
+
+            yield "sources", {"sources": [source.model_dump() for source in sources]}
+            answer = ""
+            first_token = True
+            # Whether the client holds streamed text since the last ``reset``.
+            streamed = False
+            for event, data in self._agent_service.stream(
+                query=query, history=history, retrieval_context=retrieval_context
+            ):
+                if event == "answer":
+                    answer = data["text"]
+                    continue
+                if event == "token":
+                    streamed = True
+                    if first_token:
+                        first_token = False
+                        CHAT_TIME_TO_FIRST_TOKEN.labels(source="agent").observe(
+                            time.perf_counter() - start
+                        )
+                elif event == "reset":
+                    streamed = False
+                yield event, data
+            if not streamed:
+                # Providers that do not stream still deliver the answer in one piece.
+                if first_token:
+                    CHAT_TIME_TO_FIRST_TOKEN.labels(source="agent").observe(
+                        time.perf_counter() - start
+                    )
+                yield "token", {"text": answer}
+        finally:
+            RETRIEVALS_PER_TURN.observe(retrieval_context.searches)
+
+        self._store(
+            cache_key, ChatResponse(answer=answer, sources=sources), semantic_cache, query_vector
+        )
+        self._remember(session_id, query, answer)
+        yield "done", {"answer": answer}
+
+    async def achat_stream(
+        self, session_id: str, query: str, filters: MetadataFilter | None = None
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Async ``chat_stream`` used by the API; yields the same events."""
+        start = time.perf_counter()
+        retrieval_context = RetrievalContext(filters=filters)
+        semantic_cache = self._semantic_cache if filters is None else None
+        query_vector: list[float] | None = None
+        try:
+            if semantic_cache is not None:
+                query_vector = await self._retrieval_service.aembed_query(
+                    query, context=retrieval_context
+                )
+                cached_response = await self._asemantic_lookup(semantic_cache, query_vector)
+                if cached_response is not None:
+                    async for item in self._areplay(
+                        session_id, query, cached_response, "semantic_cache", start
+                    ):
+                        yield item
+                    return
+
+            sources = await self._retrieval_service.asearch(
+                query, context=retrieval_context, stage="chat", filters=filters
+            )
+            cache_key = self._build_cache_key(query=query, sources=sources)
+            history, cached_answer = await self._aprefetch(session_id, cache_key)
+            if cached_answer:
+                response = ChatResponse(answer=cached_answer, sources=sources)
+                async for item in self._areplay(
+                    session_id, query, response, "response_cache", start
+                ):
+                    yield item
+                return
+
+            yield "sources", {"sources": [source.model_dump() for source in sources]}
+            answer = ""
+            first_token = True
+            # Whether the client holds streamed text since the last ``reset``.
+            streamed = False
+            async for event, data in self._agent_service.astream(
+                query=query, history=history, retrieval_context=retrieval_context
+            ):
+                if event == "answer":
+                    answer = data["text"]
+                    continue
+                if event == "token":
+                    streamed = True
+                    if first_token:
+                        first_token = False
+                        CHAT_TIME_TO_FIRST_TOKEN.labels(source="agent").observe(
+                            time.perf_counter() - start
+                        )
+                elif event == "reset":
+                    streamed = False
+                yield event, data
+            if not streamed:
+                if first_token:
+                    CHAT_TIME_TO_FIRST_TOKEN.labels(source="agent").observe(
+                        time.perf_counter() - start
+                    )
+                yield "token", {"text": answer}
+        finally:
+            RETRIEVALS_PER_TURN.observe(retrieval_context.searches)
+
+        await self._astore(
+            cache_key, ChatResponse(answer=answer, sources=sources), semantic_cache, query_vector
+        )
+        await self._aremember(session_id, query, answer)
+        yield "done", {"answer": answer}
+
+    def _replay(
+        self, session_id: str, query: str, response: ChatResponse, source: str, start: float
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        yield "sources", {"sources": [snippet.model_dump() for snippet in response.sources]}
+        CHAT_TIME_TO_FIRST_TOKEN.labels(source=source).observe(time.perf_counter() - start)
+        yield "token", {"text": response.answer}
+        self._remember(session_id, query, response.answer)
+        yield "done", {"answer": response.answer}
+
+    async def _areplay(
+        self, session_id: str, query: str, response: ChatResponse, source: str, start: float
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        yield "sources", {"sources": [snippet.model_dump() for snippet in response.sources]}
+        CHAT_TIME_TO_FIRST_TOKEN.labels(source=source).observe(time.perf_counter() - start)
+        yield "token", {"text": response.answer}
+        await self._aremember(session_id, query, response.answer)
+        yield "done", {"answer": response.answer}
+
+    def _semantic_lookup(
+        self, semantic_cache: SemanticCache, query_vector: list[float]
+    ) -> ChatResponse | None:
+        with instrument("cache.semantic_lookup") as span:
+            cached = semantic_cache.lookup(query_vector)
+            span.set("cache.hit", cached is not None)
+            return cached
+
+    async def _asemantic_lookup(
+        self, semantic_cache: SemanticCache, query_vector: list[float]
+    ) -> ChatResponse | None:
+        with instrument("cache.semantic_lookup") as span:
+            cached = await semantic_cache.alookup(query_vector)
+            span.set("cache.hit", cached is not None)
+            return cached
+
+    def _prefetch(self, session_id: str, cache_key: str) -> tuple[list[dict[str, str]], str | None]:
+        with instrument("session.prefetch") as span:
+            history, cached = self._session_store.prefetch(
+                session_id, self._response_cache, cache_key
+            )
+            span.set("cache.hit", cached is not None)
+            span.set("session.history_messages", len(history))
+            return history, cached
+
+    async def _aprefetch(
+        self, session_id: str, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        with instrument("session.prefetch") as span:
+            history, cached = await self._session_store.aprefetch(
+                session_id, self._response_cache, cache_key
+            )
+            span.set("cache.hit", cached is not None)
+            span.set("session.history_messages", len(history))
+            return history, cached
+
+    def _store(
+        self,
+        cache_key: str,
+        response: ChatResponse,
+        semantic_cache: SemanticCache | None,
+        query_vector: list[float] | None,
+    ) -> None:
+        with instrument("cache.store", {"cache.semantic": semantic_cache is not None}):
+            self._response_cache.set(cache_key, response.answer)
+            if semantic_cache is not None and query_vector is not None:
+                semantic_cache.store(query_vector, response)
+
+    async def _astore(
+        self,
+        cache_key: str,
+        response: ChatResponse,
+        semantic_cache: SemanticCache | None,
+        query_vector: list[float] | None,
+    ) -> None:
+        with instrument("cache.store", {"cache.semantic": semantic_cache is not None}):
+            await self._response_cache.aset(cache_key, response.answer)
+            if semantic_cache is not None and query_vector is not None:
+                await semantic_cache.astore(query_vector, response)
+
+    def _remember(self, session_id: str, query: str, answer: str) -> None:
+        with instrument("session.append"):
+            self._session_store.append_turn(session_id, query, answer)
+
+    async def _aremember(self, session_id: str, query: str, answer: str) -> None:
+        with instrument("session.append"):
+            await self._session_store.aappend_turn(session_id, query, answer)
+
+    @staticmethod
+    def _flight_key(cache_key: str, history: list[dict[str, str]]) -> str:
+        if not history:
+            # Fresh sessions, the common case for a burst of one popular question.
+            return cache_key
+        payload = json.dumps(history, separators=(",", ":"), sort_keys=True)
+        return f"{cache_key}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
     @staticmethod
     def _build_cache_key(query:str, sources:list) -> str:
-        source_ids = [f"{source.id}:{source.source:.6f}" for source in sources]
+        source_ids = [f"{source.id}:{source.score:.6f}" for source in sources]
         payload = f"{query.strip().lower()}|{'|'.join(source_ids)}"
-        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
\ No newline at end of file
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# A two-item tuple plus its share of the record; roles are interned and shared.
+_MESSAGE_OVERHEAD = sys.getsizeof(("user", ""))
+
+
+def _session_size(session: _Session) -> int:
+    size = sum(_MESSAGE_OVERHEAD + sys.getsizeof(content) for _, content in session.messages)
+    return size + (sys.getsizeof(session.summary) if session.summary else 0)
+
+
+def _turn(user: str, assistant: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+
+
+def _with_summary(summary: str | None, messages: list[dict[str, str]]) -> list[dict[str, str]]:
+    if not summary:
+        return messages
+    return [{"role": "summary", "content": summary}, *messages]
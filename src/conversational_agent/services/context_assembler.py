@@ -0,0 +1,182 @@
+import logging
+import re
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import SourceSnippet
+from conversational_agent.observability.metrics import CONTEXT_TOKENS, CONTEXT_TOKENS_SAVED
+from conversational_agent.utils.text import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# (a * x + b) mod p with a, b < 2**31 and 32-bit shingle hashes x fits in uint64.
+_MERSENNE_PRIME = (1 << 31) - 1
+# Shorter suffix/prefix matches are more likely coincidence than chunk overlap.
+_MIN_OVERLAP_CHARS = 16
+
+
+@dataclass(frozen=True)
+class AssembledContext:
+    text: str
+    snippets: list[SourceSnippet]
+    tokens_used: int
+    tokens_raw: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_raw - self.tokens_used)
+
+
+class ContextAssembler:
+    """Turns retrieved snippets into the retrieval tool's output under a token budget.
+
+    Consecutive chunks of one source are merged with their shared overlap removed,
+    near-duplicates are dropped by MinHash-estimated Jaccard similarity of word
+    shingles, and the rest are packed by score until ``CONTEXT_TOKEN_BUDGET``
+    tokens are used. ``tokens_raw`` is what joining every snippet verbatim would
+    have cost.
+    """
+
+    def __init__(
+        self, settings: Settings, token_counter: Callable[[str], int] | None = None
+    ) -> None:
+        self._budget = settings.context_token_budget
+        self._max_overlap = settings.chunk_overlap
+        self._dedup_threshold = settings.context_dedup_threshold
+        self._shingle_size = settings.context_shingle_size
+        self._count = token_counter or partial(
+            count_tokens, encoding_name=settings.chunk_encoding
+        )
+        rng = np.random.default_rng(0)
+        permutations = settings.context_minhash_permutations
+        self._hash_a = rng.integers(1, _MERSENNE_PRIME, size=permutations, dtype=np.uint64)
+        self._hash_b = rng.integers(0, _MERSENNE_PRIME, size=permutations, dtype=np.uint64)
+
+    def assemble(self, sources: list[SourceSnippet]) -> AssembledContext:
+        tokens_raw = self._count("\n\n".join(format_snippet(source) for source in sources))
+        snippets = self._deduplicate(self._merge_adjacent(sources))
+
+        packed: list[SourceSnippet] = []
+        lines: list[str] = []
+        used = 0
+        for snippet in sorted(snippets, key=lambda item: item.score, reverse=True):
+            line = format_snippet(snippet)
+            cost = self._count(line) + (2 if lines else 0)
+            if used + cost > self._budget:
+                if lines:
+                    continue
+                # Never hand the model an empty context because the best
+                # snippet alone is over budget; cut it down instead.
+                line = self._truncate(line)
+                cost = self._count(line)
+            packed.append(snippet)
+            lines.append(line)
+            used += cost
+
+        context = AssembledContext(
+            text="\n\n".join(lines), snippets=packed, tokens_used=used, tokens_raw=tokens_raw
+        )
+        CONTEXT_TOKENS.observe(context.tokens_used)
+        CONTEXT_TOKENS_SAVED.inc(context.tokens_saved)
+        logger.debug(
+            "assembled context snippets=%d/%d tokens=%d saved=%d",
+            len(packed),
+            len(sources),
+            context.tokens_used,
+            context.tokens_saved,
+        )
+        return context
+
+    def _truncate(self, line: str) -> str:
+        while line:
+            cost = self._count(line)
+            if cost <= self._budget:
+                return line
+            line = line[: int(len(line) * self._budget / cost * 0.95)]
+        return line
+
+    def _merge_adjacent(self, sources: list[SourceSnippet]) -> list[SourceSnippet]:
+        located = [source for source in sources if _position(source) is not None]
+        merged = [source for source in sources if _position(source) is None]
+        located.sort(key=_position)  # type: ignore[arg-type, return-value]
+
+        run: SourceSnippet | None = None
+        last_index = -1
+        for source in located:
+            source_id, chunk_index = _position(source)  # type: ignore[misc]
+            if (
+                run is not None
+                and run.metadata.get("source_id") == source_id
+                and chunk_index == last_index + 1
+            ):
+                run = run.model_copy(
+                    update={
+                        "text": _join_overlapping(run.text, source.text, self._max_overlap),
+                        "score": max(run.score, source.score),
+                        "metadata": {**run.metadata, "chunk_end": chunk_index},
+                    }
+                )
+            else:
+                if run is not None:
+                    merged.append(run)
+                run = source
+            last_index = chunk_index
+        if run is not None:
+            merged.append(run)
+        return merged
+
+    def _deduplicate(self, snippets: list[SourceSnippet]) -> list[SourceSnippet]:
+        ranked = sorted(snippets, key=lambda item: item.score, reverse=True)
+        kept: list[SourceSnippet] = []
+        signatures: list[np.ndarray] = []
+        for snippet in ranked:
+            signature = self._minhash(snippet.text)
+            if any(
+                float(np.mean(signature == other)) >= self._dedup_threshold
+                for other in signatures
+            ):
+                continue
+            kept.append(snippet)
+            signatures.append(signature)
+        return kept
+
+    def _minhash(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        size = self._shingle_size
+        shingles = {" ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = self._hash_a[:, None] * hashes[None, :] + self._hash_b[:, None]
+        return (permuted % _MERSENNE_PRIME).min(axis=1)
+
+
+def format_snippet(source: SourceSnippet) -> str:
+    source_id = source.metadata.get("source_id", "unknown")
+    return f"[source={source_id} score={source.score:.4f}] {source.text}"
+
+
+def _position(source: SourceSnippet) -> tuple[str, int] | None:
+    source_id = source.metadata.get("source_id")
+    chunk_index = source.metadata.get("chunk_index")
+    if source_id is None or not isinstance(chunk_index, int):
+        return None
+    return str(source_id), chunk_index
+
+
+def _join_overlapping(first: str, second: str, max_overlap: int) -> str:
+    # The next chunk repeats up to CHUNK_OVERLAP characters of the previous one
+    # (shifted to a word boundary), so look for the longest such shared span.
+    longest = min(len(first), len(second), max_overlap + max_overlap // 2)
+    for size in range(longest, max(min(_MIN_OVERLAP_CHARS, max_overlap), 1) - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first}\n{second}"
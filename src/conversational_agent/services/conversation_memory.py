@@ -0,0 +1,168 @@
+import logging
+import threading
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Protocol
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.llm import build_chat_model
+from conversational_agent.services.chat_service import ResponseCache, SessionStore
+from conversational_agent.utils.text import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Folds for one session must not interleave (each rewrites the summary the
+# previous one produced); striping bounds the lock count for any number of sessions.
+_LOCK_STRIPES = 64
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an "
+    "enterprise assistant. Merge the new messages into the existing summary. Keep "
+    "facts, decisions, names and open questions the assistant may need later; drop "
+    "pleasantries. Reply with the updated summary only, in at most {words} words."
+)
+
+
+class Summarizer(Protocol):
+    def summarize(self, summary: str | None, messages: list[dict[str, str]]) -> str:
+        ...
+
+
+class ConversationSummarizer(Summarizer):
+    def __init__(self, settings: Settings, llm: Any | None = None) -> None:
+        self._llm = llm or build_chat_model(settings)
+        self._prompt = SUMMARY_PROMPT.format(words=settings.session_summary_max_words)
+
+    def summarize(self, summary: str | None, messages: list[dict[str, str]]) -> str:
+        transcript = "\n".join(f"{item['role']}: {item['content']}" for item in messages)
+        result = self._llm.invoke(
+            [
+                SystemMessage(content=self._prompt),
+                HumanMessage(
+                    content=(
+                        f"Existing summary:\n{summary or '(none)'}\n\n"
+                        f"New messages:\n{transcript}"
+                    )
+                ),
+            ]
+        )
+        return str(result.content).strip()
+
+
+class ConversationMemory(SessionStore):
+    """Bounded prompt history on top of a ``SessionStore``.
+
+    The store keeps the last ``SESSION_MAX_TURNS`` turns verbatim. Messages it
+    evicts are folded into a rolling per-session summary by a background pool,
+    off the request path. ``get`` returns the summary plus the newest messages
+    that fit in ``SESSION_HISTORY_TOKEN_BUDGET`` tokens.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        store: SessionStore,
+        summarizer: Summarizer | None = None,
+        token_counter: Callable[[str], int] | None = None,
+    ) -> None:
+        self._store = store
+        self._summarizer = summarizer
+        self._budget = settings.session_history_token_budget
+        self._count = token_counter or partial(
+            count_tokens, encoding_name=settings.chunk_encoding
+        )
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._executor: ThreadPoolExecutor | None = None
+        if summarizer is not None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.session_summary_workers),
+                thread_name_prefix="session-summary",
+            )
+
+    def get(self, session_id: str) -> list[dict[str, str]]:
+        return self._window(self._store.get(session_id))
+
+    def append(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        self._fold_later(session_id, self._store.append(session_id, role, content))
+        return []
+
+    def append_turn(self, session_id: str, user: str, assistant: str) -> list[dict[str, str]]:
+        self._fold_later(session_id, self._store.append_turn(session_id, user, assistant))
+        return []
+
+    def prefetch(
+        self, session_id: str, cache: ResponseCache, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        history, cached = self._store.prefetch(session_id, cache, cache_key)
+        return self._window(history), cached
+
+    async def aget(self, session_id: str) -> list[dict[str, str]]:
+        return self._window(await self._store.aget(session_id))
+
+    async def aappend(self, session_id: str, role: str, content: str) -> list[dict[str, str]]:
+        self._fold_later(session_id, await self._store.aappend(session_id, role, content))
+        return []
+
+    async def aappend_turn(
+        self, session_id: str, user: str, assistant: str
+    ) -> list[dict[str, str]]:
+        evicted = await self._store.aappend_turn(session_id, user, assistant)
+        self._fold_later(session_id, evicted)
+        return []
+
+    async def aprefetch(
+        self, session_id: str, cache: ResponseCache, cache_key: str
+    ) -> tuple[list[dict[str, str]], str | None]:
+        history, cached = await self._store.aprefetch(session_id, cache, cache_key)
+        return self._window(history), cached
+
+    def set_summary(self, session_id: str, summary: str) -> None:
+        self._store.set_summary(session_id, summary)
+
+    def close(self) -> None:
+        """Waits for queued summaries so shutdown does not drop evicted turns."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _window(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        summary = [item for item in history if item["role"] == "summary"]
+        messages = [item for item in history if item["role"] != "summary"]
+        remaining = self._budget - sum(self._count(item["content"]) for item in summary)
+        # Trim whole turns so the window never opens on a reply without its question.
+        turns: list[list[dict[str, str]]] = []
+        for item in messages:
+            if item["role"] == "user" or not turns:
+                turns.append([])
+            turns[-1].append(item)
+        kept: list[dict[str, str]] = []
+        for turn in reversed(turns):
+            remaining -= sum(self._count(item["content"]) for item in turn)
+            if remaining < 0:
+                break
+            kept[:0] = turn
+        return summary + kept
+
+    def _fold_later(self, session_id: str, evicted: list[dict[str, str]]) -> None:
+        if evicted and self._executor is not None:
+            self._executor.submit(self._fold, session_id, evicted)
+
+    def _fold(self, session_id: str, evicted: list[dict[str, str]]) -> None:
+        lock = self._locks[zlib.crc32(session_id.encode("utf-8")) % _LOCK_STRIPES]
+        with lock:
+            try:
+                history = self._store.get(session_id)
+                current = next(
+                    (item["content"] for item in history if item["role"] == "summary"), None
+                )
+                summary = self._summarizer.summarize(current, evicted)  # type: ignore[union-attr]
+                self._store.set_summary(session_id, summary)
+            except Exception:
+                # The turns are already trimmed; losing them from the summary is
+                # better than failing a request that has long since returned.
+                logger.exception(
+                    "summarizing %d messages of session %s failed", len(evicted), session_id
+                )
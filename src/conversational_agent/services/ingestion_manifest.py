@@ -0,0 +1,37 @@
+import json
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+
+class ChunkManifestStore:
+    """Per-source record of the vector ids written by the last ingestion.
+
+    Each manifest maps a deterministic chunk id to its ``chunk_index`` so a
+    re-ingest can tell new, moved and vanished chunks apart without asking the
+    vector store.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = Path(directory)
+
+    def load(self, source_id: str) -> dict[str, int]:
+        path = self._path(source_id)
+        if not path.exists():
+            return {}
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        chunks = payload.get("chunks", {}) if isinstance(payload, dict) else {}
+        return {str(vector_id): int(index) for vector_id, index in chunks.items()}
+
+    def save(self, source_id: str, chunks: dict[str, int]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(source_id)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"source_id": source_id, "chunks": chunks}), encoding="utf-8"
+        )
+        # Atomic replace: a crash never leaves a half-written manifest behind.
+        os.replace(tmp_path, path)
+
+    def _path(self, source_id: str) -> Path:
+        return self._directory / f"{quote(source_id, safe='')}.json"
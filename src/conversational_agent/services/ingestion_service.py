@@ -1,12 +1,24 @@
+import hashlib
+import logging
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from itertools import chain
 from pathlib import Path
-from uuid import uuid4
+from typing import Any
 
 from pypdf import PdfReader
 
 from conversational_agent.core.config import Settings
 from conversational_agent.infrastructure.embeddings import EmbeddingClient
+from conversational_agent.infrastructure.lexical_index import LexicalIndex
 from conversational_agent.infrastructure.vector_store import VectorStore
-from conversational_agent.utils.text import chunk_text
+from conversational_agent.observability.metrics import INGESTED_CHUNKS
+from conversational_agent.services.ingestion_manifest import ChunkManifestStore
+from conversational_agent.services.semantic_chunker import SemanticChunker
+from conversational_agent.utils.pipeline import batched, prefetch
+from conversational_agent.utils.text import chunk_text, overlap_tail
+
+logger = logging.getLogger(__name__)
 
 class IngestionService:
     def __init__(
@@ -14,47 +26,159 @@ class IngestionService:
             settings:Settings,
             embeddings:EmbeddingClient,
             vector_store:VectorStore,
+            manifests:ChunkManifestStore | None = None,
+            lexical_index:LexicalIndex | None = None,
     ) -> None:
         self._settings = settings
         self._embeddings = embeddings
-        self._vectorstore = vector_store
+        self._vector_store = vector_store
+        self._manifests = manifests or ChunkManifestStore(settings.ingest_manifest_dir)
+        self._lexical_index = lexical_index
+        self._semantic_chunker = (
+            SemanticChunker(settings, embeddings) if settings.chunk_mode == "semantic" else None
+        )
 
     def ingest_pdf(self,pdf_path: str, source_id:str | None = None) -> tuple[str, int]:
         path = Path(pdf_path)
-        if not path.exists() path.suffix.lower() != ".pdf":
-           raise ValueError(f"Invalid PDF path: {pdf_path}")   
+        if not path.exists() or path.suffix.lower() != ".pdf":
+           raise ValueError(f"Invalid PDF path: {pdf_path}")
 
         reader = PdfReader(str(path))
-        pages = [page.extract_text() or "" for page in reader.pages ]
-        full_text = '\n'.join(pages).strip()
-        if not full_text:
+        pages = (page.extract_text() or "" for page in reader.pages)
+        resolved_source_id = source_id or path.stem
+
+        count = self.ingest_pages(pages, resolved_source_id, str(path))
+        if count == 0:
             raise ValueError("PDF contains no extractable text")
+        return resolved_source_id, count
+
+    def ingest_pages(self, pages: Iterable[str], source_id: str, path: str) -> int:
+        """Stream pages -> chunks -> embedding batches -> upsert batches.
+
+        Extraction and chunking run on one background thread and embedding on
+        another, each handing results over through a small bounded queue, so
+        peak memory follows the batch sizes rather than the document size.
+
+        Chunk ids are derived from chunk content, so only chunks missing from the
+        source's previous manifest are embedded; moved chunks get their
+        ``chunk_index`` updated and vanished ones are deleted. Returns the number
+        of chunks the document now has. The lexical index, when configured,
+        receives the same writes as the vector store.
+        """
+        queue_size = self._settings.ingest_queue_size
+        embed_batch_size = self._settings.ingest_embed_batch_size
+        previous = self._manifests.load(source_id)
+        current: dict[str, int] = {}
+        moved: list[tuple[str, dict[str, Any]]] = []
+
+        def _changed_chunks() -> Iterator[tuple[int, str, str]]:
+            identified = self._iter_identified_chunks(pages, source_id)
+            for idx, (vector_id, text) in enumerate(identified):
+                current[vector_id] = idx
+                previous_idx = previous.get(vector_id)
+                if previous_idx is None:
+                    yield idx, vector_id, text
+                elif previous_idx != idx:
+                    moved.append((vector_id, {"chunk_index": idx}))
 
-        chunks = chunk_text(
-            full_text,
-            chunk_size=self._settings.chunk_size,
-            chunk_overlap=self._settings.chunk_overlap,
+        chunks = prefetch(_changed_chunks(), maxsize=queue_size * embed_batch_size)
+        chunk_batches = batched(chunks, embed_batch_size)
+        embedded = prefetch(
+            (self._build_records(batch, source_id, path) for batch in chunk_batches),
+            maxsize=queue_size,
         )
-        if not chunks:
-            raise ValueError("No chunks generated from PDF")
 
-        embeddings = self._embeddings.embed_documents(chunks)
-        resolved_source_id = source_id or path.stem
+        upserted = 0
+        for upsert_batch in batched(
+            chain.from_iterable(embedded), self._settings.ingest_upsert_batch_size
+        ):
+            self._vector_store.upsert(upsert_batch)
+            if self._lexical_index is not None:
+                self._lexical_index.add(upsert_batch)
+            upserted += len(upsert_batch)
+        if not current:
+            return 0
+
+        self._vector_store.update_metadata(moved)
+        # Vanished chunks are removed only after their replacements are written.
+        deleted = [vector_id for vector_id in previous if vector_id not in current]
+        self._vector_store.delete(deleted)
+        if self._lexical_index is not None:
+            self._lexical_index.update_metadata(moved)
+            self._lexical_index.delete(deleted)
+        self._manifests.save(source_id, current)
+
+        INGESTED_CHUNKS.labels(outcome="new").inc(upserted)
+        INGESTED_CHUNKS.labels(outcome="moved").inc(len(moved))
+        INGESTED_CHUNKS.labels(outcome="unchanged").inc(len(current) - upserted - len(moved))
+        INGESTED_CHUNKS.labels(outcome="deleted").inc(len(deleted))
+        logger.info(
+            "ingested source_id=%s chunks=%d new=%d moved=%d deleted=%d",
+            source_id,
+            len(current),
+            upserted,
+            len(moved),
+            len(deleted),
+        )
+        return len(current)
+
+    def _iter_identified_chunks(
+        self, pages: Iterable[str], source_id: str
+    ) -> Iterator[tuple[str, str]]:
+        occurrences: Counter[str] = Counter()
+        for text in self._iter_chunks(pages):
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            # Repeated boilerplate (headers, disclaimers) still needs distinct ids.
+            occurrence = occurrences[digest]
+            occurrences[digest] += 1
+            if occurrence:
+                digest = hashlib.sha256(f"{digest}:{occurrence}".encode("utf-8")).hexdigest()
+            yield f"{source_id}-{digest[:32]}", text
+
+    def _iter_chunks(self, pages: Iterable[str]) -> Iterator[str]:
+        # Pages are chunked independently, each prefixed with the tail of the
+        # previous page so the overlap still spans page boundaries. Keeping chunk
+        # boundaries page-local means an edit only changes the chunks of the pages
+        # it touches, which is what makes incremental re-ingestion cheap.
+        tail = ""
+        for page in pages:
+            if not page.strip():
+                continue
+            text = f"{tail}\n{page}" if tail else page.lstrip()
+            if self._semantic_chunker is not None:
+                yield from self._semantic_chunker.chunk(text)
+            else:
+                yield from chunk_text(
+                    text,
+                    chunk_size=self._settings.chunk_size,
+                    chunk_overlap=self._settings.chunk_overlap,
+                    mode=self._settings.chunk_mode,
+                    encoding_name=self._settings.chunk_encoding,
+                )
+            # Measured like the chunks themselves; semantic chunks are sized in characters.
+            tail = overlap_tail(
+                page,
+                self._settings.chunk_overlap,
+                mode="tokens" if self._settings.chunk_mode == "tokens" else "chars",
+                encoding_name=self._settings.chunk_encoding,
+            )
 
-        payload = []
-        for idx, (text, vector) in enumerate(zip(chunks, embeddings, strict=True)):
-            vector_id = f"{resolved_source_id}-{idx}-{uuid4().hex[:8]}"
-            payload.append(
+    def _build_records(
+        self, batch: list[tuple[int, str, str]], source_id: str, path: str
+    ) -> list[dict[str, Any]]:
+        vectors = self._embeddings.embed_documents([text for _, _, text in batch])
+        records = []
+        for (idx, vector_id, text), vector in zip(batch, vectors, strict=True):
+            records.append(
                 {
                     "id": vector_id,
                     "values":vector,
                     "metadata":{
-                        "source_id":resolved_source_id,
+                        "source_id":source_id,
                         "chunk_index":idx,
                         "text":text,
-                        "path":str(path),
+                        "path":path,
                     }
                 }
             )
-        self._vector_store.upsert(payload)
-        return resolved_source_id, len(payload)
+        return records
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Protocol
+
+import numpy as np
+
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import SourceSnippet
+from conversational_agent.observability.metrics import (
+    RERANK_CACHE_LOOKUPS,
+    RERANK_CANDIDATES,
+    RERANK_DECISIONS,
+    RERANK_LATENCY,
+)
+
+
+class PairScorer(Protocol):
+    def predict(self, sentences: list[tuple[str, str]], batch_size: int) -> list[float]:
+        ...
+
+
+@dataclass(frozen=True)
+class RerankStats:
+    reranked: int
+    skipped: int
+    cache_hits: int
+    cache_misses: int
+    p50_ms: float
+    p99_ms: float
+
+
+class Reranker:
+    """Re-scores first-stage candidates with a cross-encoder running on CPU.
+
+    The candidate depth adapts to the first-stage scores: candidates are kept
+    while their min-max normalized score is within ``RERANK_SCORE_WINDOW`` of the
+    best one. A confident query, whose scores fall off sharply after the first
+    few hits, keeps no more than ``top_k`` candidates and skips the model; a flat
+    distribution sends up to ``RERANK_MAX_CANDIDATES`` through it. Scores are
+    cached per (query hash, chunk id).
+    """
+
+    _LATENCY_WINDOW = 1024
+
+    def __init__(self, settings: Settings, model: PairScorer | None = None) -> None:
+        self._max_candidates = max(1, settings.rerank_max_candidates)
+        self._window = settings.rerank_score_window
+        self._batch_size = max(1, settings.rerank_batch_size)
+        self._cache_max_entries = settings.rerank_cache_max_entries
+        self._cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=self._LATENCY_WINDOW)
+        self._reranked = 0
+        self._skipped = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        if model is None:
+            from sentence_transformers import CrossEncoder
+
+            model = CrossEncoder(settings.rerank_model, device="cpu")
+        self._model = model
+
+    @property
+    def max_candidates(self) -> int:
+        return self._max_candidates
+
+    def rerank(self, query: str, sources: list[SourceSnippet], top_k: int) -> list[SourceSnippet]:
+        start = time.perf_counter()
+        candidates = self._adaptive_candidates(sources, top_k)
+        RERANK_CANDIDATES.observe(len(candidates))
+        if len(candidates) <= top_k:
+            RERANK_DECISIONS.labels(outcome="skipped").inc()
+            with self._lock:
+                self._skipped += 1
+            return candidates
+
+        scores = self._scores(query, candidates)
+        order = np.argsort(-np.asarray(scores), kind="stable")[:top_k]
+        reranked = [
+            candidates[idx].model_copy(update={"score": float(scores[idx])}) for idx in order
+        ]
+
+        elapsed = time.perf_counter() - start
+        RERANK_LATENCY.observe(elapsed)
+        RERANK_DECISIONS.labels(outcome="reranked").inc()
+        with self._lock:
+            self._reranked += 1
+            self._latencies.append(elapsed)
+        return reranked
+
+    def stats(self) -> RerankStats:
+        with self._lock:
+            latencies = np.asarray(self._latencies) * 1000
+            p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size else (0.0, 0.0)
+            return RerankStats(
+                reranked=self._reranked,
+                skipped=self._skipped,
+                cache_hits=self._cache_hits,
+                cache_misses=self._cache_misses,
+                p50_ms=float(p50),
+                p99_ms=float(p99),
+            )
+
+    def _adaptive_candidates(
+        self, sources: list[SourceSnippet], top_k: int
+    ) -> list[SourceSnippet]:
+        ranked = sorted(sources, key=lambda source: source.score, reverse=True)
+        ranked = ranked[: self._max_candidates]
+        if len(ranked) <= top_k:
+            return ranked
+        best, worst = ranked[0].score, ranked[-1].score
+        if best == worst:
+            return ranked
+        cutoff = best - self._window * (best - worst)
+        depth = sum(1 for source in ranked if source.score >= cutoff)
+        return ranked[: max(depth, top_k)]
+
+    def _scores(self, query: str, candidates: list[SourceSnippet]) -> list[float]:
+        query_hash = hashlib.sha256(" ".join(query.lower().split()).encode("utf-8")).hexdigest()
+        keys = [(query_hash[:32], candidate.id) for candidate in candidates]
+        scores: list[float | None] = []
+        with self._lock:
+            for key in keys:
+                score = self._cache.get(key)
+                if score is not None:
+                    self._cache.move_to_end(key)
+                scores.append(score)
+
+        missing = [idx for idx, score in enumerate(scores) if score is None]
+        hits = len(keys) - len(missing)
+        RERANK_CACHE_LOOKUPS.labels(result="hit").inc(hits)
+        RERANK_CACHE_LOOKUPS.labels(result="miss").inc(len(missing))
+        if missing:
+            pairs = [(query, candidates[idx].text) for idx in missing]
+            predicted = self._model.predict(pairs, batch_size=self._batch_size)
+            with self._lock:
+                for idx, score in zip(missing, predicted, strict=True):
+                    scores[idx] = float(score)
+                    self._cache[keys[idx]] = float(score)
+                while len(self._cache) > self._cache_max_entries:
+                    self._cache.popitem(last=False)
+        with self._lock:
+            self._cache_hits += hits
+            self._cache_misses += len(missing)
+        return [float(score) for score in scores]  # type: ignore[arg-type]
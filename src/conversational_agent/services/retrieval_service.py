@@ -1,7 +1,44 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 from conversational_agent.core.config import Settings
 from conversational_agent.domain.schemas import SourceSnippet
 from conversational_agent.infrastructure.embeddings import EmbeddingClient
-from conversational_agent.infrastructure.vector_store import VectorStore
+from conversational_agent.infrastructure.lexical_index import LexicalIndex
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+from conversational_agent.infrastructure.vector_store import VectorMatch, VectorStore
+from conversational_agent.observability.instrumentation import instrument
+from conversational_agent.observability.metrics import (
+    HYBRID_RESULTS,
+    RETRIEVAL_LEG_LATENCY,
+    RETRIEVAL_REQUESTS,
+)
+from conversational_agent.services.reranker import Reranker
+
+
+@dataclass
+class RetrievalContext:
+    """Retrieval results shared by everything that serves one chat turn.
+
+    ``filters`` is the metadata scope of the turn; the agent tool searches within
+    it so a tenant's turn never reaches another tenant's chunks.
+    """
+
+    results: dict[str, list[SourceSnippet]] = field(default_factory=dict)
+    query_vectors: dict[str, list[float]] = field(default_factory=dict)
+    searches: int = 0
+    filters: MetadataFilter | None = None
+
+    def get(
+        self, query: str, filters: MetadataFilter | None = None
+    ) -> list[SourceSnippet] | None:
+        return self.results.get(_result_key(query, filters))
+
+    def put(
+        self, query: str, sources: list[SourceSnippet], filters: MetadataFilter | None = None
+    ) -> None:
+        self.results[_result_key(query, filters)] = sources
 
 
 class RetrievalService:
@@ -10,25 +47,287 @@ class RetrievalService:
         settings: Settings,
         embeddings: EmbeddingClient,
         vector_store: VectorStore,
+        lexical_index: LexicalIndex | None = None,
+        reranker: Reranker | None = None,
     ) -> None:
         self._settings = settings
         self._embeddings = embeddings
         self._vector_store = vector_store
+        self._lexical_index = lexical_index
+        self._reranker = reranker
+        self._lexical_executor: ThreadPoolExecutor | None = None
+        if settings.retrieval_mode == "hybrid":
+            if lexical_index is None:
+                raise ValueError("RETRIEVAL_MODE=hybrid needs LEXICAL_INDEX_ENABLED=true")
+            self._lexical_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.lexical_max_concurrency),
+                thread_name_prefix="lexical-search",
+            )
+        elif settings.retrieval_mode != "vector":
+            raise ValueError(f"Unknown retrieval mode: {settings.retrieval_mode!r}")
 
-    def search(self, query: str) -> list[SourceSnippet]:
-        query_vector = self._embeddings.embed_query(query)
-        matches = self._vector_store.query(query_vector, top_k=self._settings.top_k)
-
-        sources: list[SourceSnippet] = []
-        for match in matches:
-            metadata = dict(match.metadata or {})
-            text = str(metadata.get("text", ""))
-            sources.append(
-                SourceSnippet(
-                    id=str(match.id),
-                    score=float(match.score or 0.0),
-                    metadata=metadata,
-                    text=text,
-                )
+    def embed_query(self, query: str, context: RetrievalContext | None = None) -> list[float]:
+        if context is not None:
+            vector = context.query_vectors.get(_normalize_query(query))
+            if vector is not None:
+                return vector
+        vector = self._embeddings.embed_query(query)
+        if context is not None:
+            context.query_vectors[_normalize_query(query)] = vector
+        return vector
+
+    async def aembed_query(
+        self, query: str, context: RetrievalContext | None = None
+    ) -> list[float]:
+        if context is not None:
+            vector = context.query_vectors.get(_normalize_query(query))
+            if vector is not None:
+                return vector
+        vector = await self._embeddings.aembed_query(query)
+        if context is not None:
+            context.query_vectors[_normalize_query(query)] = vector
+        return vector
+
+    def search(
+        self,
+        query: str,
+        context: RetrievalContext | None = None,
+        stage: str = "direct",
+        filters: MetadataFilter | None = None,
+    ) -> list[SourceSnippet]:
+        with instrument("retrieval.search", self._span_attributes(stage, filters)) as span:
+            sources = self._search(query, context, stage, filters)
+            span.set("retrieval.results", len(sources))
+            return sources
+
+    def _search(
+        self,
+        query: str,
+        context: RetrievalContext | None,
+        stage: str,
+        filters: MetadataFilter | None,
+    ) -> list[SourceSnippet]:
+        if context is not None:
+            cached = context.get(query, filters)
+            if cached is not None:
+                RETRIEVAL_REQUESTS.labels(stage=stage, outcome="reused").inc()
+                return list(cached)
+
+        candidates = self._candidate_count()
+        if self._lexical_executor is None:
+            query_vector = self.embed_query(query, context=context)
+            matches = self._vector_store.query(query_vector, top_k=candidates, filters=filters)
+        else:
+            # The lexical leg runs on the pool while this thread embeds and
+            # queries the vector leg.
+            depth = max(candidates, self._settings.hybrid_candidates)
+            lexical = self._lexical_executor.submit(self._lexical_search, query, depth, filters)
+            with RETRIEVAL_LEG_LATENCY.labels(leg="vector").time():
+                query_vector = self.embed_query(query, context=context)
+                dense = self._vector_store.query(query_vector, top_k=depth, filters=filters)
+            matches = self._fuse(dense, lexical.result(), candidates)
+        RETRIEVAL_REQUESTS.labels(stage=stage, outcome="executed").inc()
+
+        sources = self._finalize(query, matches)
+        if context is not None:
+            context.searches += 1
+            context.put(query, sources, filters)
+        return sources
+
+    async def asearch(
+        self,
+        query: str,
+        context: RetrievalContext | None = None,
+        stage: str = "direct",
+        filters: MetadataFilter | None = None,
+    ) -> list[SourceSnippet]:
+        """Async ``search``; in hybrid mode both legs are awaited concurrently."""
+        with instrument("retrieval.search", self._span_attributes(stage, filters)) as span:
+            sources = await self._asearch(query, context, stage, filters)
+            span.set("retrieval.results", len(sources))
+            return sources
+
+    async def _asearch(
+        self,
+        query: str,
+        context: RetrievalContext | None,
+        stage: str,
+        filters: MetadataFilter | None,
+    ) -> list[SourceSnippet]:
+        if context is not None:
+            cached = context.get(query, filters)
+            if cached is not None:
+                RETRIEVAL_REQUESTS.labels(stage=stage, outcome="reused").inc()
+                return list(cached)
+
+        candidates = self._candidate_count()
+        if self._lexical_executor is None:
+            query_vector = await self.aembed_query(query, context=context)
+            matches = await self._vector_store.aquery(
+                query_vector, top_k=candidates, filters=filters
             )
+        else:
+            depth = max(candidates, self._settings.hybrid_candidates)
+            lexical = asyncio.get_running_loop().run_in_executor(
+                self._lexical_executor, self._lexical_search, query, depth, filters
+            )
+            with RETRIEVAL_LEG_LATENCY.labels(leg="vector").time():
+                query_vector = await self.aembed_query(query, context=context)
+                dense = await self._vector_store.aquery(query_vector, top_k=depth, filters=filters)
+            matches = self._fuse(dense, await lexical, candidates)
+        RETRIEVAL_REQUESTS.labels(stage=stage, outcome="executed").inc()
+
+        if self._reranker is None:
+            sources = self._finalize(query, matches)
+        else:
+            # The cross-encoder is CPU-bound; keep it off the event loop.
+            sources = await asyncio.to_thread(self._finalize, query, matches)
+        if context is not None:
+            context.searches += 1
+            context.put(query, sources, filters)
         return sources
+
+    def search_many(
+        self,
+        queries: list[str],
+        context: RetrievalContext | None = None,
+        stage: str = "direct",
+        filters: MetadataFilter | None = None,
+    ) -> list[list[SourceSnippet]]:
+        """Search several queries with one embedding batch and one batched vector query.
+
+        Results are returned in the order of ``queries``. Queries already answered
+        in ``context``, and duplicates within the batch, are only searched once.
+        """
+        attributes = self._span_attributes(stage, filters)
+        attributes["retrieval.queries"] = len(queries)
+        with instrument("retrieval.search_many", attributes):
+            return self._search_many(queries, context, stage, filters)
+
+    def _search_many(
+        self,
+        queries: list[str],
+        context: RetrievalContext | None,
+        stage: str,
+        filters: MetadataFilter | None,
+    ) -> list[list[SourceSnippet]]:
+        context = context if context is not None else RetrievalContext()
+        pending: dict[str, str] = {}
+        for query in queries:
+            key = _result_key(query, filters)
+            if key in context.results:
+                RETRIEVAL_REQUESTS.labels(stage=stage, outcome="reused").inc()
+            else:
+                pending.setdefault(key, query)
+
+        if pending:
+            candidates = self._candidate_count()
+            depth = candidates
+            lexical = None
+            if self._lexical_executor is not None:
+                depth = max(depth, self._settings.hybrid_candidates)
+                lexical = [
+                    self._lexical_executor.submit(self._lexical_search, query, depth, filters)
+                    for query in pending.values()
+                ]
+            with RETRIEVAL_LEG_LATENCY.labels(leg="vector").time():
+                missing = {
+                    _normalize_query(query): query
+                    for query in pending.values()
+                    if _normalize_query(query) not in context.query_vectors
+                }
+                if missing:
+                    vectors = self._embeddings.embed_queries(list(missing.values()))
+                    context.query_vectors.update(zip(missing, vectors, strict=True))
+                batches = self._vector_store.query_many(
+                    [context.query_vectors[_normalize_query(query)] for query in pending.values()],
+                    top_k=depth,
+                    filters=filters,
+                )
+            if lexical is not None:
+                batches = [
+                    self._fuse(dense, future.result(), candidates)
+                    for dense, future in zip(batches, lexical, strict=True)
+                ]
+            RETRIEVAL_REQUESTS.labels(stage=stage, outcome="executed").inc(len(pending))
+            for (key, query), matches in zip(pending.items(), batches, strict=True):
+                context.results[key] = self._finalize(query, matches)
+            context.searches += len(pending)
+
+        return [list(context.results[_result_key(query, filters)]) for query in queries]
+
+    def _span_attributes(self, stage: str, filters: MetadataFilter | None) -> dict[str, object]:
+        return {
+            "retrieval.stage": stage,
+            "retrieval.mode": self._settings.retrieval_mode,
+            "retrieval.top_k": self._settings.top_k,
+            "retrieval.filtered": filters is not None,
+        }
+
+    def _candidate_count(self) -> int:
+        if self._reranker is None:
+            return self._settings.top_k
+        return max(self._settings.top_k, self._reranker.max_candidates)
+
+    def _finalize(self, query: str, matches: list[VectorMatch]) -> list[SourceSnippet]:
+        sources = _to_sources(matches)
+        if self._reranker is None:
+            return sources
+        return self._reranker.rerank(query, sources, self._settings.top_k)
+
+    def _lexical_search(
+        self, query: str, depth: int, filters: MetadataFilter | None = None
+    ) -> list[VectorMatch]:
+        if self._lexical_index is None:
+            return []
+        with RETRIEVAL_LEG_LATENCY.labels(leg="lexical").time():
+            return self._lexical_index.search(query, depth, filters)
+
+    def _fuse(
+        self, dense: list[VectorMatch], lexical: list[VectorMatch], limit: int
+    ) -> list[VectorMatch]:
+        """Reciprocal rank fusion: score = sum over legs of 1 / (k + rank)."""
+        k = self._settings.hybrid_rrf_k
+        scores: dict[str, float] = {}
+        matches: dict[str, VectorMatch] = {}
+        legs: dict[str, set[str]] = {}
+        # Lexical first so vector metadata wins when both legs return a chunk.
+        for leg, ranked in (("lexical", lexical), ("vector", dense)):
+            for rank, match in enumerate(ranked, start=1):
+                scores[match.id] = scores.get(match.id, 0.0) + 1.0 / (k + rank)
+                matches[match.id] = match
+                legs.setdefault(match.id, set()).add(leg)
+
+        fused = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+        for vector_id in fused[: self._settings.top_k]:
+            leg = "both" if len(legs[vector_id]) == 2 else next(iter(legs[vector_id]))
+            HYBRID_RESULTS.labels(leg=leg).inc()
+        return [
+            VectorMatch(id=vector_id, score=scores[vector_id], metadata=matches[vector_id].metadata)
+            for vector_id in fused
+        ]
+
+
+def _to_sources(matches: list[VectorMatch]) -> list[SourceSnippet]:
+    sources: list[SourceSnippet] = []
+    for match in matches:
+        metadata = dict(match.metadata or {})
+        text = str(metadata.get("text", ""))
+        sources.append(
+            SourceSnippet(
+                id=str(match.id),
+                score=float(match.score or 0.0),
+                metadata=metadata,
+                text=text,
+            )
+        )
+    return sources
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _result_key(query: str, filters: MetadataFilter | None) -> str:
+    normalized = _normalize_query(query)
+    return normalized if filters is None else f"{normalized}\0{filters.key()}"
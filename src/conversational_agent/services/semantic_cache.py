@@ -0,0 +1,285 @@
+import threading
+import time
+from typing import Any, Protocol
+from uuid import uuid4
+
+import numpy as np
+
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import ChatResponse
+from conversational_agent.infrastructure.redis_client import async_redis, sync_redis
+from conversational_agent.observability.metrics import (
+    REDIS_LATENCY,
+    SEMANTIC_CACHE_LOOKUPS,
+    SEMANTIC_CACHE_SIMILARITY,
+)
+
+# Stream entries read per XRANGE, so a replica far behind catches up over several
+# lookups instead of reading the whole stream inside one request.
+_SYNC_PAGE = 500
+_MAX_SEQUENCE = 2**64 - 1
+
+
+class SemanticCache(Protocol):
+    def lookup(self, vector: list[float]) -> ChatResponse | None:
+        ...
+
+    def store(self, vector: list[float], response: ChatResponse) -> None:
+        ...
+
+    async def alookup(self, vector: list[float]) -> ChatResponse | None:
+        ...
+
+    async def astore(self, vector: list[float], response: ChatResponse) -> None:
+        ...
+
+
+class _VectorRing:
+    """Fixed-capacity matrix of unit vectors; the oldest row is overwritten when full."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("Semantic cache capacity must be positive")
+        self._capacity = capacity
+        self._matrix: np.ndarray | None = None
+        self._keys: list[str | None] = [None] * capacity
+        self._positions: dict[str, int] = {}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str, vector: np.ndarray) -> str | None:
+        if self._matrix is None:
+            self._matrix = np.zeros((self._capacity, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._matrix.shape[1]:
+            raise ValueError("Embedding dimension does not match semantic cache")
+
+        position = self._next
+        evicted = self._keys[position]
+        if evicted is not None:
+            self._positions.pop(evicted, None)
+        self._matrix[position] = vector
+        self._keys[position] = key
+        self._positions[key] = position
+        self._next = (position + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+        return evicted
+
+    def remove(self, key: str) -> None:
+        position = self._positions.pop(key, None)
+        if position is None or self._matrix is None:
+            return
+        self._matrix[position] = 0.0
+        self._keys[position] = None
+
+    def nearest(self, vector: np.ndarray) -> tuple[str | None, float | None]:
+        if self._matrix is None or self._size == 0:
+            return None, None
+        scores = self._matrix[: self._size] @ vector
+        position = int(np.argmax(scores))
+        return self._keys[position], float(scores[position])
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if norm == 0:
+        return array
+    return array / norm
+
+
+def _record(
+    similarity: float | None, threshold: float, near_miss_margin: float, hit: bool
+) -> None:
+    if similarity is not None:
+        SEMANTIC_CACHE_SIMILARITY.observe(max(similarity, 0.0))
+    if hit:
+        result = "hit"
+    elif similarity is not None and similarity >= threshold - near_miss_margin:
+        result = "near_miss"
+    else:
+        result = "miss"
+    SEMANTIC_CACHE_LOOKUPS.labels(result=result).inc()
+
+
+class InMemorySemanticCache(SemanticCache):
+    def __init__(
+        self,
+        threshold: float,
+        max_entries: int,
+        ttl_seconds: int,
+        near_miss_margin: float = 0.05,
+    ) -> None:
+        self._threshold = threshold
+        self._near_miss_margin = near_miss_margin
+        self._ttl_seconds = ttl_seconds
+        self._ring = _VectorRing(max_entries)
+        self._responses: dict[str, tuple[float, ChatResponse]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, vector: list[float]) -> ChatResponse | None:
+        query = _unit(vector)
+        with self._lock:
+            key, similarity = self._ring.nearest(query)
+            entry = self._responses.get(key) if key is not None else None
+            if entry is not None and time.time() - entry[0] > self._ttl_seconds:
+                self._ring.remove(key)
+                self._responses.pop(key, None)
+                entry = None
+        hit = entry is not None and similarity is not None and similarity >= self._threshold
+        _record(similarity, self._threshold, self._near_miss_margin, hit)
+        return entry[1] if hit and entry is not None else None
+
+    def store(self, vector: list[float], response: ChatResponse) -> None:
+        key = uuid4().hex
+        with self._lock:
+            evicted = self._ring.add(key, _unit(vector))
+            if evicted is not None:
+                self._responses.pop(evicted, None)
+            self._responses[key] = (time.time(), response)
+
+    async def alookup(self, vector: list[float]) -> ChatResponse | None:
+        return self.lookup(vector)
+
+    async def astore(self, vector: list[float], response: ChatResponse) -> None:
+        self.store(vector, response)
+
+
+class RedisSemanticCache(SemanticCache):
+    """Semantic cache shared across replicas.
+
+    Redis holds the answers and an append-only stream of ``(key, vector, stored_at)``
+    entries; each replica keeps a local copy of the embedding matrix and on lookup
+    only reads the stream entries added since its last sync, so a lookup costs one
+    ``XRANGE`` (usually empty) plus one ``HGET`` on a hit. Entries expire
+    individually: their store time is checked at lookup, and the stream and the
+    answers hash are trimmed to ``SEMANTIC_CACHE_MAX_ENTRIES``. ``warm`` loads the
+    existing stream at startup so a fresh replica's first lookups stay cheap.
+    """
+
+    _ANSWERS = "chat:semantic:answers"
+    _ORDER = "chat:semantic:order"
+    _LOG = "chat:semantic:log"
+
+    def __init__(self, settings: Settings) -> None:
+        if not settings.redis_url:
+            raise ValueError("REDIS URL is required for RedisSemanticCache")
+        self._redis = sync_redis(settings, decode_responses=False)
+        self._aredis = async_redis(settings, decode_responses=False)
+        self._threshold = settings.semantic_cache_threshold
+        self._near_miss_margin = settings.semantic_cache_near_miss_margin
+        self._max_entries = settings.semantic_cache_max_entries
+        self._ttl_seconds = settings.response_cache_ttl_seconds
+        self._ring = _VectorRing(self._max_entries)
+        self._stored_at: dict[str, float] = {}
+        self._last_id = b"0-0"
+        self._lock = threading.Lock()
+
+    def lookup(self, vector: list[float]) -> ChatResponse | None:
+        with REDIS_LATENCY.labels(operation="semantic_lookup").time():
+            # The stream read happens outside the lock; only applying it is locked.
+            self._apply(self._redis.xrange(self._LOG, self._after(), count=_SYNC_PAGE))
+            key, similarity = self._nearest(_unit(vector))
+            raw = self._redis.hget(self._ANSWERS, key) if key is not None else None
+            return self._result(similarity, raw)
+
+    def warm(self) -> None:
+        """Applies the whole stream page by page; called once before serving traffic."""
+        with REDIS_LATENCY.labels(operation="semantic_warm").time():
+            while True:
+                entries = self._redis.xrange(self._LOG, self._after(), count=_SYNC_PAGE)
+                self._apply(entries)
+                if len(entries) < _SYNC_PAGE:
+                    return
+
+    def store(self, vector: list[float], response: ChatResponse) -> None:
+        with REDIS_LATENCY.labels(operation="semantic_store").time():
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_store(pipe, vector, response)
+            evicted = self._evicted(pipe.execute())
+            if evicted:
+                self._redis.hdel(self._ANSWERS, *evicted)
+
+    async def alookup(self, vector: list[float]) -> ChatResponse | None:
+        with REDIS_LATENCY.labels(operation="semantic_lookup").time():
+            entries = await self._aredis.xrange(self._LOG, self._after(), count=_SYNC_PAGE)
+            self._apply(entries)
+            key, similarity = self._nearest(_unit(vector))
+            raw = await self._aredis.hget(self._ANSWERS, key) if key is not None else None
+            return self._result(similarity, raw)
+
+    async def astore(self, vector: list[float], response: ChatResponse) -> None:
+        with REDIS_LATENCY.labels(operation="semantic_store").time():
+            pipe = self._aredis.pipeline(transaction=True)
+            self._queue_store(pipe, vector, response)
+            evicted = self._evicted(await pipe.execute())
+            if evicted:
+                await self._aredis.hdel(self._ANSWERS, *evicted)
+
+    def _queue_store(self, pipe: Any, vector: list[float], response: ChatResponse) -> None:
+        # Sync and asyncio pipelines buffer commands the same way; only
+        # ``execute`` differs.
+        key = uuid4().hex
+        pipe.hset(self._ANSWERS, key, response.model_dump_json())
+        pipe.xadd(
+            self._LOG,
+            {"key": key, "vector": _unit(vector).tobytes(), "stored_at": repr(time.time())},
+            maxlen=self._max_entries,
+            approximate=False,
+        )
+        pipe.lpush(self._ORDER, key)
+        pipe.lrange(self._ORDER, self._max_entries, -1)
+        pipe.ltrim(self._ORDER, 0, self._max_entries - 1)
+
+    @staticmethod
+    def _evicted(results: list[Any]) -> list[str]:
+        return [item.decode("utf-8") for item in results[3]]
+
+    def _after(self) -> bytes:
+        # Only entries appended after the last one applied. The ``(`` exclusive
+        # start needs Redis 6.2+; the next possible id works on any server with
+        # streams (5.0+).
+        millis, sequence = _stream_id(self._last_id)
+        if sequence == _MAX_SEQUENCE:
+            return f"{millis + 1}-0".encode()
+        return f"{millis}-{sequence + 1}".encode()
+
+    def _apply(self, entries: list[tuple[bytes, dict[bytes, bytes]]]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            for entry_id, fields in entries:
+                # A concurrent lookup may have applied the same batch already.
+                if _stream_id(entry_id) <= _stream_id(self._last_id):
+                    continue
+                key = fields[b"key"].decode("utf-8")
+                evicted = self._ring.add(key, np.frombuffer(fields[b"vector"], dtype=np.float32))
+                if evicted is not None:
+                    self._stored_at.pop(evicted, None)
+                self._stored_at[key] = float(fields[b"stored_at"])
+                self._last_id = entry_id
+
+    def _nearest(self, query: np.ndarray) -> tuple[str | None, float | None]:
+        """Nearest entry, or no key when it is below the threshold or expired."""
+        with self._lock:
+            key, similarity = self._ring.nearest(query)
+            if key is None or similarity is None or similarity < self._threshold:
+                return None, similarity
+            if time.time() - self._stored_at.get(key, 0.0) > self._ttl_seconds:
+                self._ring.remove(key)
+                self._stored_at.pop(key, None)
+                return None, similarity
+            return key, similarity
+
+    def _result(self, similarity: float | None, raw: bytes | None) -> ChatResponse | None:
+        _record(similarity, self._threshold, self._near_miss_margin, raw is not None)
+        if raw is None:
+            return None
+        return ChatResponse.model_validate_json(raw)
+
+
+def _stream_id(entry_id: bytes) -> tuple[int, int]:
+    millis, _, sequence = entry_id.partition(b"-")
+    return int(millis), int(sequence or 0)
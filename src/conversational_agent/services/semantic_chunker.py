@@ -0,0 +1,75 @@
+from typing import Protocol
+
+import numpy as np
+
+from conversational_agent.core.config import Settings
+from conversational_agent.utils.text import chunk_text, split_sentences
+
+
+class SentenceEmbedder(Protocol):
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+
+class SemanticChunker:
+    """Groups consecutive sentences into chunks, cutting where the topic shifts.
+
+    Sentences are embedded in large batches through the EmbeddingClient, whose
+    embedding cache makes unchanged sentences free on re-ingestion. A cut is made
+    wherever the cosine similarity between adjacent sentences drops below
+    ``SEMANTIC_SIMILARITY_THRESHOLD``, or when a chunk would exceed
+    ``SEMANTIC_MAX_CHUNK_CHARS`` / ``SEMANTIC_MAX_SENTENCES_PER_CHUNK``.
+    """
+
+    def __init__(self, settings: Settings, embeddings: SentenceEmbedder) -> None:
+        self._embeddings = embeddings
+        self._threshold = settings.semantic_similarity_threshold
+        self._max_chars = settings.semantic_max_chunk_chars
+        self._max_sentences = max(1, settings.semantic_max_sentences_per_chunk)
+        self._batch_size = max(1, settings.semantic_embed_batch_size)
+
+    def chunk(self, text: str) -> list[str]:
+        sentences = self._bounded_sentences(text)
+        if len(sentences) <= 1:
+            return sentences
+
+        similarities = self.adjacent_similarities(self._embed(sentences))
+        breaks = similarities < self._threshold
+
+        chunks: list[str] = []
+        current: list[str] = [sentences[0]]
+        current_chars = len(sentences[0])
+        for idx, sentence in enumerate(sentences[1:]):
+            too_long = current_chars + 1 + len(sentence) > self._max_chars
+            if breaks[idx] or too_long or len(current) >= self._max_sentences:
+                chunks.append(" ".join(current))
+                current = []
+                current_chars = -1
+            current.append(sentence)
+            current_chars += 1 + len(sentence)
+        chunks.append(" ".join(current))
+        return chunks
+
+    @staticmethod
+    def adjacent_similarities(vectors: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each row with the next one, in one vectorized pass."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = vectors / np.where(norms == 0, 1.0, norms)
+        return np.einsum("ij,ij->i", unit[:-1], unit[1:])
+
+    def _embed(self, sentences: list[str]) -> np.ndarray:
+        vectors: list[list[float]] = []
+        for start in range(0, len(sentences), self._batch_size):
+            batch = sentences[start : start + self._batch_size]
+            vectors.extend(self._embeddings.embed_documents(batch))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _bounded_sentences(self, text: str) -> list[str]:
+        sentences: list[str] = []
+        for sentence in split_sentences(text):
+            if len(sentence) <= self._max_chars:
+                sentences.append(sentence)
+            else:
+                # Run-on text without punctuation (tables, code) still has to fit.
+                sentences.extend(chunk_text(sentence, chunk_size=self._max_chars, chunk_overlap=0))
+        return sentences
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Protocol
+from uuid import uuid4
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.redis_client import async_redis
+from conversational_agent.observability.metrics import COALESCED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Deletes the lock only if this leader still owns it, so a leader that outlived
+# its TTL cannot release a lock another replica has since taken.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight(Protocol):
+    async def run(self, key: str, work: Callable[[], Awaitable[str]]) -> str:
+        """Run ``work`` once per ``key`` among concurrent callers and share its result."""
+        ...
+
+
+class InProcessSingleFlight(SingleFlight):
+    """Coalesces identical in-flight calls within one event loop.
+
+    The first caller for a key becomes the leader and runs ``work``; callers that
+    arrive before it finishes await the leader's future. A leader failure is
+    propagated to its followers rather than retried by each of them.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+
+    async def run(self, key: str, work: Callable[[], Awaitable[str]]) -> str:
+        future = self._inflight.get(key)
+        if future is not None:
+            COALESCED_REQUESTS.labels(scope="process").inc()
+            try:
+                # Shielded so a cancelled follower does not cancel the leader's
+                # future for everyone else.
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # The leader itself was cancelled; take over.
+            return await self.run(key, work)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Followers re-raise it; without one the exception would be
+            # reported as never retrieved.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+class RedisSingleFlight(SingleFlight):
+    """Coalesces identical calls across replicas with a Redis lock.
+
+    Calls are first coalesced in-process. The local leader then tries
+    ``SET NX PX`` on the key's lock: the owner runs ``work`` and publishes the
+    result under a short-lived key, other replicas poll for that result. If the
+    owner dies or ``COALESCE_WAIT_SECONDS`` passes, waiters run ``work``
+    themselves, so coalescing never turns into an outage.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._redis = async_redis(settings)
+        self._local = InProcessSingleFlight()
+        self._lock_ttl_ms = int(settings.coalesce_lock_ttl_seconds * 1000)
+        self._wait_seconds = settings.coalesce_wait_seconds
+        self._poll_seconds = settings.coalesce_poll_interval_seconds
+        self._release = self._redis.register_script(_RELEASE_SCRIPT)
+
+    async def run(self, key: str, work: Callable[[], Awaitable[str]]) -> str:
+        return await self._local.run(key, lambda: self._run_distributed(key, work))
+
+    async def _run_distributed(self, key: str, work: Callable[[], Awaitable[str]]) -> str:
+        lock_key, result_key = f"chat:inflight:{key}", f"chat:inflight:result:{key}"
+        token = uuid4().hex
+        if await self._redis.set(lock_key, token, nx=True, px=self._lock_ttl_ms):
+            try:
+                result = await work()
+                await self._redis.set(result_key, result, px=self._lock_ttl_ms)
+                return result
+            finally:
+                await self._release(keys=[lock_key], args=[token])
+
+        deadline = time.monotonic() + self._wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self._poll_seconds)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.get(result_key)
+            pipe.exists(lock_key)
+            result, locked = await pipe.execute()
+            if result is not None:
+                COALESCED_REQUESTS.labels(scope="replica").inc()
+                return result
+            if not locked:
+                break
+        logger.warning("coalesced leader for %s gave no result; running the turn here", key)
+        COALESCED_REQUESTS.labels(scope="fallback").inc()
+        return await work()
+
+
+def build_single_flight(settings: Settings) -> SingleFlight | None:
+    if not settings.coalesce_enabled:
+        return None
+    if settings.redis_url:
+        return RedisSingleFlight(settings)
+    return InProcessSingleFlight()
@@ -0,0 +1,74 @@
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    if size <= 0:
+        raise ValueError("batch size must be positive")
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def prefetch(items: Iterable[T], maxsize: int) -> Iterator[T]:
+    """Iterate ``items`` on a background thread, buffering at most ``maxsize`` results.
+
+    Chaining stages through ``prefetch`` lets them overlap while the bounded queue
+    keeps a fast producer from running arbitrarily far ahead of its consumer.
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    if maxsize <= 0:
+        raise ValueError("prefetch queue size must be positive")
+    buffer: queue.Queue[object] = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not _put(item):
+                    return
+            _put(_DONE)
+        except BaseException as exc:  # noqa: BLE001 - handed to the consumer
+            _put(_Failure(exc))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=_produce, name="pipeline-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,231 @@
+import logging
+import math
+import re
+from collections.abc import Iterator
+from functools import lru_cache
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MODES = ("chars", "tokens")
+
+# Rough characters per token of English text for BPE encodings like cl100k_base.
+_CHARS_PER_TOKEN = 4
+
+
+def chunk_text(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    mode: str = "chars",
+    encoding_name: str = "cl100k_base",
+) -> list[str]:
+    """Split ``text`` into overlapping chunks of at most ``chunk_size`` units.
+
+    ``mode="chars"`` measures characters; ``mode="tokens"`` measures tokens of the
+    given tiktoken encoding so chunks fit embedding and LLM context budgets.
+    """
+    return list(iter_chunks(text, chunk_size, chunk_overlap, mode, encoding_name))
+
+
+def iter_chunks(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    mode: str = "chars",
+    encoding_name: str = "cl100k_base",
+) -> Iterator[str]:
+    if mode == "chars":
+        spans = iter_char_spans(text, chunk_size, chunk_overlap)
+    elif mode == "tokens":
+        spans = iter_token_spans(text, chunk_size, chunk_overlap, encoding_name)
+    else:
+        raise ValueError(f"Unknown chunk mode: {mode!r}; expected one of {CHUNK_MODES}")
+    for start, end in spans:
+        yield text[start:end]
+
+
+def iter_char_spans(text: str, chunk_size: int, chunk_overlap: int) -> Iterator[tuple[int, int]]:
+    """Yield ``(start, end)`` offsets of character chunks without copying ``text``.
+
+    Chunk ends snap back to the last whitespace in the second half of the window
+    and starts snap forward past a partial word, so words are not cut in half
+    unless a single word is longer than half a chunk.
+    """
+    _validate(chunk_size, chunk_overlap)
+    length = len(text)
+    start = _skip_space(text, 0, length)
+    min_break = max(1, chunk_size // 2)
+
+    while start < length:
+        end = start + chunk_size
+        if end >= length:
+            end = length
+        else:
+            lower = start + min_break
+            cut = max(text.rfind(" ", lower, end + 1), text.rfind("\n", lower, end + 1))
+            if cut != -1:
+                end = cut
+        stop = end
+        while stop > start and text[stop - 1].isspace():
+            stop -= 1
+        if stop > start:
+            yield start, stop
+        if end >= length:
+            return
+
+        next_start = end - chunk_overlap
+        if chunk_overlap and next_start > start and not text[next_start - 1].isspace():
+            # Begin the overlap on a word boundary when one is available.
+            space = text.find(" ", next_start, end)
+            if space != -1:
+                next_start = space + 1
+        if next_start <= start:
+            next_start = end
+        start = _skip_space(text, next_start, length)
+
+
+def iter_token_spans(
+    text: str, chunk_size: int, chunk_overlap: int, encoding_name: str = "cl100k_base"
+) -> Iterator[tuple[int, int]]:
+    """Yield character offsets of chunks holding at most ``chunk_size`` tokens.
+
+    The text is encoded once and token windows are mapped back to offsets in the
+    original string, so no chunk is re-encoded or decoded.
+    """
+    _validate(chunk_size, chunk_overlap)
+    encoding = _encoding(encoding_name)
+    tokens = encoding.encode(text, disallowed_special=())
+    if not tokens:
+        return
+    _, offsets = encoding.decode_with_offsets(tokens)
+    length = len(text)
+    step = chunk_size - chunk_overlap
+
+    for first in range(0, len(tokens), step):
+        last = first + chunk_size
+        start = offsets[first]
+        if first and offsets[first - 1] == start:
+            # The window opens mid-character; drop the character it shares with
+            # the previous token so the chunk stays within chunk_size tokens.
+            start += 1
+        end = offsets[last] if last < len(tokens) else length
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            yield start, end
+        if last >= len(tokens):
+            return
+
+
+def overlap_tail(
+    text: str, chunk_overlap: int, mode: str = "chars", encoding_name: str = "cl100k_base"
+) -> str:
+    """The last ``chunk_overlap`` units of ``text``, measured as ``iter_chunks`` does.
+
+    Character tails start on a word boundary when one is available, like the
+    overlap of ``iter_char_spans``; token tails start on a token boundary.
+    """
+    if chunk_overlap <= 0 or not text:
+        return ""
+    if mode == "chars":
+        start = max(0, len(text) - chunk_overlap)
+        if start and not text[start - 1].isspace():
+            space = text.find(" ", start)
+            if space != -1:
+                start = space + 1
+    elif mode == "tokens":
+        encoding = _encoding(encoding_name)
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= chunk_overlap:
+            return text.strip()
+        _, offsets = encoding.decode_with_offsets(tokens)
+        first = len(tokens) - chunk_overlap
+        start = offsets[first]
+        if offsets[first - 1] == start:
+            # Same rule as ``iter_token_spans`` for a tail opening mid-character.
+            start += 1
+    else:
+        raise ValueError(f"Unknown chunk mode: {mode!r}; expected one of {CHUNK_MODES}")
+    return text[start:].strip()
+
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])([\"')\]]*)\s+(?=[\"'(\[]*[A-Z0-9])|\n\s*\n")
+
+
+def iter_sentence_spans(text: str) -> Iterator[tuple[int, int]]:
+    """Yield offsets of sentences split on terminal punctuation and blank lines."""
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        closing = match.end(1) if match.group(1) is not None else match.start()
+        span = _strip_span(text, start, closing)
+        if span is not None:
+            yield span
+        start = match.end()
+    span = _strip_span(text, start, len(text))
+    if span is not None:
+        yield span
+
+
+def split_sentences(text: str) -> list[str]:
+    return [text[start:end] for start, end in iter_sentence_spans(text)]
+
+
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """Tokens in ``text``; estimated from its length if the encoding cannot load.
+
+    tiktoken downloads encodings on first use, so an offline host would
+    otherwise fail every chat turn on context and history budgets.
+    """
+    encoding = _optional_encoding(encoding_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=8)
+def _encoding(name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+
+@lru_cache(maxsize=8)
+def _optional_encoding(name: str) -> tiktoken.Encoding | None:
+    # Cached either way, so a missing encoding costs one failed load per process
+    # rather than a download attempt on every chat turn.
+    try:
+        return _encoding(name)
+    except Exception as exc:  # noqa: BLE001 - network, cache dir or unknown name
+        logger.warning(
+            "tiktoken encoding %r unavailable (%s); estimating token counts from characters",
+            name,
+            exc,
+        )
+        return None
+
+
+def _validate(chunk_size: int, chunk_overlap: int) -> None:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if chunk_overlap < 0 or chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be >= 0 and smaller than chunk_size")
+
+
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int] | None:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if end > start else None
+
+
+def _skip_space(text: str, position: int, length: int) -> int:
+    while position < length and text[position].isspace():
+        position += 1
+    return position
@@ -0,0 +1,40 @@
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Replays queued replies; streams text word by word, then any tool calls whole."""
+
+    replies: list[AIMessage]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self.replies.pop(0))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self.replies.pop(0)
+        for word in reply.content.split(" ") if reply.content else []:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=f"{word} "))
+        if reply.tool_calls:
+            chunks = [
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"]}
+                for call in reply.tool_calls
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunks))
+
+
+@pytest.fixture
+def scripted_llm() -> Callable[[list[AIMessage]], ScriptedChatModel]:
+    return lambda replies: ScriptedChatModel(replies=replies)
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+from conversational_agent.agent.graph import AgentService
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.vector_store import VectorMatch
+from conversational_agent.services.chat_service import (
+    ChatService,
+    InMemoryResponseCache,
+    InMemorySessionStore,
+)
+from conversational_agent.services.retrieval_service import RetrievalContext, RetrievalService
+
+
+class SlowEmbeddings:
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class SlowVectorStore:
+    """Stands in for a remote backend with 100 ms of network latency."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def aquery(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        self.calls += 1
+        await asyncio.sleep(0.1)
+        return [VectorMatch(id="doc-0", score=0.9, metadata={"source_id": "doc", "text": "hello"})]
+
+
+def _settings() -> Settings:
+    return Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x")
+
+
+def test_concurrent_async_searches_overlap_their_backend_waits() -> None:
+    service = RetrievalService(_settings(), SlowEmbeddings(), SlowVectorStore())
+
+    async def run() -> list:
+        return await asyncio.gather(*(service.asearch(f"question {idx}") for idx in range(20)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+
+    assert time.perf_counter() - start < 1.0
+    assert all(sources[0].id == "doc-0" for sources in results)
+
+
+def test_achat_runs_the_agent_and_reuses_the_turn_retrieval(scripted_llm) -> None:
+    vector_store = SlowVectorStore()
+    retrieval = RetrievalService(_settings(), SlowEmbeddings(), vector_store)
+    tool_call = {"name": "search_knowledge_base", "args": {"query": "what is rag"}, "id": "c-1"}
+    llm = scripted_llm(
+        [AIMessage(content="", tool_calls=[tool_call]), AIMessage(content="grounded")]
+    )
+    agent = AgentService(_settings(), retrieval, llm=llm)
+    sessions = InMemorySessionStore()
+    service = ChatService(agent, retrieval, sessions, InMemoryResponseCache())
+
+    response = asyncio.run(service.achat("s1", "what is rag"))
+
+    assert response.answer == "grounded"
+    assert response.sources[0].id == "doc-0"
+    # The tool call hit the turn's RetrievalContext instead of the backend.
+    assert vector_store.calls == 1
+    assert [item["role"] for item in sessions.get("s1")] == ["user", "assistant"]
+
+
+def test_aembed_query_is_cached_in_the_retrieval_context() -> None:
+    service = RetrievalService(_settings(), SlowEmbeddings(), SlowVectorStore())
+    context = RetrievalContext()
+
+    first = asyncio.run(service.aembed_query("Hello", context=context))
+
+    assert context.query_vectors == {"hello": first}
@@ -0,0 +1,80 @@
+from conversational_agent.infrastructure.bounded_cache import BoundedCache
+from conversational_agent.services.chat_service import InMemoryResponseCache, InMemorySessionStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(clock: FakeClock, **overrides) -> BoundedCache[str]:
+    options = {"max_entries": 3, "max_bytes": 1000, "ttl_seconds": 10.0}
+    options.update(overrides)
+    return BoundedCache("test", sizer=len, clock=clock, sweep_interval_seconds=5.0, **options)
+
+
+def test_least_recently_used_entry_is_evicted_at_the_entry_limit() -> None:
+    cache = _cache(FakeClock())
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+
+    cache.set("d", "d")
+
+    assert cache.peek("b") is None
+    assert [cache.peek(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.stats().evictions == 1
+
+
+def test_byte_limit_evicts_until_new_entry_fits() -> None:
+    cache = _cache(FakeClock(), max_entries=100, max_bytes=25)
+    cache.set("a", "x" * 10)
+    cache.set("b", "x" * 10)
+
+    cache.set("c", "x" * 10)
+
+    assert cache.peek("a") is None
+    assert cache.stats().bytes == 22
+    cache.set("big", "x" * 100)
+    assert cache.peek("big") is None
+    assert len(cache) == 2
+
+
+def test_entries_expire_lazily_and_in_periodic_sweeps() -> None:
+    clock = FakeClock()
+    cache = _cache(clock, max_entries=100)
+    cache.set("read-later", "v")
+    cache.set("never-read", "v")
+
+    clock.now = 11.0
+    assert cache.get("read-later") is None
+    assert len(cache) == 1
+
+    cache.set("fresh", "v")
+
+    assert len(cache) == 1
+    stats = cache.stats()
+    assert stats.expirations == 2
+    assert stats.hit_ratio == 0.0
+
+
+def test_stores_report_hit_ratio_and_keep_compact_history() -> None:
+    responses = InMemoryResponseCache(max_entries=10)
+    responses.set("k", "answer")
+    responses.get("k")
+    responses.get("missing")
+    assert responses.stats().hit_ratio == 0.5
+
+    sessions = InMemorySessionStore(max_messages=2, max_sessions=1)
+    sessions.append_turn("s1", "q", "a")
+    sessions.append_turn("s2", "q", "a")
+
+    assert sessions.get("s1") == []
+    assert sessions.get("s2") == [
+        {"role": "user", "content": "q"},
+        {"role": "assistant", "content": "a"},
+    ]
+    assert sessions.stats().entries == 1
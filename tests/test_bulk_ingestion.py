@@ -0,0 +1,98 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from pypdf import PdfWriter
+
+from conversational_agent.services.bulk_ingestion_service import (
+    BulkIngestionService,
+    IngestionJournal,
+    assign_source_ids,
+    ingest_root,
+    resolve_pdf_paths,
+)
+
+
+def _touch(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"%PDF-1.4\n")
+    return path
+
+
+def test_resolve_pdf_paths_from_directory_and_manifest(tmp_path: Path) -> None:
+    first = _touch(tmp_path / "docs" / "a.pdf")
+    second = _touch(tmp_path / "docs" / "nested" / "b.PDF")
+    (tmp_path / "docs" / "notes.txt").write_text("ignored")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# backfill\ndocs/a.pdf\n\ndocs/nested/b.PDF\n")
+
+    assert resolve_pdf_paths(directory=str(tmp_path / "docs")) == [first, second]
+    assert resolve_pdf_paths(manifest=str(manifest)) == [first, second]
+    with pytest.raises(ValueError):
+        resolve_pdf_paths(directory=str(tmp_path), manifest=str(manifest))
+
+
+def test_journal_resumes_completed_documents(tmp_path: Path) -> None:
+    journal_path = tmp_path / "journal.jsonl"
+    done = _touch(tmp_path / "done.pdf")
+    todo = _touch(tmp_path / "todo.pdf")
+
+    IngestionJournal(str(journal_path)).record(done, "done", 12)
+    with journal_path.open("a", encoding="utf-8") as handle:
+        handle.write('{"path": "trunc')
+
+    journal = IngestionJournal(str(journal_path))
+    assert journal.is_completed(done)
+    assert not journal.is_completed(todo)
+
+
+class RecordingIngestionService:
+    def __init__(self) -> None:
+        self.source_ids: dict[str, str] = {}
+
+    def ingest_pages(self, pages: list[str], source_id: str, path: str) -> int:
+        self.source_ids[source_id] = path
+        return 1
+
+
+def _blank_pdf(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    with path.open("wb") as handle:
+        writer.write(handle)
+    return path
+
+
+def test_files_sharing_a_stem_get_distinct_source_ids(tmp_path: Path) -> None:
+    first = _blank_pdf(tmp_path / "docs" / "a" / "report.pdf")
+    second = _blank_pdf(tmp_path / "docs" / "b" / "report.pdf")
+    directory = str(tmp_path / "docs")
+    recorder = RecordingIngestionService()
+
+    result = BulkIngestionService(recorder, workers=1).ingest(  # type: ignore[arg-type]
+        resolve_pdf_paths(directory=directory), root=ingest_root(directory=directory)
+    )
+
+    assert result.documents == 2
+    assert recorder.source_ids == {"a/report": str(first), "b/report": str(second)}
+    assert ingest_root(pattern=f"{directory}/**/*.pdf") == Path(directory)
+    with pytest.raises(ValueError, match="Duplicate source id"):
+        assign_source_ids([first, first.with_suffix(".PDF")], root=Path(directory))
+
+
+def test_submit_runs_bulk_ingest_as_a_background_job(tmp_path: Path) -> None:
+    directory = str(tmp_path / "docs")
+    _blank_pdf(tmp_path / "docs" / "report.pdf")
+    service = BulkIngestionService(RecordingIngestionService(), workers=1)  # type: ignore[arg-type]
+
+    job = service.submit(resolve_pdf_paths(directory=directory), root=Path(directory))
+    deadline = time.monotonic() + 60
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert service.get_job(job.job_id) is job
+    assert job.status == "succeeded" and job.result is not None
+    assert job.result.documents == 1
+    assert service.get_job("missing") is None
@@ -0,0 +1,149 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from conversational_agent.agent.graph import AgentService
+from conversational_agent.api.routes import _sse_stream, get_chat_service, router
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.vector_store import VectorMatch
+from conversational_agent.services.chat_service import (
+    ChatService,
+    InMemoryResponseCache,
+    InMemorySessionStore,
+)
+from conversational_agent.services.retrieval_service import RetrievalService
+
+
+class FakeEmbeddings:
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class FakeVectorStore:
+    def query(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        return [VectorMatch(id="doc-0", score=0.9, metadata={"source_id": "doc", "text": "hello"})]
+
+    async def aquery(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        return self.query(vector, top_k, filters)
+
+
+def _chat_service(llm) -> tuple[ChatService, InMemorySessionStore]:
+    settings = Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x")
+    retrieval = RetrievalService(settings, FakeEmbeddings(), FakeVectorStore())
+    agent = AgentService(settings, retrieval, llm=llm)
+    sessions = InMemorySessionStore()
+    return ChatService(agent, retrieval, sessions, InMemoryResponseCache()), sessions
+
+
+def test_chat_stream_emits_progress_tokens_and_records_the_turn(scripted_llm) -> None:
+    tool_call = {"name": "search_knowledge_base", "args": {"query": "what is rag"}, "id": "call-1"}
+    replies = [
+        AIMessage(content="", tool_calls=[tool_call]),
+        AIMessage(content="RAG grounds answers"),
+    ]
+    service, sessions = _chat_service(scripted_llm(replies))
+
+    events = list(service.chat_stream("s1", "what is rag"))
+    names = [event for event, _ in events]
+
+    assert names[0] == "sources"
+    tool_result = next(data for event, data in events if event == "tool_result")
+    assert tool_result["name"] == "search_knowledge_base"
+    assert names.index("tool_call") < names.index("tool_result") < names.index("token")
+    assert names[-1] == "done"
+    tokens = "".join(data["text"] for event, data in events if event == "token")
+    assert tokens.strip() == "RAG grounds answers"
+    assert events[-1][1]["answer"].strip() == "RAG grounds answers"
+    assert sessions.get("s1")[-1]["content"].strip() == "RAG grounds answers"
+
+
+def test_text_before_a_tool_call_is_reset_out_of_the_answer(scripted_llm) -> None:
+    tool_call = {"name": "search_knowledge_base", "args": {"query": "what is rag"}, "id": "call-1"}
+    replies = [
+        AIMessage(content="Let me check.", tool_calls=[tool_call]),
+        AIMessage(content="RAG grounds answers"),
+    ]
+    service, _ = _chat_service(scripted_llm(replies))
+
+    events = list(service.chat_stream("s1", "what is rag"))
+    names = [event for event, _ in events]
+
+    assert names.index("token") < names.index("reset") < names.index("tool_call")
+    after_reset = events[names.index("reset") :]
+    tokens = "".join(data["text"] for event, data in after_reset if event == "token")
+    assert tokens == events[-1][1]["answer"]
+    assert events[-1][1]["answer"].strip() == "RAG grounds answers"
+
+
+def test_repeated_question_is_replayed_from_the_response_cache(scripted_llm) -> None:
+    service, sessions = _chat_service(scripted_llm([AIMessage(content="first answer")]))
+    list(service.chat_stream("s1", "question"))
+
+    events = list(service.chat_stream("s1", "question"))
+
+    assert [event for event, _ in events] == ["sources", "token", "done"]
+    assert events[-1][1]["answer"].strip() == "first answer"
+    assert len(sessions.get("s1")) == 4
+
+
+def test_achat_stream_matches_the_sync_stream(scripted_llm) -> None:
+    tool_call = {"name": "search_knowledge_base", "args": {"query": "what is rag"}, "id": "call-1"}
+    replies = [
+        AIMessage(content="", tool_calls=[tool_call]),
+        AIMessage(content="RAG grounds answers"),
+    ]
+    service, sessions = _chat_service(scripted_llm(replies))
+
+    async def collect():
+        return [item async for item in service.achat_stream("s1", "what is rag")]
+
+    events = asyncio.run(collect())
+
+    assert [event for event, _ in events] == [
+        "sources", "tool_call", "tool_result", "token", "token", "token", "done"
+    ]
+    assert events[-1][1]["answer"].strip() == "RAG grounds answers"
+    assert sessions.get("s1")[-1]["content"].strip() == "RAG grounds answers"
+
+
+def test_sse_stream_reports_failures_in_band() -> None:
+    async def events():
+        yield "token", {"text": "partial"}
+        raise RuntimeError("boom")
+
+    async def collect():
+        return [frame async for frame in _sse_stream(events())]
+
+    frames = asyncio.run(collect())
+
+    assert frames[0] == 'event: token\ndata: {"text": "partial"}\n\n'
+    assert frames[-1].startswith("event: error\n")
+
+
+def test_stream_route_builds_the_chat_service_off_the_event_loop(scripted_llm) -> None:
+    service, _ = _chat_service(scripted_llm([AIMessage(content="hi there")]))
+    built_on_loop: list[bool] = []
+
+    def cold_factory() -> ChatService:
+        try:
+            asyncio.get_running_loop()
+            built_on_loop.append(True)
+        except RuntimeError:
+            built_on_loop.append(False)
+        return service
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_chat_service] = cold_factory
+    response = TestClient(app).post(
+        "/api/v1/chat/stream", json={"session_id": "s1", "query": "hello"}
+    )
+
+    assert response.status_code == 200
+    assert "event: done" in response.text
+    assert built_on_loop == [False]
@@ -0,0 +1,63 @@
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import SourceSnippet
+from conversational_agent.services.context_assembler import ContextAssembler
+from conversational_agent.utils.text import chunk_text
+
+
+def _assembler(budget: int = 1000) -> ContextAssembler:
+    settings = Settings(
+        GROQ_API_KEY="x", PINECONE_API_KEY="x", CHUNK_OVERLAP=20, CONTEXT_TOKEN_BUDGET=budget
+    )
+    return ContextAssembler(settings, token_counter=lambda text: len(text.split()))
+
+
+def _snippet(idx: str, text: str, score: float, source_id: str, chunk_index: int) -> SourceSnippet:
+    return SourceSnippet(
+        id=idx,
+        score=score,
+        metadata={"source_id": source_id, "chunk_index": chunk_index},
+        text=text,
+    )
+
+
+def test_adjacent_chunks_are_merged_without_repeating_the_overlap() -> None:
+    document = " ".join(f"word{idx}" for idx in range(60))
+    first, second = chunk_text(document, chunk_size=200, chunk_overlap=20)[:2]
+
+    context = _assembler().assemble(
+        [_snippet("b", second, 0.7, "manual", 1), _snippet("a", first, 0.9, "manual", 0)]
+    )
+
+    assert len(context.snippets) == 1
+    assert context.snippets[0].score == 0.9
+    assert context.snippets[0].text == document[: len(context.snippets[0].text)]
+    assert context.tokens_saved > 0
+
+
+def test_near_duplicates_are_dropped_and_budget_is_respected() -> None:
+    boilerplate = "All rights reserved. This manual may not be copied without written consent."
+    unique = "Torque the housing bolts to twelve newton metres before refilling oil."
+    context = _assembler(budget=20).assemble(
+        [
+            _snippet("a", boilerplate, 0.9, "manual", 0),
+            _snippet("b", boilerplate + " Page 4.", 0.8, "guide", 7),
+            _snippet("c", unique, 0.7, "guide", 3),
+        ]
+    )
+
+    assert [snippet.id for snippet in context.snippets] == ["a"]
+    assert context.tokens_used <= 20
+
+    roomy = _assembler().assemble(
+        [_snippet("a", boilerplate, 0.9, "manual", 0), _snippet("c", unique, 0.7, "guide", 3)]
+    )
+    assert [snippet.id for snippet in roomy.snippets] == ["a", "c"]
+    assert roomy.tokens_saved == 0
+
+
+def test_single_oversized_snippet_is_truncated_to_the_budget() -> None:
+    context = _assembler(budget=10).assemble(
+        [_snippet("a", " ".join(["token"] * 50), 0.9, "manual", 0)]
+    )
+
+    assert context.snippets and 0 < context.tokens_used <= 10
@@ -0,0 +1,100 @@
+import asyncio
+from functools import lru_cache
+
+from conversational_agent.core.config import Settings
+from conversational_agent.services.chat_service import InMemorySessionStore
+from conversational_agent.services.conversation_memory import ConversationMemory
+
+
+class RecordingSummarizer:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str | None, list[dict[str, str]]]] = []
+
+    def summarize(self, summary: str | None, messages: list[dict[str, str]]) -> str:
+        self.calls.append((summary, messages))
+        folded = " ".join(item["content"] for item in messages)
+        return f"{summary} {folded}" if summary else folded
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x", **overrides)
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def test_store_keeps_the_newest_messages_and_returns_evicted_ones() -> None:
+    store = InMemorySessionStore(max_messages=4)
+    evicted = [store.append("s", "user", f"m{idx}") for idx in range(6)]
+
+    assert [item["content"] for item in store.get("s")] == ["m2", "m3", "m4", "m5"]
+    assert [batch for batch in evicted if batch] == [
+        [{"role": "user", "content": "m0"}],
+        [{"role": "user", "content": "m1"}],
+    ]
+
+
+def test_evicted_turns_are_folded_into_a_rolling_summary() -> None:
+    summarizer = RecordingSummarizer()
+    store = InMemorySessionStore(max_messages=2)
+    memory = ConversationMemory(_settings(), store, summarizer, token_counter=_word_count)
+
+    for turn in range(3):
+        memory.append("s", "user", f"question {turn}")
+        memory.append("s", "assistant", f"answer {turn}")
+    memory.close()
+
+    history = memory.get("s")
+    assert history[0] == {
+        "role": "summary",
+        "content": "question 0 answer 0 question 1 answer 1",
+    }
+    assert [item["content"] for item in history[1:]] == ["question 2", "answer 2"]
+    assert summarizer.calls[-1][0] == "question 0 answer 0 question 1"
+
+
+def test_history_is_capped_by_token_budget_newest_first() -> None:
+    store = InMemorySessionStore()
+    store.set_summary("s", "one two")
+    for idx in range(5):
+        store.append("s", "user", f"w{idx} w w")
+    memory = ConversationMemory(
+        _settings(SESSION_HISTORY_TOKEN_BUDGET=8), store, token_counter=_word_count
+    )
+
+    history = asyncio.run(memory.aget("s"))
+
+    # 2 summary words leave room for two 3-word messages.
+    assert [item["content"] for item in history] == ["one two", "w3 w w", "w4 w w"]
+
+
+def test_budget_trims_whole_turns_and_never_orphans_a_reply() -> None:
+    store = InMemorySessionStore()
+    store.append_turn("s", "old question", "old answer")
+    store.append_turn("s", "new question", "a long new answer")
+    memory = ConversationMemory(
+        _settings(SESSION_HISTORY_TOKEN_BUDGET=8), store, token_counter=_word_count
+    )
+
+    history = memory.get("s")
+
+    # "old answer" alone would fit the 2 words left, but not without its question.
+    assert [item["content"] for item in history] == ["new question", "a long new answer"]
+
+
+def test_close_services_drains_the_summarizer_on_shutdown(monkeypatch) -> None:
+    from conversational_agent.api import deps
+
+    memory = ConversationMemory(
+        _settings(), InMemorySessionStore(max_messages=2), RecordingSummarizer()
+    )
+    memory.append_turn("s", "q0", "a0")
+    memory.append_turn("s", "q1", "a1")
+    monkeypatch.setattr(deps, "get_session_store", lru_cache(maxsize=1)(lambda: memory))
+    deps.get_session_store()
+
+    deps.close_services()
+
+    # The queued fold finished before shutdown returned.
+    assert memory.get("s")[0] == {"role": "summary", "content": "q0 a0"}
@@ -0,0 +1,63 @@
+import sqlite3
+
+from conversational_agent.infrastructure.embedding_cache import EmbeddingCache
+
+
+def test_embedding_cache_persists_to_disk(tmp_path) -> None:
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache(model_id="model-a", max_memory_entries=10, path=path)
+    cache.put_many(["hello  world"], [[0.5, 0.25]])
+    cache.close()
+
+    reopened = EmbeddingCache(model_id="model-a", max_memory_entries=10, path=path)
+    vectors = reopened.get_many(["hello world", "unseen"])
+    stats = reopened.stats()
+
+    assert vectors == [[0.5, 0.25], None]
+    assert stats.hits == 1 and stats.misses == 1
+    assert stats.hit_ratio == 0.5
+    assert stats.disk_bytes > 0
+
+
+def test_embedding_cache_is_keyed_by_model_and_bounded() -> None:
+    cache = EmbeddingCache(model_id="model-a", max_memory_entries=2)
+    other_model = EmbeddingCache(model_id="model-b", max_memory_entries=2)
+    cache.put_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+
+    assert cache.key("a") != other_model.key("a")
+    assert cache.get_many(["a", "b", "c"]) == [None, [2.0], [3.0]]
+    assert cache.stats().memory_bytes == 8
+
+
+def test_embedding_cache_batches_disk_writes_and_bounds_the_file(tmp_path) -> None:
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache(
+        model_id="model-a", max_memory_entries=1, path=path, max_disk_entries=2, commit_every=100
+    )
+    cache.put_many(["a", "b"], [[1.0], [2.0]])
+    cache.put_many(["c"], [[3.0]])
+    # Nothing is written yet, but buffered rows still answer lookups.
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM embeddings").fetchone() == (0,)
+    assert cache.get_many(["a"]) == [[1.0]]
+
+    cache.flush()
+    cache.close()
+
+    reopened = EmbeddingCache(model_id="model-a", max_memory_entries=10, path=path)
+    # "b" was the least recently used row once "a" was read again.
+    assert reopened.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+
+def test_memory_hits_keep_rows_recent_on_disk(tmp_path) -> None:
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache(
+        model_id="model-a", max_memory_entries=10, path=path, max_disk_entries=2, commit_every=1
+    )
+    cache.put_many(["a"], [[1.0]])
+    cache.put_many(["b"], [[2.0]])
+    cache.get_many(["a"])  # served from memory
+    cache.put_many(["c"], [[3.0]])
+    cache.close()
+
+    reopened = EmbeddingCache(model_id="model-a", max_memory_entries=10, path=path)
+    assert reopened.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
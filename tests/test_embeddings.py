@@ -0,0 +1,112 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.embeddings import EmbeddingClient
+
+
+class FakeBedrockRuntime:
+    """Local stand-in for the ``bedrock-runtime`` client used by EmbeddingClient."""
+
+    def __init__(self, throttle_first: int = 0, delay: float = 0.0) -> None:
+        self._throttle_remaining = throttle_first
+        self._delay = delay
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    def invoke_model(self, modelId: str, body: str, accept: str, contentType: str) -> dict:
+        text = json.loads(body)["inputText"]
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            throttle = self._throttle_remaining > 0
+            if throttle:
+                self._throttle_remaining -= 1
+        try:
+            time.sleep(self._delay)
+            if throttle:
+                raise ClientError(
+                    {"Error": {"Code": "ThrottlingException", "Message": "slow down"}},
+                    "InvokeModel",
+                )
+            payload = {"embedding": [float(len(text)), 1.0]}
+            return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def _settings(**overrides: object) -> Settings:
+    values = {
+        "GROQ_API_KEY": "x",
+        "PINECONE_API_KEY": "x",
+        "BACKEND_PROVIDER": "aws",
+        "EMBEDDING_RETRY_BASE_SECONDS": 0.001,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_bedrock_embed_documents_is_concurrent_and_ordered() -> None:
+    fake = FakeBedrockRuntime(delay=0.01)
+    client = EmbeddingClient(_settings(EMBEDDING_MAX_CONCURRENCY=4), bedrock_client=fake)
+    texts = ["a" * n for n in range(1, 21)]
+
+    vectors = client.embed_documents(texts)
+
+    assert fake.calls == 20
+    assert 1 < fake.max_in_flight <= 4
+    lengths = [round(vector[0] / vector[1]) for vector in vectors]
+    assert lengths == list(range(1, 21))
+
+
+def test_bedrock_embed_retries_throttling() -> None:
+    fake = FakeBedrockRuntime(throttle_first=3)
+    client = EmbeddingClient(_settings(EMBEDDING_MAX_RETRIES=5), bedrock_client=fake)
+
+    vectors = client.embed_documents(["hello", "world"])
+
+    assert len(vectors) == 2
+    assert fake.calls == 5
+
+
+def test_bedrock_embed_gives_up_after_max_retries() -> None:
+    fake = FakeBedrockRuntime(throttle_first=10)
+    client = EmbeddingClient(_settings(EMBEDDING_MAX_RETRIES=2), bedrock_client=fake)
+
+    with pytest.raises(ClientError):
+        client.embed_query("hello")
+
+
+def test_embed_documents_only_sends_cache_misses() -> None:
+    fake = FakeBedrockRuntime()
+    client = EmbeddingClient(_settings(), bedrock_client=fake)
+
+    first = client.embed_documents(["alpha", "beta", "alpha"])
+    second = client.embed_documents(["beta", "gamma"])
+
+    assert fake.calls == 3
+    assert first[0] == first[2]
+    assert second[0] == pytest.approx(first[1], rel=1e-6)
+    assert client.cache is not None and client.cache.stats().hits == 1
+
+
+def test_embed_documents_persists_each_batch_without_close(tmp_path) -> None:
+    path = str(tmp_path / "embeddings.sqlite")
+    settings = _settings(EMBEDDING_CACHE_PATH=path)
+    client = EmbeddingClient(settings, bedrock_client=FakeBedrockRuntime())
+
+    client.embed_documents(["alpha", "beta"])
+
+    # No close(): a run that ends here must still have its vectors on disk.
+    reopened = EmbeddingClient(settings, bedrock_client=FakeBedrockRuntime())
+    assert reopened.cache is not None
+    assert None not in reopened.cache.get_many(["alpha", "beta"])
@@ -0,0 +1,109 @@
+import re
+from typing import Any
+
+from conversational_agent.core.config import Settings
+from conversational_agent.services.ingestion_manifest import ChunkManifestStore
+from conversational_agent.services.ingestion_service import IngestionService
+from conversational_agent.utils import text as text_utils
+
+
+class FakeEmbeddings:
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeVectorStore:
+    def __init__(self) -> None:
+        self.vectors: dict[str, dict[str, Any]] = {}
+
+    def upsert(self, vectors: list[dict[str, Any]]) -> None:
+        for item in vectors:
+            self.vectors[item["id"]] = dict(item["metadata"])
+
+    def update_metadata(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        for vector_id, metadata in updates:
+            self.vectors[vector_id].update(metadata)
+
+    def delete(self, ids: list[str]) -> None:
+        for vector_id in ids:
+            self.vectors.pop(vector_id)
+
+
+def _service(tmp_path) -> tuple[IngestionService, FakeEmbeddings, FakeVectorStore]:
+    settings = Settings(
+        GROQ_API_KEY="x", PINECONE_API_KEY="x", CHUNK_SIZE=60, CHUNK_OVERLAP=10
+    )
+    embeddings = FakeEmbeddings()
+    vector_store = FakeVectorStore()
+    service = IngestionService(
+        settings, embeddings, vector_store, manifests=ChunkManifestStore(str(tmp_path))
+    )
+    return service, embeddings, vector_store
+
+
+PAGES = [
+    "Alpha page talks about installation and setup of the product.",
+    "Beta page covers configuration options and environment variables.",
+    "Gamma page lists error codes such as E1001 and E2002 in detail.",
+]
+
+
+def test_reingesting_unchanged_document_embeds_nothing(tmp_path) -> None:
+    service, embeddings, vector_store = _service(tmp_path)
+    first = service.ingest_pages(PAGES, "manual", "manual.pdf")
+    embedded_once = len(embeddings.embedded)
+
+    second = service.ingest_pages(PAGES, "manual", "manual.pdf")
+
+    assert first == second == len(vector_store.vectors)
+    assert len(embeddings.embedded) == embedded_once
+
+
+def test_reingest_only_embeds_changed_pages_and_deletes_vanished_chunks(tmp_path) -> None:
+    service, embeddings, vector_store = _service(tmp_path)
+    service.ingest_pages(PAGES, "manual", "manual.pdf")
+    before = set(vector_store.vectors)
+    embeddings.embedded.clear()
+
+    revised = [PAGES[0], PAGES[2]]
+    count = service.ingest_pages(revised, "manual", "manual.pdf")
+
+    assert count == len(vector_store.vectors)
+    assert not any("Alpha" in text for text in embeddings.embedded)
+    assert before - set(vector_store.vectors)
+    indexes = sorted(meta["chunk_index"] for meta in vector_store.vectors.values())
+    assert indexes == list(range(count))
+
+
+class WordEncoding:
+    """One token per word, with its leading whitespace, like BPE encodings."""
+
+    def encode(self, text: str, disallowed_special=()) -> list[int]:
+        return [match.start() for match in re.finditer(r"\s*\S+", text)]
+
+    def decode_with_offsets(self, tokens: list[int]) -> tuple[str, list[int]]:
+        return "", list(tokens)
+
+
+def test_token_mode_carries_the_last_overlap_tokens_across_pages(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(text_utils, "_encoding", lambda name: WordEncoding())
+    settings = Settings(
+        GROQ_API_KEY="x",
+        PINECONE_API_KEY="x",
+        CHUNK_MODE="tokens",
+        CHUNK_SIZE=40,
+        CHUNK_OVERLAP=3,
+    )
+    embeddings = FakeEmbeddings()
+    service = IngestionService(
+        settings, embeddings, FakeVectorStore(), manifests=ChunkManifestStore(str(tmp_path))
+    )
+
+    service.ingest_pages(PAGES[:2], "manual", "manual.pdf")
+
+    # Three tokens of page one, not three characters.
+    assert embeddings.embedded[1].startswith("of the product.\nBeta page")
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from prometheus_client import REGISTRY
+
+from conversational_agent.agent.graph import AgentService
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.vector_store import VectorMatch
+from conversational_agent.observability.instrumentation import (
+    configure_instrumentation,
+    instrument,
+)
+from conversational_agent.services.chat_service import (
+    ChatService,
+    InMemoryResponseCache,
+    InMemorySessionStore,
+)
+from conversational_agent.services.retrieval_service import RetrievalService
+
+
+class Embeddings:
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class VectorStore:
+    async def aquery(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        return [VectorMatch(id="doc-0", score=0.9, metadata={"text": "hello"})]
+
+
+def _settings(**overrides: object) -> Settings:
+    return Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x", **overrides)
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    configure_instrumentation(_settings(), tracer_provider=provider)
+    yield exporter
+    configure_instrumentation(_settings(STAGE_METRICS_ENABLED=False, OTEL_ENABLED=False))
+
+
+def _count(stage: str) -> float:
+    return REGISTRY.get_sample_value("chat_stage_duration_seconds_count", {"stage": stage}) or 0
+
+
+def test_chat_turn_records_nested_stage_spans_and_histograms(spans, scripted_llm) -> None:
+    retrieval = RetrievalService(_settings(), Embeddings(), VectorStore())
+    tool_call = {"name": "search_knowledge_base", "args": {"query": "what is rag"}, "id": "c-1"}
+    llm = scripted_llm(
+        [AIMessage(content="", tool_calls=[tool_call]), AIMessage(content="grounded")]
+    )
+    service = ChatService(
+        AgentService(_settings(), retrieval, llm=llm),
+        retrieval,
+        InMemorySessionStore(),
+        InMemoryResponseCache(),
+    )
+    llm_calls = _count("agent.llm")
+
+    asyncio.run(service.achat("s1", "what is rag"))
+
+    finished = {span.name: span for span in spans.get_finished_spans()}
+    assert {
+        "retrieval.search",
+        "session.prefetch",
+        "agent.run",
+        "agent.llm",
+        "agent.tool",
+        "cache.store",
+        "session.append",
+    } <= set(finished)
+    run_id = finished["agent.run"].context.span_id
+    assert finished["agent.llm"].parent.span_id == run_id
+    assert finished["agent.tool"].parent.span_id == run_id
+    assert finished["session.prefetch"].attributes["cache.hit"] is False
+    assert _count("agent.llm") == llm_calls + 2
+
+
+def test_disabled_instrumentation_is_a_shared_no_op() -> None:
+    configure_instrumentation(_settings(STAGE_METRICS_ENABLED=False, OTEL_ENABLED=False))
+
+    assert instrument("vector.query") is instrument("agent.llm")
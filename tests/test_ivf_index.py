@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+
+from conversational_agent.infrastructure.local_vector_store import LocalVectorIndex
+
+
+def _clustered(rng: np.random.Generator, count: int, clusters: int, dimension: int) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dimension))
+    labels = rng.integers(0, clusters, size=count)
+    return (centers[labels] + 0.2 * rng.normal(size=(count, dimension))).astype(np.float32)
+
+
+def _records(vectors: np.ndarray, offset: int = 0) -> list[dict]:
+    return [
+        {"id": f"doc-{offset + idx}", "values": vector.tolist(), "metadata": {}}
+        for idx, vector in enumerate(vectors)
+    ]
+
+
+def _exact_ids(vectors: np.ndarray, query: np.ndarray, top_k: int) -> set[str]:
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return {f"doc-{idx}" for idx in np.argsort(-(unit @ query))[:top_k]}
+
+
+def test_ivf_index_recall_on_clustered_data(tmp_path) -> None:
+    rng = np.random.default_rng(1)
+    vectors = _clustered(rng, 4000, clusters=32, dimension=16)
+    index = LocalVectorIndex(str(tmp_path), 16, index_type="ivf", ivf_nlist=16, ivf_nprobe=4)
+    index.upsert(_records(vectors))
+
+    hits = 0
+    for query in vectors[rng.choice(len(vectors), 50, replace=False)]:
+        query = query / np.linalg.norm(query)
+        found = {vector_id for vector_id, _, _ in index.query(query.tolist(), top_k=10)}
+        hits += len(found & _exact_ids(vectors, query, 10))
+    assert hits / 500 >= 0.9
+
+    exhaustive = index.query(vectors[0].tolist(), top_k=10, nprobe=16)
+    assert {vector_id for vector_id, _, _ in exhaustive} == _exact_ids(
+        vectors, vectors[0] / np.linalg.norm(vectors[0]), 10
+    )
+
+
+def test_ivf_index_persists_and_indexes_incremental_upserts(tmp_path) -> None:
+    rng = np.random.default_rng(2)
+    vectors = _clustered(rng, 1000, clusters=8, dimension=8)
+    index = LocalVectorIndex(str(tmp_path), 8, index_type="ivf", ivf_nlist=8, ivf_nprobe=2)
+    index.upsert(_records(vectors))
+    index.close()
+
+    reopened = LocalVectorIndex(str(tmp_path), 8, index_type="ivf", ivf_nlist=8, ivf_nprobe=2)
+    assert (tmp_path / "ivf_centroids.npy").exists()
+    extra = np.eye(8, dtype=np.float32)[:1] * 50
+    reopened.upsert(_records(extra, offset=1000))
+    assert reopened.query(extra[0].tolist(), top_k=1)[0][0] == "doc-1000"
+
+    reopened.delete(["doc-1000"])
+    assert all(vector_id != "doc-1000" for vector_id, _, _ in reopened.query(extra[0].tolist(), 5))
+
+
+def test_ivf_trains_in_the_background_without_blocking_queries(tmp_path) -> None:
+    rng = np.random.default_rng(3)
+    vectors = _clustered(rng, 400, clusters=4, dimension=8)
+    index = LocalVectorIndex(str(tmp_path), 8, index_type="ivf", ivf_nlist=4, ivf_nprobe=1)
+    release = threading.Event()
+    fit = index._ivf.fit
+    index._ivf.fit = lambda sample: release.wait(5) and fit(sample)
+
+    index.upsert(_records(vectors))
+    # k-means is stalled, yet queries and writes go through on brute force.
+    assert index.query(vectors[0].tolist(), top_k=1)[0][0] == "doc-0"
+    extra = np.eye(8, dtype=np.float32)[:1] * 50
+    index.upsert(_records(extra, offset=400))
+
+    release.set()
+    index.wait_for_training()
+    assert index._ivf.trained
+    # The row written mid-training is assigned to a list by the swap.
+    assert index.query(extra[0].tolist(), top_k=1)[0][0] == "doc-400"
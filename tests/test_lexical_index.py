@@ -0,0 +1,153 @@
+import json
+import threading
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.lexical_index import (
+    BM25Index,
+    build_lexical_index,
+    tokenize,
+)
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+from conversational_agent.infrastructure.vector_store import VectorMatch
+from conversational_agent.services.retrieval_service import RetrievalService
+
+
+def _record(vector_id: str, text: str) -> dict:
+    return {"id": vector_id, "values": [], "metadata": {"text": text, "chunk_index": 0}}
+
+
+def test_tokenize_keeps_codes_and_their_parts() -> None:
+    assert tokenize("Replace part AB-1234 (error E1001).") == [
+        "replace",
+        "part",
+        "ab-1234",
+        "ab",
+        "1234",
+        "error",
+        "e1001",
+    ]
+
+
+def test_bm25_ranks_exact_identifier_and_tracks_updates(tmp_path) -> None:
+    path = str(tmp_path / "bm25.sqlite")
+    index = BM25Index(path)
+    index.add(
+        [
+            _record("a", "The pump manual covers maintenance of the pump housing."),
+            _record("b", "Error E1001 means the pump housing sensor AB-1234 failed."),
+            _record("c", "General safety notes for every pump model."),
+        ]
+    )
+
+    assert [match.id for match in index.search("what does E1001 mean", top_k=3)] == ["b"]
+    assert index.search("pump housing", top_k=1)[0].id in {"a", "b"}
+
+    index.add([_record("b", "Error E2002 means low pressure.")])
+    index.delete(["c"])
+    index.update_metadata([("a", {"chunk_index": 4})])
+    index.close()
+
+    reopened = BM25Index(path)
+    assert len(reopened) == 2
+    assert reopened.search("E1001", top_k=3) == []
+    assert reopened.search("e2002", top_k=3)[0].id == "b"
+    assert reopened.search("manual", top_k=1)[0].metadata["chunk_index"] == 4
+
+
+def test_bm25_search_does_not_wait_for_writers(tmp_path) -> None:
+    index = BM25Index(str(tmp_path / "bm25.sqlite"))
+    index.add([_record("a", "Error E1001 means the sensor failed.")])
+    results: list[list[VectorMatch]] = []
+
+    with index._lock:  # a writer holding the lock mid-batch
+        reader = threading.Thread(target=lambda: results.append(index.search("e1001", 1)))
+        reader.start()
+        reader.join(timeout=5)
+
+    assert results and results[0][0].id == "a"
+    index.close()
+
+
+def test_bm25_keeps_only_filterable_fields_and_reads_the_rest_from_the_store(tmp_path) -> None:
+    stored = {"a": {"text": "Error E1001 means the sensor failed.", "source": "manual"}}
+    fetched: list[list[str]] = []
+
+    def fetch_metadata(ids: list[str]) -> dict[str, dict]:
+        fetched.append(ids)
+        return {vector_id: stored[vector_id] for vector_id in ids if vector_id in stored}
+
+    index = BM25Index(str(tmp_path / "bm25.sqlite"), metadata_source=fetch_metadata)
+    index.add([{"id": "a", "values": [], "metadata": {**stored["a"], "tags": ["x"]}}])
+
+    (row,) = index._db.execute("SELECT metadata FROM documents").fetchall()
+    assert json.loads(row[0]) == {"source": "manual"}
+    matches = index.search("e1001", top_k=1, filters=MetadataFilter.parse({"source": "manual"}))
+    assert matches[0].metadata == stored["a"]
+    assert fetched == [["a"]]
+    index.close()
+
+
+def test_bm25_replaces_and_deletes_more_ids_than_one_query_binds(tmp_path) -> None:
+    index = BM25Index(str(tmp_path / "bm25.sqlite"))
+    records = [_record(f"doc-{idx}", f"word{idx} shared") for idx in range(1200)]
+    index.add(records)
+    index.add(records)
+
+    assert len(index) == 1200
+    index.delete([record["id"] for record in records[:1100]])
+    assert len(index) == 100
+    assert index.search("word1150", top_k=1)[0].id == "doc-1150"
+    index.close()
+
+
+def test_lexical_index_follows_retrieval_mode_unless_set(tmp_path) -> None:
+    path = str(tmp_path / "bm25.sqlite")
+
+    def build(**overrides: str):
+        settings = Settings(
+            GROQ_API_KEY="x",
+            PINECONE_API_KEY="x",
+            BACKEND_PROVIDER="local",
+            LEXICAL_INDEX_PATH=path,
+            **overrides,
+        )
+        return build_lexical_index(settings, FakeVectorStore())  # type: ignore[arg-type]
+
+    assert build() is None
+    assert isinstance(build(RETRIEVAL_MODE="hybrid"), BM25Index)
+    assert isinstance(build(LEXICAL_INDEX_ENABLED="true"), BM25Index)
+
+
+class FakeEmbeddings:
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class FakeVectorStore:
+    def query(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        return [VectorMatch(id=f"v{idx}", score=0.9, metadata={}) for idx in range(top_k)]
+
+    def fetch_metadata(self, ids: list[str]) -> dict[str, dict]:
+        return {}
+
+
+class FakeLexicalIndex:
+    def search(self, query: str, top_k: int, filters=None) -> list[VectorMatch]:
+        return [
+            VectorMatch(id="exact", score=12.0, metadata={"text": "AB-1234"}),
+            VectorMatch(id="v3", score=4.0, metadata={}),
+        ]
+
+
+def test_hybrid_search_fuses_both_legs_with_rrf() -> None:
+    settings = Settings(
+        GROQ_API_KEY="x", PINECONE_API_KEY="x", RETRIEVAL_MODE="hybrid", TOP_K=3
+    )
+    service = RetrievalService(settings, FakeEmbeddings(), FakeVectorStore(), FakeLexicalIndex())
+
+    sources = service.search("AB-1234")
+
+    # v3 is found by both legs, the exact lexical hit ranks first in its leg.
+    assert [source.id for source in sources] == ["v3", "exact", "v0"]
+    assert sources[1].text == "AB-1234"
+    assert sources[0].score == 1 / 64 + 1 / 62
@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.local_vector_store import LocalVectorIndex
+from conversational_agent.infrastructure.vector_store import VectorStore
+
+
+def _records(vectors: np.ndarray, prefix: str = "doc") -> list[dict]:
+    return [
+        {"id": f"{prefix}-{idx}", "values": vector.tolist(), "metadata": {"chunk_index": idx}}
+        for idx, vector in enumerate(vectors)
+    ]
+
+
+def test_local_index_matches_exact_cosine_top_k(tmp_path) -> None:
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(3000, 16)).astype(np.float32)
+    index = LocalVectorIndex(str(tmp_path), dimension=16)
+    index.upsert(_records(vectors))
+
+    query = rng.normal(size=16).astype(np.float32)
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+
+    results = index.query(query.tolist(), top_k=5)
+
+    assert [vector_id for vector_id, _, _ in results] == [f"doc-{idx}" for idx in expected]
+    assert results[0][2] == {"chunk_index": int(expected[0])}
+
+
+def test_local_index_persists_deletes_and_reuses_rows(tmp_path) -> None:
+    index = LocalVectorIndex(str(tmp_path), dimension=2)
+    index.upsert(_records(np.array([[1.0, 0.0], [0.0, 1.0]])))
+    index.delete(["doc-0"])
+    index.update_metadata([("doc-1", {"path": "a.pdf"})])
+    index.close()
+
+    reopened = LocalVectorIndex(str(tmp_path), dimension=2)
+    assert len(reopened) == 1
+    assert reopened.query([1.0, 0.0], top_k=3)[0][0] == "doc-1"
+    assert reopened.query([0.0, 1.0], top_k=1)[0][2] == {"chunk_index": 1, "path": "a.pdf"}
+
+    reopened.upsert(_records(np.array([[1.0, 1.0]]), prefix="new"))
+    assert [vector_id for vector_id, _, _ in reopened.query([1.0, 0.0], top_k=2)] == [
+        "new-0",
+        "doc-1",
+    ]
+
+
+def test_vector_store_local_provider(tmp_path) -> None:
+    settings = Settings(
+        GROQ_API_KEY="x",
+        PINECONE_API_KEY="x",
+        BACKEND_PROVIDER="local",
+        LOCAL_VECTOR_STORE_PATH=str(tmp_path),
+        EMBEDDING_DIMENSION=2,
+    )
+    store = VectorStore(settings)
+    store.upsert(_records(np.array([[1.0, 0.0], [0.6, 0.8]])))
+
+    matches = store.query([1.0, 0.0], top_k=1)
+
+    assert matches[0].id == "doc-0"
+    assert matches[0].score == 1.0
+
+
+def test_local_index_query_many_matches_single_queries(tmp_path) -> None:
+    rng = np.random.default_rng(3)
+    index = LocalVectorIndex(str(tmp_path), dimension=8)
+    index.upsert(_records(rng.normal(size=(500, 8)).astype(np.float32)))
+    index.delete(["doc-7"])
+    queries = rng.normal(size=(6, 8)).astype(np.float32).tolist()
+
+    assert index.query_many(queries, top_k=4) == [index.query(query, 4) for query in queries]
+
+
+def test_concurrent_queries_read_metadata_on_their_own_connections(tmp_path) -> None:
+    index = LocalVectorIndex(str(tmp_path), dimension=2)
+    index.upsert(_records(np.array([[1.0, 0.0], [0.0, 1.0]])))
+    barrier = threading.Barrier(8)
+    results: list[list] = []
+
+    def query() -> None:
+        barrier.wait()
+        results.append([index.query([1.0, 0.0], top_k=2) for _ in range(50)])
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(index._readers) == 8
+    expected = index.query([1.0, 0.0], top_k=2)
+    assert all(batch == [expected] * 50 for batch in results)
+    index.close()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.local_vector_store import LocalVectorIndex
+from conversational_agent.infrastructure.metadata_filter import MetadataFilter
+from conversational_agent.infrastructure.vector_store import opensearch_index_body
+
+
+def test_filter_translates_to_backend_syntax() -> None:
+    filters = MetadataFilter.parse(
+        {"source_id": "manual", "path": {"$in": ["a.pdf", "b.pdf"]}, "chunk_index": {"$gte": 2}}
+    )
+
+    assert filters.to_pinecone() == {
+        "$and": [
+            {"source_id": {"$eq": "manual"}},
+            {"path": {"$in": ["a.pdf", "b.pdf"]}},
+            {"chunk_index": {"$gte": 2}},
+        ]
+    }
+    assert filters.to_opensearch() == [
+        {"term": {"metadata.source_id.keyword": "manual"}},
+        {"terms": {"metadata.path.keyword": ["a.pdf", "b.pdf"]}},
+        {"range": {"metadata.chunk_index": {"gte": 2}}},
+    ]
+    assert filters.matches({"source_id": "manual", "path": "b.pdf", "chunk_index": 3})
+    assert not filters.matches({"source_id": "manual", "path": "b.pdf", "chunk_index": 1})
+    assert MetadataFilter.parse(None) is None
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        {"chunk_index": {"$regex": "x"}},
+        {"path": {"$in": []}},
+        {"chunk_index": {"$lt": "10"}},
+        {"text": "secret"},
+        {"source_id": {"nested": "object"}},
+    ],
+)
+def test_invalid_filters_are_rejected(expression) -> None:
+    with pytest.raises(ValueError):
+        MetadataFilter.parse(expression)
+
+
+def _records(count: int, rng: np.random.Generator) -> list[dict]:
+    return [
+        {
+            "id": f"doc-{idx}",
+            "values": rng.normal(size=8).tolist(),
+            "metadata": {"source_id": f"tenant-{idx % 4}", "chunk_index": idx, "text": "t"},
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf"])
+def test_local_index_applies_filters_inside_the_search(tmp_path, index_type) -> None:
+    rng = np.random.default_rng(5)
+    index = LocalVectorIndex(str(tmp_path), 8, index_type=index_type, ivf_nlist=4, ivf_nprobe=1)
+    index.upsert(_records(400, rng))
+    query = rng.normal(size=8).tolist()
+
+    tenant = MetadataFilter.parse({"source_id": "tenant-2", "chunk_index": {"$lt": 40}})
+    results = index.query(query, top_k=20, filters=tenant)
+    assert len(results) == 10
+    assert all(metadata["source_id"] == "tenant-2" for _, _, metadata in results)
+
+    index.update_metadata([("doc-2", {"source_id": "tenant-9"})])
+    index.delete(["doc-6"])
+    index.close()
+    reopened = LocalVectorIndex(str(tmp_path), 8, index_type=index_type, ivf_nlist=4)
+    ids = {vector_id for vector_id, _, _ in reopened.query(query, top_k=20, filters=tenant)}
+    assert len(ids) == 8 and "doc-2" not in ids and "doc-6" not in ids
+
+    moved = MetadataFilter.parse({"source_id": {"$in": ["tenant-9"]}})
+    assert [vector_id for vector_id, _, _ in reopened.query(query, 5, filters=moved)] == ["doc-2"]
+
+
+def test_opensearch_mapping_uses_a_space_faiss_accepts_on_older_domains() -> None:
+    settings = Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x", EMBEDDING_DIMENSION=8)
+
+    vector = opensearch_index_body(settings)["mappings"]["properties"]["vector"]
+
+    assert vector["dimension"] == 8
+    assert vector["method"] == {"name": "hnsw", "space_type": "innerproduct", "engine": "faiss"}
@@ -0,0 +1,51 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from conversational_agent.observability.metrics import UNMATCHED_PATH, register_metrics
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    register_metrics(app)
+
+    @app.post("/items/{item_id}")
+    def update(item_id: str, body: dict) -> dict:
+        return {"id": item_id}
+
+    return app
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_labelled_by_route_template_with_body_sizes() -> None:
+    template = "/items/{item_id}"
+    before = _sample("http_requests_total", method="POST", path=template, status_code="200")
+    request_bytes = _sample("http_request_body_bytes_sum", method="POST", path=template)
+    client = TestClient(_app())
+
+    for item_id in ("a", "b", "c"):
+        assert client.post(f"/items/{item_id}", json={"x": 1}).status_code == 200
+
+    assert _sample(
+        "http_requests_total", method="POST", path=template, status_code="200"
+    ) == before + 3
+    assert _sample("http_request_body_bytes_sum", method="POST", path=template) == (
+        request_bytes + 3 * len(b'{"x":1}')
+    )
+    assert _sample("http_requests_total", method="POST", path="/items/a", status_code="200") == 0
+    assert _sample("http_requests_in_flight", method="POST") == 0
+
+
+def test_unmatched_urls_share_one_label() -> None:
+    before = _sample("http_requests_total", method="GET", path=UNMATCHED_PATH, status_code="404")
+    client = TestClient(_app())
+
+    for junk in ("/wp-admin", "/.env", "/x/y/z"):
+        assert client.get(junk).status_code == 404
+
+    assert _sample(
+        "http_requests_total", method="GET", path=UNMATCHED_PATH, status_code="404"
+    ) == before + 3
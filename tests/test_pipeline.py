@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from conversational_agent.utils.pipeline import batched, prefetch
+
+
+def test_batched_splits_into_fixed_size_lists() -> None:
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_prefetch_preserves_order() -> None:
+    assert list(prefetch(iter(range(100)), maxsize=4)) == list(range(100))
+
+
+def test_prefetch_reraises_producer_errors() -> None:
+    def _items():
+        yield 1
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        list(prefetch(_items(), maxsize=2))
+
+
+def test_prefetch_bounds_how_far_producer_runs_ahead() -> None:
+    produced = 0
+    lock = threading.Lock()
+
+    def _items():
+        nonlocal produced
+        for item in range(1000):
+            with lock:
+                produced += 1
+            yield item
+
+    stream = prefetch(_items(), maxsize=3)
+    assert next(stream) == 0
+    time.sleep(0.3)
+    with lock:
+        assert produced <= 5
+    stream.close()
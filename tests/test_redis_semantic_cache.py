@@ -0,0 +1,155 @@
+from typing import Any
+
+import pytest
+
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import ChatResponse
+from conversational_agent.services import semantic_cache
+from conversational_agent.services.semantic_cache import RedisSemanticCache
+
+
+class StreamRedis:
+    """Just enough of a Redis client for the semantic cache's hash, list and stream use."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.lists: dict[str, list[bytes]] = {}
+        self.streams: dict[str, list[tuple[bytes, dict[bytes, bytes]]]] = {}
+        self.commands: list[str] = []
+        self._sequence = 0
+
+    def pipeline(self, transaction: bool = True) -> "Pipeline":
+        return Pipeline(self)
+
+    def hset(self, name: str, key: str, value: Any) -> int:
+        self.commands.append("hset")
+        self.hashes.setdefault(name, {})[key.encode()] = _bytes(value)
+        return 1
+
+    def hget(self, name: str, key: str) -> bytes | None:
+        self.commands.append("hget")
+        return self.hashes.get(name, {}).get(key.encode())
+
+    def hdel(self, name: str, *keys: str) -> int:
+        self.commands.append("hdel")
+        return sum(self.hashes.get(name, {}).pop(key.encode(), None) is not None for key in keys)
+
+    def xadd(self, name: str, fields: dict, maxlen: int, approximate: bool) -> bytes:
+        self.commands.append("xadd")
+        self._sequence += 1
+        entry_id = f"1-{self._sequence}".encode()
+        stream = self.streams.setdefault(name, [])
+        stream.append((entry_id, {key.encode(): _bytes(value) for key, value in fields.items()}))
+        del stream[:-maxlen]
+        return entry_id
+
+    def xrange(self, name: str, start: bytes, count: int) -> list:
+        self.commands.append("xrange")
+        # Inclusive start only, like servers before Redis 6.2.
+        assert not start.startswith(b"(")
+        first = tuple(int(part) for part in start.split(b"-"))
+        entries = self.streams.get(name, [])
+        return [
+            entry
+            for entry in entries
+            if tuple(int(part) for part in entry[0].split(b"-")) >= first
+        ][:count]
+
+    def lpush(self, name: str, value: str) -> int:
+        self.commands.append("lpush")
+        self.lists.setdefault(name, []).insert(0, value.encode())
+        return len(self.lists[name])
+
+    def lrange(self, name: str, start: int, end: int) -> list[bytes]:
+        self.commands.append("lrange")
+        return self.lists.get(name, [])[start:]
+
+    def ltrim(self, name: str, start: int, end: int) -> bool:
+        self.commands.append("ltrim")
+        self.lists[name] = self.lists.get(name, [])[start : end + 1]
+        return True
+
+
+class Pipeline:
+    def __init__(self, client: StreamRedis) -> None:
+        self._client = client
+        self._calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list[Any]:
+        return [getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+def _bytes(value: Any) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+@pytest.fixture
+def redis_client(monkeypatch) -> StreamRedis:
+    client = StreamRedis()
+    monkeypatch.setattr(semantic_cache, "sync_redis", lambda settings, **kwargs: client)
+    monkeypatch.setattr(semantic_cache, "async_redis", lambda settings, **kwargs: client)
+    return client
+
+
+def _settings(**overrides: Any) -> Settings:
+    return Settings(
+        GROQ_API_KEY="x",
+        PINECONE_API_KEY="x",
+        REDIS_URL="redis://test",
+        SEMANTIC_CACHE_THRESHOLD=0.9,
+        SEMANTIC_CACHE_MAX_ENTRIES=2,
+        **overrides,
+    )
+
+
+def test_replicas_sync_only_new_entries_and_trim_without_ttls(redis_client) -> None:
+    writer, reader = RedisSemanticCache(_settings()), RedisSemanticCache(_settings())
+    writer.store([1.0, 0.0], ChatResponse(answer="a", sources=[]))
+
+    assert reader.lookup([1.0, 0.0]).answer == "a"
+    redis_client.commands.clear()
+    assert reader.lookup([1.0, 0.0]).answer == "a"
+    # Nothing new in the stream: one empty XRANGE plus the answer HGET.
+    assert redis_client.commands == ["xrange", "hget"]
+
+    writer.store([0.0, 1.0], ChatResponse(answer="b", sources=[]))
+    writer.store([0.7, 0.7], ChatResponse(answer="c", sources=[]))
+
+    assert reader.lookup([0.0, 1.0]).answer == "b"
+    assert reader.lookup([1.0, 0.0]) is None
+    assert len(redis_client.hashes[RedisSemanticCache._ANSWERS]) == 2
+    assert "expire" not in redis_client.commands
+
+
+def test_expired_entries_miss_at_lookup(redis_client) -> None:
+    cache = RedisSemanticCache(_settings(RESPONSE_CACHE_TTL_SECONDS=-1))
+    cache.store([1.0, 0.0], ChatResponse(answer="a", sources=[]))
+
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_warm_pages_through_the_stream_before_the_first_lookup(
+    redis_client, monkeypatch
+) -> None:
+    monkeypatch.setattr(semantic_cache, "_SYNC_PAGE", 1)
+    writer = RedisSemanticCache(_settings())
+    writer.store([1.0, 0.0], ChatResponse(answer="a", sources=[]))
+    writer.store([0.0, 1.0], ChatResponse(answer="b", sources=[]))
+    replica = RedisSemanticCache(_settings())
+    redis_client.commands.clear()
+
+    replica.warm()
+
+    # One entry per page, then an empty page ends the sync.
+    assert redis_client.commands == ["xrange"] * 3
+    redis_client.commands.clear()
+    assert replica.lookup([1.0, 0.0]).answer == "a"
+    assert replica.lookup([0.0, 1.0]).answer == "b"
+    assert redis_client.commands == ["xrange", "hget"] * 2
@@ -0,0 +1,99 @@
+from typing import Any
+
+import pytest
+
+from conversational_agent.core.config import Settings
+from conversational_agent.services import chat_service
+from conversational_agent.services.chat_service import RedisResponseCache, RedisSessionStore
+
+
+class RecordingRedis:
+    """Just enough of a Redis client to count round trips of list/string commands."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> "RecordingPipeline":
+        return RecordingPipeline(self)
+
+    def get(self, key: str) -> Any:
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.round_trips += 1
+        self.data[key] = value
+
+
+class RecordingPipeline:
+    def __init__(self, client: RecordingRedis) -> None:
+        self._client = client
+        self._commands: list[tuple[str, tuple]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args):
+            self._commands.append((name, args))
+            return self
+
+        return queue
+
+    def execute(self) -> list[Any]:
+        self._client.round_trips += 1
+        data = self._client.data
+        results: list[Any] = []
+        for name, args in self._commands:
+            if name == "rpush":
+                data.setdefault(args[0], []).extend(args[1:])
+                results.append(len(data[args[0]]))
+            elif name == "lrange":
+                items = data.get(args[0], [])
+                end = len(items) if args[2] == -1 else len(items) + args[2] + 1
+                results.append(items[args[1] : max(end, 0)])
+            elif name == "ltrim":
+                data[args[0]] = data.get(args[0], [])[args[1] :]
+                results.append(True)
+            elif name == "get":
+                results.append(data.get(args[0]))
+            else:
+                results.append(True)
+        return results
+
+
+@pytest.fixture
+def redis_client(monkeypatch) -> RecordingRedis:
+    client = RecordingRedis()
+    monkeypatch.setattr(chat_service, "sync_redis", lambda settings, **kwargs: client)
+    monkeypatch.setattr(chat_service, "async_redis", lambda settings, **kwargs: client)
+    return client
+
+
+def _settings() -> Settings:
+    return Settings(
+        GROQ_API_KEY="x", PINECONE_API_KEY="x", REDIS_URL="redis://test", SESSION_MAX_TURNS=2
+    )
+
+
+def test_append_turn_is_one_round_trip_and_trims_to_max_turns(redis_client) -> None:
+    store = RedisSessionStore(_settings())
+
+    evicted = [store.append_turn("s", f"q{idx}", f"a{idx}") for idx in range(3)]
+
+    assert redis_client.round_trips == 3
+    assert evicted[:2] == [[], []]
+    assert [item["content"] for item in evicted[2]] == ["q0", "a0"]
+    assert [item["content"] for item in store.get("s")] == ["q1", "a1", "q2", "a2"]
+
+
+def test_prefetch_reads_history_and_cached_answer_together(redis_client) -> None:
+    store = RedisSessionStore(_settings())
+    cache = RedisResponseCache(_settings())
+    store.append_turn("s", "q0", "a0")
+    cache.set("key", "cached answer")
+    redis_client.round_trips = 0
+
+    history, cached = store.prefetch("s", cache, "key")
+
+    assert redis_client.round_trips == 1
+    assert cached == "cached answer"
+    assert [item["role"] for item in history] == ["user", "assistant"]
@@ -0,0 +1,54 @@
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import SourceSnippet
+from conversational_agent.services.reranker import Reranker
+
+
+class FakeCrossEncoder:
+    def __init__(self) -> None:
+        self.pairs: list[tuple[str, str]] = []
+
+    def predict(self, sentences: list[tuple[str, str]], batch_size: int) -> list[float]:
+        self.pairs.extend(sentences)
+        # Prefers snippets that mention the query's last word.
+        return [float(text.count(query.split()[-1])) for query, text in sentences]
+
+
+def _reranker() -> tuple[Reranker, FakeCrossEncoder]:
+    settings = Settings(
+        GROQ_API_KEY="x", PINECONE_API_KEY="x", RERANK_MAX_CANDIDATES=6, RERANK_SCORE_WINDOW=0.5
+    )
+    model = FakeCrossEncoder()
+    return Reranker(settings, model=model), model
+
+
+def _sources(scores: list[float]) -> list[SourceSnippet]:
+    return [
+        SourceSnippet(id=f"c{idx}", score=score, metadata={}, text=f"chunk {idx}" + " pump" * idx)
+        for idx, score in enumerate(scores)
+    ]
+
+
+def test_confident_query_skips_the_cross_encoder() -> None:
+    reranker, model = _reranker()
+
+    results = reranker.rerank("reset the pump", _sources([0.92, 0.9, 0.31, 0.3, 0.29, 0.28]), 2)
+
+    assert [source.id for source in results] == ["c0", "c1"]
+    assert model.pairs == []
+    assert reranker.stats().skipped == 1
+
+
+def test_flat_scores_are_reranked_and_cached() -> None:
+    reranker, model = _reranker()
+    sources = _sources([0.6] * 6 + [0.2])
+
+    first = reranker.rerank("reset the pump", sources, 2)
+    second = reranker.rerank("Reset the  pump", sources, 2)
+
+    assert [source.id for source in first] == ["c5", "c4"]
+    assert first[0].score == 5.0
+    assert len(model.pairs) == 6
+    assert second == first
+    stats = reranker.stats()
+    assert (stats.reranked, stats.cache_hits, stats.cache_misses) == (2, 6, 6)
+    assert stats.p99_ms >= stats.p50_ms > 0
@@ -0,0 +1,87 @@
+from conversational_agent.agent.tools import RETRIEVAL_CONTEXT_KEY, build_retrieve_tool
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.vector_store import VectorMatch
+from conversational_agent.services.retrieval_service import RetrievalContext, RetrievalService
+
+
+class FakeEmbeddings:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return [1.0, 0.0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [[float(len(text)), 0.0] for text in texts]
+
+
+class FakeVectorStore:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def query(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        self.calls += 1
+        return [VectorMatch(id="doc-0", score=0.9, metadata={"source_id": "doc", "text": "hello"})]
+
+    def query_many(
+        self, vectors: list[list[float]], top_k: int, filters=None
+    ) -> list[list[VectorMatch]]:
+        self.calls += 1
+        return [
+            [VectorMatch(id=f"doc-{int(vector[0])}", score=0.5, metadata={})] for vector in vectors
+        ]
+
+
+def _service() -> tuple[RetrievalService, FakeEmbeddings, FakeVectorStore]:
+    embeddings = FakeEmbeddings()
+    vector_store = FakeVectorStore()
+    settings = Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x")
+    return RetrievalService(settings, embeddings, vector_store), embeddings, vector_store
+
+
+def test_tool_reuses_chat_retrieval_for_same_query() -> None:
+    service, embeddings, vector_store = _service()
+    context = RetrievalContext()
+    sources = service.search("What is RAG?", context=context, stage="chat")
+
+    tool = build_retrieve_tool(service)
+    output = tool.invoke(
+        {"query": "  what is   rag? "},
+        config={"configurable": {RETRIEVAL_CONTEXT_KEY: context}},
+    )
+
+    assert sources[0].id == "doc-0"
+    assert "hello" in output
+    assert embeddings.calls == 1
+    assert vector_store.calls == 1
+    assert context.searches == 1
+
+
+def test_tool_searches_when_query_differs() -> None:
+    service, _, vector_store = _service()
+    context = RetrievalContext()
+    service.search("first question", context=context, stage="chat")
+
+    tool = build_retrieve_tool(service)
+    tool.invoke(
+        {"query": "another question"},
+        config={"configurable": {RETRIEVAL_CONTEXT_KEY: context}},
+    )
+
+    assert vector_store.calls == 2
+    assert context.searches == 2
+
+
+def test_search_many_batches_queries_and_keeps_input_order() -> None:
+    service, embeddings, vector_store = _service()
+    context = RetrievalContext()
+    service.search("What is RAG?", context=context, stage="chat")
+
+    results = service.search_many(["abc", "what is rag?", "abcdef", "ABC"], context=context)
+
+    assert [sources[0].id for sources in results] == ["doc-3", "doc-0", "doc-6", "doc-3"]
+    assert embeddings.calls == 2
+    assert vector_store.calls == 2
+    assert context.searches == 3
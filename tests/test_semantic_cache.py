@@ -0,0 +1,37 @@
+from conversational_agent.core.config import Settings
+from conversational_agent.domain.schemas import ChatResponse
+from conversational_agent.services.semantic_cache import InMemorySemanticCache
+
+
+def _cache(max_entries: int = 4) -> InMemorySemanticCache:
+    return InMemorySemanticCache(threshold=0.9, max_entries=max_entries, ttl_seconds=60)
+
+
+def test_semantic_cache_hits_on_near_duplicate_query() -> None:
+    cache = _cache()
+    cache.store([1.0, 0.0, 0.0], ChatResponse(answer="cached", sources=[]))
+
+    hit = cache.lookup([0.98, 0.05, 0.0])
+    miss = cache.lookup([0.0, 1.0, 0.0])
+
+    assert hit is not None and hit.answer == "cached"
+    assert miss is None
+
+
+def test_semantic_cache_evicts_oldest_entry_when_full() -> None:
+    cache = _cache(max_entries=2)
+    cache.store([1.0, 0.0, 0.0], ChatResponse(answer="a", sources=[]))
+    cache.store([0.0, 1.0, 0.0], ChatResponse(answer="b", sources=[]))
+    cache.store([0.0, 0.0, 1.0], ChatResponse(answer="c", sources=[]))
+
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup([0.0, 0.0, 1.0]).answer == "c"
+
+
+def test_semantic_cache_is_off_by_default_with_its_own_threshold() -> None:
+    settings = Settings(
+        GROQ_API_KEY="x", PINECONE_API_KEY="x", SEMANTIC_SIMILARITY_THRESHOLD=0.5
+    )
+
+    assert settings.semantic_cache_enabled is False
+    assert settings.semantic_cache_threshold == 0.95
@@ -0,0 +1,75 @@
+import numpy as np
+
+from conversational_agent.core.config import Settings
+from conversational_agent.services.semantic_chunker import SemanticChunker
+from conversational_agent.utils.text import split_sentences
+
+
+class TopicEmbeddings:
+    """Embeds each sentence on the axis of the topic word it mentions."""
+
+    TOPICS = ("install", "billing", "security")
+
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(len(texts))
+        return [
+            [1.0 if topic in text.lower() else 0.0 for topic in self.TOPICS] for text in texts
+        ]
+
+
+def _settings(**overrides: object) -> Settings:
+    values = {"GROQ_API_KEY": "x", "PINECONE_API_KEY": "x"}
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_split_sentences_handles_quotes_and_paragraphs() -> None:
+    text = 'Run the installer. It says "done." Then reboot!\n\nbilling starts here'
+
+    assert split_sentences(text) == [
+        "Run the installer.",
+        'It says "done."',
+        "Then reboot!",
+        "billing starts here",
+    ]
+
+
+def test_semantic_chunker_cuts_on_topic_shift() -> None:
+    embeddings = TopicEmbeddings()
+    chunker = SemanticChunker(_settings(SEMANTIC_EMBED_BATCH_SIZE=4), embeddings)
+    text = (
+        "Install the agent. The install needs admin rights. Install logs go to disk. "
+        "Billing is monthly. Billing invoices are emailed. "
+        "Security keys rotate daily."
+    )
+
+    chunks = chunker.chunk(text)
+
+    assert chunks == [
+        "Install the agent. The install needs admin rights. Install logs go to disk.",
+        "Billing is monthly. Billing invoices are emailed.",
+        "Security keys rotate daily.",
+    ]
+    assert embeddings.batches == [4, 2]
+
+
+def test_semantic_chunker_respects_sentence_and_char_limits() -> None:
+    chunker = SemanticChunker(
+        _settings(SEMANTIC_MAX_SENTENCES_PER_CHUNK=2, SEMANTIC_MAX_CHUNK_CHARS=40),
+        TopicEmbeddings(),
+    )
+    text = "Install one. Install two. Install three. " + "install " * 10
+
+    chunks = chunker.chunk(text)
+
+    assert chunks[0] == "Install one. Install two."
+    assert all(len(chunk) <= 40 for chunk in chunks)
+
+
+def test_adjacent_similarities_is_row_wise_cosine() -> None:
+    vectors = np.array([[1.0, 0.0], [2.0, 0.0], [0.0, 3.0]], dtype=np.float32)
+
+    np.testing.assert_allclose(SemanticChunker.adjacent_similarities(vectors), [1.0, 0.0])
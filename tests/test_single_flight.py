@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from conversational_agent.core.config import Settings
+from conversational_agent.infrastructure.vector_store import VectorMatch
+from conversational_agent.services.chat_service import (
+    ChatService,
+    InMemoryResponseCache,
+    InMemorySessionStore,
+)
+from conversational_agent.services.retrieval_service import RetrievalService
+from conversational_agent.services.single_flight import InProcessSingleFlight
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class FakeVectorStore:
+    async def aquery(self, vector: list[float], top_k: int, filters=None) -> list[VectorMatch]:
+        return [VectorMatch(id="doc-0", score=0.9, metadata={"text": "hello"})]
+
+
+class SlowAgent:
+    def __init__(self) -> None:
+        self.runs = 0
+        self.histories: list[list] = []
+
+    async def arun(self, query: str, history: list, retrieval_context=None) -> str:
+        self.runs += 1
+        self.histories.append(history)
+        await asyncio.sleep(0.05)
+        return f"answer to {query} after {len(history)} messages"
+
+    async def astream(self, query: str, history: list, retrieval_context=None):
+        self.runs += 1
+        await asyncio.sleep(0.05)
+        yield "token", {"text": "partial"}
+        yield "answer", {"text": f"answer to {query}"}
+
+
+def _service(agent: SlowAgent, sessions: InMemorySessionStore) -> ChatService:
+    settings = Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x")
+    retrieval = RetrievalService(settings, FakeEmbeddings(), FakeVectorStore())
+    return ChatService(
+        agent,
+        retrieval,
+        sessions,
+        InMemoryResponseCache(),
+        single_flight=InProcessSingleFlight(),
+    )
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight = InProcessSingleFlight()
+    calls = 0
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run() -> list[str]:
+        return await asyncio.gather(*(flight.run("key", work) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["result"] * 10
+    assert calls == 1
+
+
+def test_leader_failure_reaches_followers_and_is_not_cached() -> None:
+    flight = InProcessSingleFlight()
+
+    async def failing() -> str:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("llm down")
+
+    async def ok() -> str:
+        return "recovered"
+
+    async def run() -> tuple[list, str]:
+        results = await asyncio.gather(
+            *(flight.run("key", failing) for _ in range(3)), return_exceptions=True
+        )
+        return results, await flight.run("key", ok)
+
+    results, after = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert after == "recovered"
+
+
+@pytest.mark.parametrize("coalesce", [True, False])
+def test_identical_chat_turns_run_the_agent_once(coalesce: bool) -> None:
+    settings = Settings(GROQ_API_KEY="x", PINECONE_API_KEY="x")
+    retrieval = RetrievalService(settings, FakeEmbeddings(), FakeVectorStore())
+    agent = SlowAgent()
+    sessions = InMemorySessionStore()
+    service = ChatService(
+        agent,
+        retrieval,
+        sessions,
+        InMemoryResponseCache(),
+        single_flight=InProcessSingleFlight() if coalesce else None,
+    )
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(service.achat(f"s{idx}", "popular question") for idx in range(5))
+        )
+
+    responses = asyncio.run(run())
+
+    assert {response.answer for response in responses} == {
+        "answer to popular question after 0 messages"
+    }
+    assert agent.runs == (1 if coalesce else 5)
+    assert all(len(sessions.get(f"s{idx}")) == 2 for idx in range(5))
+
+
+def test_turns_with_different_histories_are_not_coalesced() -> None:
+    agent = SlowAgent()
+    sessions = InMemorySessionStore()
+    sessions.append_turn("a", "about billing", "billing answer")
+    sessions.append_turn("b", "about shipping", "shipping answer")
+    service = _service(agent, sessions)
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(service.achat(session, "what next?") for session in ("a", "b", "c", "d"))
+        )
+
+    responses = asyncio.run(run())
+
+    # "a" and "b" are answered from their own history; the two fresh sessions share one run.
+    assert agent.runs == 3
+    assert sorted(len(history) for history in agent.histories) == [0, 2, 2]
+    assert {history[0]["content"] for history in agent.histories if history} == {
+        "about billing",
+        "about shipping",
+    }
+    assert [response.answer for response in responses] == [
+        "answer to what next? after 2 messages",
+        "answer to what next? after 2 messages",
+        "answer to what next? after 0 messages",
+        "answer to what next? after 0 messages",
+    ]
+
+
+def test_streamed_turns_are_not_coalesced() -> None:
+    agent = SlowAgent()
+    service = _service(agent, InMemorySessionStore())
+
+    async def consume(session_id: str) -> list[str]:
+        return [event async for event, _ in service.achat_stream(session_id, "popular")]
+
+    async def run() -> list:
+        return await asyncio.gather(*(consume(f"s{idx}") for idx in range(3)))
+
+    streams = asyncio.run(run())
+
+    # Every stream gets its tokens as they are generated instead of waiting on a leader.
+    assert agent.runs == 3
+    assert all(events == ["sources", "token", "done"] for events in streams)
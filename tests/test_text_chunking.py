@@ -1,15 +1,64 @@
 import pytest
 
-from conversational_agent.utils.text import chunk_text
+from conversational_agent.utils import text as text_utils
+from conversational_agent.utils.text import chunk_text, count_tokens
 
 def test_chunk_text_basic() -> None:
     text = " ".join(["token"] * 200)
     chunks = chunk_text(text, chunk_size=50, chunk_overlap=10)
 
     assert len(chunks) > 1
-    assert all(len(c)) <= 50 for c in chunks
+    assert all(len(c) <= 50 for c in chunks)
     
 
 def test_chunk_text_invalid_overlap() -> None:
     with pytest.raises(ValueError):
-       chunk_text("abc",chunk_size=100,chunk_overlap=10)    
\ No newline at end of file
+       chunk_text("abc",chunk_size=10,chunk_overlap=100)
+
+
+def test_chunk_text_keeps_words_whole_and_overlaps() -> None:
+    words = [f"word{i}" for i in range(300)]
+    chunks = chunk_text(" ".join(words), chunk_size=80, chunk_overlap=20)
+
+    assert all(set(chunk.split()) <= set(words) for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous.split()[-1] in current.split()[:4]
+    assert chunks[-1].split()[-1] == "word299"
+
+
+def test_chunk_text_splits_words_longer_than_a_chunk() -> None:
+    chunks = chunk_text("x" * 95, chunk_size=40, chunk_overlap=0)
+
+    assert "".join(chunks) == "x" * 95
+    assert all(len(chunk) <= 40 for chunk in chunks)
+
+
+def test_chunk_text_rejects_unknown_mode() -> None:
+    with pytest.raises(ValueError):
+        chunk_text("abc", chunk_size=10, chunk_overlap=0, mode="lines")
+
+
+def test_chunk_text_token_mode_respects_token_budget() -> None:
+    try:
+        text_utils._encoding("cl100k_base")
+    except Exception:  # noqa: BLE001 - encoding files need a download
+        pytest.skip("tiktoken encoding is not available offline")
+
+    text = "Retrieval augmented generation grounds answers in documents. " * 50
+    chunks = chunk_text(text, chunk_size=32, chunk_overlap=8, mode="tokens")
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 32 for chunk in chunks)
+
+
+def test_count_tokens_estimates_from_characters_without_an_encoding(monkeypatch) -> None:
+    def unavailable(name: str):
+        raise OSError("no network")
+
+    monkeypatch.setattr(text_utils, "_encoding", unavailable)
+    text_utils._optional_encoding.cache_clear()
+    try:
+        assert count_tokens("x" * 10) == 3
+        assert count_tokens("") == 0
+    finally:
+        text_utils._optional_encoding.cache_clear()